@@ -6,11 +6,11 @@
     Supports 2 types of approximation: assuming no changes through 1 rewards period and several periods with equal gains.
 @license MIT
 @author curve.fi
-@custom:version 2.0.0
+@custom:version 2.2.0
 @custom:security security@curve.fi
 """
 
-version: public(constant(String[8])) = "2.0.0"
+version: public(constant(String[8])) = "2.2.0"
 
 from snekmate.auth import access_control
 
@@ -50,12 +50,27 @@ struct PriceParams:
     balance_of_self: uint256
 
 
+struct Checkpoint:
+    block_number: uint256
+    ts: uint256  # timestamp at which `params` are true
+    params: PriceParams
+
+
 # scrvUSD Vault rate replication
 ALL_PARAM_CNT: constant(uint256) = 2 + 5
 MAX_BPS_EXTENDED: constant(uint256) = 1_000_000_000_000
 
 MAX_V2_DURATION: constant(uint256) = 4 * 12 * 4  # 4 years
 
+# Price may change at most 10**18 times between updates
+MAX_PRICE_FACTOR: constant(uint256) = 10**36
+PRICE_POWER_CNT: constant(uint256) = 32  # time passed is saturated at 2**32 seconds
+
+CHECKPOINT_CNT: public(constant(uint256)) = 64
+CHECKPOINT_SEARCH_STEPS: constant(uint256) = 7  # ceil(log2(CHECKPOINT_CNT)) + 1
+MASK_64: constant(uint256) = 2**64 - 1
+MASK_128: constant(uint256) = 2**128 - 1
+
 PRICE_PARAMETERS_VERIFIER: public(constant(bytes32)) = keccak256("PRICE_PARAMETERS_VERIFIER")
 UNLOCK_TIME_VERIFIER: public(constant(bytes32)) = keccak256("UNLOCK_TIME_VERIFIER")
 
@@ -71,6 +86,13 @@ price_params_ts: uint256
 max_price_increment: public(uint256)  # precision 10**18
 max_v2_duration: public(uint256)  # number of periods(weeks)
 
+# Ring buffer of verified price parameters, ordered by block number and `ts`.
+# `Checkpoint` is packed into 4 slots to save gas on updates:
+#   block_number | ts << 64 | full_profit_unlock_date << 128 | last_profit_update << 192,
+#   total_debt | total_idle << 128, total_supply | balance_of_self << 128, profit_unlocking_rate
+checkpoints: uint256[4][CHECKPOINT_CNT]
+checkpoint_cnt: public(uint256)  # number of checkpoints ever written
+
 
 @deploy
 def __init__(_initial_price: uint256):
@@ -94,7 +116,7 @@ def __init__(_initial_price: uint256):
 
     # 2 * 10 ** 12 is equivalent to
     #   1) 0.02 bps per second or 0.24 bps per block on Ethereum
-    #   2) linearly approximated to max 63% APY
+    #   2) compounded, at most x1.19 per day or x3.35 per week, saturated at MAX_PRICE_FACTOR
     self.max_price_increment = 2 * 10**12
     self.max_v2_duration = 4 * 6  # half a year
 
@@ -111,7 +133,8 @@ def price_v0(_i: uint256 = 0) -> uint256:
     @dev Price is updated in steps, need to verify every % changed
     @param _i 0 (default) for `pricePerShare()` and 1 for `pricePerAsset()`
     """
-    return self._price_v0() if _i == 0 else 10**36 // self._price_v0()
+    p: uint256 = self._price_v0(block.timestamp - self.last_update)
+    return p if _i == 0 else 10**36 // p
 
 
 @view
@@ -123,7 +146,8 @@ def price_v1(_i: uint256 = 0) -> uint256:
         need to adjust rate when too off.
     @param _i 0 (default) for `pricePerShare()` and 1 for `pricePerAsset()`
     """
-    return self._price_v1() if _i == 0 else 10**36 // self._price_v1()
+    p: uint256 = self._price_v1(block.timestamp - self.last_update)
+    return p if _i == 0 else 10**36 // p
 
 
 @view
@@ -134,7 +158,8 @@ def price_v2(_i: uint256 = 0) -> uint256:
     @dev Uses assumption that crvUSD gains same rewards.
     @param _i 0 (default) for `pricePerShare()` and 1 for `pricePerAsset()`
     """
-    return self._price_v2() if _i == 0 else 10**36 // self._price_v2()
+    p: uint256 = self._price_v2(block.timestamp - self.last_update)
+    return p if _i == 0 else 10**36 // p
 
 
 @view
@@ -152,37 +177,183 @@ def raw_price(
 
 
 @view
-def _smoothed_price(last_price: uint256, raw_price: uint256) -> uint256:
-    # Ideally should be (max_price_increment / 10**18) ** (block.timestamp - self.last_update)
-    # Using linear approximation to simplify calculations
-    max_change: uint256 = (
-        self.max_price_increment * (block.timestamp - self.last_update) * last_price // 10**18
+@external
+def price_at(_ts: uint256, _i: uint256 = 0) -> uint256:
+    """
+    @notice Get verified `scrvUSD.pricePerShare()` at `_ts` without smoothening
+    @dev Uses the latest checkpoint at or before `_ts`, reverts if there is none kept.
+        Price is simulated as if noone interacted after the checkpoint, like `price_v1()`.
+    @param _ts Timestamp at which to see price
+    @param _i 0 (default) for `pricePerShare()` and 1 for `pricePerAsset()`
+    """
+    p: uint256 = self._price(self._find_checkpoint(_ts).params, _ts)
+    return p if _i == 0 else 10**36 // p
+
+
+@view
+@external
+def find_checkpoint(_ts: uint256) -> Checkpoint:
+    """
+    @notice Get the latest checkpoint with parameters true at or before `_ts`
+    @param _ts Timestamp to look up
+    """
+    return self._find_checkpoint(_ts)
+
+
+@view
+def _find_checkpoint(ts: uint256) -> Checkpoint:
+    """
+    @notice Binary search over checkpoints kept in the ring buffer
+    """
+    cnt: uint256 = self.checkpoint_cnt
+    n: uint256 = min(cnt, CHECKPOINT_CNT)
+    start: uint256 = cnt - n
+    assert n > 0 and (self.checkpoints[start % CHECKPOINT_CNT][0] >> 64) & MASK_64 <= ts, (
+        "No checkpoint"
     )
-    # -max_change <= (raw_price - last_price) <= max_change
-    if unsafe_sub(raw_price + max_change, last_price) > 2 * max_change:
-        return last_price + max_change if raw_price > last_price else last_price - max_change
+
+    # checkpoint `lo` is at or before `ts`, checkpoints from `hi` are after it
+    lo: uint256 = 0
+    hi: uint256 = n
+    for _: uint256 in range(CHECKPOINT_SEARCH_STEPS):
+        if hi - lo <= 1:
+            break
+        mid: uint256 = (lo + hi) // 2
+        if (self.checkpoints[(start + mid) % CHECKPOINT_CNT][0] >> 64) & MASK_64 <= ts:
+            lo = mid
+        else:
+            hi = mid
+    return self._unpack_checkpoint(self.checkpoints[(start + lo) % CHECKPOINT_CNT])
+
+
+@pure
+def _fits_checkpoint(c: Checkpoint) -> bool:
+    """
+    @notice Check that fields fit their packed widths, see `checkpoints`
+    """
+    p: PriceParams = c.params
+    return (
+        (c.block_number | c.ts | p.full_profit_unlock_date | p.last_profit_update) <= MASK_64
+        and (p.total_debt | p.total_idle | p.total_supply | p.balance_of_self) <= MASK_128
+    )
+
+
+@pure
+def _pack_checkpoint(c: Checkpoint) -> uint256[4]:
+    p: PriceParams = c.params
+    return [
+        c.block_number | c.ts << 64 | p.full_profit_unlock_date << 128 | p.last_profit_update << 192,
+        p.total_debt | p.total_idle << 128,
+        p.total_supply | p.balance_of_self << 128,
+        p.profit_unlocking_rate,
+    ]
+
+
+@pure
+def _unpack_checkpoint(packed: uint256[4]) -> Checkpoint:
+    return Checkpoint(
+        block_number=packed[0] & MASK_64,
+        ts=(packed[0] >> 64) & MASK_64,
+        params=PriceParams(
+            total_debt=packed[1] & MASK_128,
+            total_idle=packed[1] >> 128,
+            total_supply=packed[2] & MASK_128,
+            full_profit_unlock_date=(packed[0] >> 128) & MASK_64,
+            profit_unlocking_rate=packed[3],
+            last_profit_update=packed[0] >> 192,
+            balance_of_self=packed[2] >> 128,
+        ),
+    )
+
+
+@view
+def _max_price_factor(dt: uint256) -> uint256:
+    """
+    @notice (1 + max_price_increment / 10**18) ** dt with 10**18 precision by binary exponentiation.
+        Rounded down, so never exceeds the exact value, saturated at MAX_PRICE_FACTOR.
+        Powers are squared on the fly, which is cheaper than reading them from storage.
+    """
+    if dt >= 2**PRICE_POWER_CNT:
+        return MAX_PRICE_FACTOR
+    factor: uint256 = 10**18
+    power: uint256 = 10**18 + self.max_price_increment  # (1 + increment) ** (2 ** k)
+    remaining: uint256 = dt
+    # factor and power do not exceed MAX_PRICE_FACTOR, so products fit into uint256
+    for _: uint256 in range(PRICE_POWER_CNT):
+        if remaining & 1 == 1:
+            factor = min(unsafe_div(unsafe_mul(factor, power), 10**18), MAX_PRICE_FACTOR)
+        remaining >>= 1
+        if remaining == 0:
+            break
+        power = min(unsafe_div(unsafe_mul(power, power), 10**18), MAX_PRICE_FACTOR)
+    return factor
+
+
+@view
+def _linear_price_factor(dt: uint256) -> uint256:
+    """
+    @notice 1 + max_price_increment / 10**18 * dt, which does not exceed the compounded factor
+    """
+    return min(10**18 + self.max_price_increment * dt, MAX_PRICE_FACTOR)
+
+
+@view
+def _price_factor(dt: uint256, linear_factor: uint256) -> uint256:
+    """
+    @notice Compounded factor of `_max_price_factor()`, not less than `linear_factor`
+        it may be below by a few wei due to rounding
+    """
+    if dt <= 1:
+        return linear_factor
+    return max(self._max_price_factor(dt), linear_factor)
+
+
+@pure
+def _smoothed_price(last_price: uint256, raw_price: uint256, factor: uint256) -> uint256:
+    # Price changes at most `factor` times since the last update
+    max_price: uint256 = last_price * factor // 10**18
+    if raw_price > max_price:
+        return max_price
+    min_price: uint256 = last_price * 10**18 // factor
+    if raw_price < min_price:
+        return min_price
     return raw_price
 
 
 @view
-def _price_v0() -> uint256:
-    return self._smoothed_price(
-        self.last_prices[0],
-        self._raw_price(self.price_params_ts, self.price_params.last_profit_update),
-    )
+def _smoothed_price_after(last_price: uint256, raw_price: uint256, dt: uint256) -> uint256:
+    """
+    @notice Smooth price `dt` seconds after the last update.
+        Compounded factor is computed only for raw price outside of the linear bounds.
+    """
+    factor: uint256 = self._linear_price_factor(dt)
+    price: uint256 = self._smoothed_price(last_price, raw_price, factor)
+    if price != raw_price:
+        price = self._smoothed_price(last_price, raw_price, self._price_factor(dt, factor))
+    return price
 
 
 @view
-def _price_v1() -> uint256:
-    return self._smoothed_price(
-        self.last_prices[1], self._raw_price(block.timestamp, self.price_params_ts)
+def _raw_price_v0() -> uint256:
+    return self._raw_price(self.price_params_ts, self.price_params.last_profit_update)
+
+
+@view
+def _price_v0(dt: uint256) -> uint256:
+    return self._smoothed_price_after(self.last_prices[0], self._raw_price_v0(), dt)
+
+
+@view
+def _price_v1(dt: uint256) -> uint256:
+    return self._smoothed_price_after(
+        self.last_prices[1], self._raw_price(block.timestamp, self.price_params_ts), dt
     )
 
 
 @view
-def _price_v2() -> uint256:
-    return self._smoothed_price(
-        self.last_prices[2], self._raw_price(block.timestamp, block.timestamp)
+def _price_v2(dt: uint256) -> uint256:
+    return self._smoothed_price_after(
+        self.last_prices[2], self._raw_price(block.timestamp, block.timestamp), dt
     )
 
 
@@ -250,6 +421,9 @@ def _obtain_price_params(parameters_ts: uint256) -> PriceParams:
         (parameters_ts - params.last_profit_update) // period,
         self.max_v2_duration,
     )
+    # Nothing to project, with no supply `unlocked_supply + number_of_periods * balance_of_self` is 0
+    if number_of_periods == 0 or params.total_supply == 0:
+        return params
 
     # locked shares at moment params.last_profit_update
     gain: uint256 = (
@@ -257,16 +431,18 @@ def _obtain_price_params(parameters_ts: uint256) -> PriceParams:
     )
     params.total_idle += gain * number_of_periods
 
-    # functions are reduced from `VaultV3._process_report()` given assumptions with constant gain
-    for _: uint256 in range(number_of_periods, bound=MAX_V2_DURATION):
-        new_balance_of_self: uint256 = (
-            params.balance_of_self
-            * (params.total_supply - params.balance_of_self) // params.total_supply
-        )
-        params.total_supply -= (
-            params.balance_of_self * params.balance_of_self // params.total_supply
-        )
-        params.balance_of_self = new_balance_of_self
+    # functions are reduced from `VaultV3._process_report()` given assumptions with constant gain:
+    #   balance_of_self' = balance_of_self * (total_supply - balance_of_self) / total_supply
+    #   total_supply' = total_supply - balance_of_self ** 2 / total_supply
+    # Unlocked supply `total_supply - balance_of_self` is invariant of a period and
+    # 1 / balance_of_self grows by 1 / unlocked_supply, hence the closed form over all periods.
+    # Differs from the period-by-period rounding by at most n * (n + 3) / 2 wei for n periods.
+    unlocked_supply: uint256 = params.total_supply - params.balance_of_self
+    params.balance_of_self = (
+        params.balance_of_self
+        * unlocked_supply // (unlocked_supply + number_of_periods * params.balance_of_self)
+    )
+    params.total_supply = unlocked_supply + params.balance_of_self
 
     if params.full_profit_unlock_date > params.last_profit_update:
         # copy from `VaultV3._process_report()`
@@ -282,6 +458,11 @@ def _obtain_price_params(parameters_ts: uint256) -> PriceParams:
     return params
 
 
+@view
+def _price(parameters: PriceParams, ts: uint256) -> uint256:
+    return self._total_assets(parameters) * 10**18 // self._total_supply(parameters, ts)
+
+
 @view
 def _raw_price(ts: uint256, parameters_ts: uint256) -> uint256:
     """
@@ -307,11 +488,29 @@ def update_price(
     assert self.last_block_number <= _block_number, "Outdated"
     self.last_block_number = _block_number
 
-    self.last_prices = [self._price_v0(), self._price_v1(), self._price_v2()]
+    # Parameters at `price_params_ts` are obtained once for both `_price_v1()` and `current_price`
+    ts: uint256 = self.price_params_ts
+    params_at_ts: PriceParams = self._obtain_price_params(ts)
+
+    last_prices: uint256[3] = self.last_prices
+    raw_prices: uint256[3] = [
+        self._raw_price_v0(),
+        self._price(params_at_ts, block.timestamp),
+        self._raw_price(block.timestamp, block.timestamp),
+    ]
+    # Compounded factor is computed once if any raw price is outside of the linear bounds
+    dt: uint256 = block.timestamp - self.last_update
+    factor: uint256 = self._linear_price_factor(dt)
+    for i: uint256 in range(3):
+        if self._smoothed_price(last_prices[i], raw_prices[i], factor) != raw_prices[i]:
+            factor = self._price_factor(dt, factor)
+            break
+    for i: uint256 in range(3):
+        last_prices[i] = self._smoothed_price(last_prices[i], raw_prices[i], factor)
+    self.last_prices = last_prices
     self.last_update = block.timestamp
 
-    ts: uint256 = self.price_params_ts
-    current_price: uint256 = self._raw_price(ts, ts)
+    current_price: uint256 = self._price(params_at_ts, ts)
     self.price_params = PriceParams(
         total_debt=_parameters[0],
         total_idle=_parameters[1],
@@ -323,6 +522,24 @@ def update_price(
     )
     self.price_params_ts = _ts
 
+    # Resubmit of the same block replaces its checkpoint.
+    # Checkpoints are searched by `ts`, so parameters true before the previous checkpoint
+    # are not kept, e.g. verified by state root with `ts` of `last_profit_update`.
+    # Parameters not fitting the packed widths are not kept either, the price is still updated.
+    checkpoint: Checkpoint = Checkpoint(block_number=_block_number, ts=_ts, params=self.price_params)
+    cnt: uint256 = self.checkpoint_cnt  # index to write at
+    prev: uint256 = 0  # first slot of the previous checkpoint
+    if cnt > 0:
+        prev = self.checkpoints[(cnt - 1) % CHECKPOINT_CNT][0]
+        if prev & MASK_64 == _block_number:
+            cnt -= 1
+            prev = 0
+            if cnt > 0:
+                prev = self.checkpoints[(cnt - 1) % CHECKPOINT_CNT][0]
+    if (prev >> 64) & MASK_64 <= _ts and self._fits_checkpoint(checkpoint):
+        self.checkpoints[cnt % CHECKPOINT_CNT] = self._pack_checkpoint(checkpoint)
+        self.checkpoint_cnt = cnt + 1
+
     new_price: uint256 = self._raw_price(_ts, _ts)
     log PriceUpdate(new_price, _ts, _block_number)
     if new_price > current_price:
@@ -0,0 +1,168 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.18;
+
+import {RLPReader} from "hamdiallam/Solidity-RLP@2.0.7/contracts/RLPReader.sol";
+import {StateProofVerifier as Verifier} from "../../xdao/contracts/libs/StateProofVerifier.sol";
+
+/// @title Verifier of compact state proofs
+/// @notice Multiproof is RLP list [nodes, paths].
+///         `nodes` are unique trie nodes of all proofs, each hashed once while decoding.
+///         `paths` are byte strings of indices in `nodes`: the account proof followed by storage proofs.
+///         Nodes embedded in their parent (shorter than 32 bytes) are not indexed, as in `eth_getProof`.
+library MultiProofVerifier {
+    using RLPReader for bytes;
+    using RLPReader for RLPReader.RLPItem;
+
+    bytes32 constant EMPTY_TRIE_ROOT = 0x56e81f171bcc55a6ff8345e692c0f86e5b48e01b996cadc001622fb5e363b421;
+    uint256 constant KEY_NIBBLES = 64;
+
+    struct MultiProof {
+        RLPReader.RLPItem[] nodes;
+        bytes32[] hashes;
+        RLPReader.RLPItem[] paths;
+    }
+
+    /// @dev Decode multiproof and hash every node
+    function decode(bytes memory _multiproof) internal pure returns (MultiProof memory proof) {
+        RLPReader.RLPItem[] memory items = _multiproof.toRlpItem().toList();
+        require(items.length == 2, "Invalid multiproof");
+
+        proof.nodes = items[0].toList();
+        proof.hashes = new bytes32[](proof.nodes.length);
+        for (uint256 i = 0; i < proof.nodes.length; i++) {
+            proof.hashes[i] = proof.nodes[i].rlpBytesKeccak256();
+        }
+        proof.paths = items[1].toList();
+    }
+
+    /// @dev Account proof is the first path
+    function extractAccount(
+        MultiProof memory _proof,
+        bytes32 _addressHash,
+        bytes32 _stateRoot
+    ) internal pure returns (Verifier.Account memory account) {
+        bytes memory value = _extractValue(_proof, 0, _addressHash, _stateRoot);
+        if (value.length == 0) {
+            return account;
+        }
+
+        RLPReader.RLPItem[] memory fields = value.toRlpItem().toList();
+        require(fields.length == 4, "Invalid account");
+        account.exists = true;
+        account.nonce = fields[0].toUint();
+        account.balance = fields[1].toUint();
+        account.storageRoot = bytes32(fields[2].toUint());
+        account.codeHash = bytes32(fields[3].toUint());
+    }
+
+    /// @param _i Index of the path, storage proofs start at 1
+    function extractSlotValue(
+        MultiProof memory _proof,
+        uint256 _i,
+        bytes32 _slotHash,
+        bytes32 _storageRoot
+    ) internal pure returns (Verifier.SlotValue memory slot) {
+        bytes memory value = _extractValue(_proof, _i, _slotHash, _storageRoot);
+        if (value.length != 0) {
+            slot.exists = true;
+            slot.value = value.toRlpItem().toUint();
+        }
+    }
+
+    /// @dev Walk the trie from `_root` along `_key`, returns empty bytes for proofs of exclusion
+    function _extractValue(
+        MultiProof memory _proof,
+        uint256 _i,
+        bytes32 _key,
+        bytes32 _root
+    ) private pure returns (bytes memory) {
+        bytes memory path = _proof.paths[_i].toBytes();
+        if (path.length == 0) {
+            require(_root == EMPTY_TRIE_ROOT, "Invalid empty proof");
+            return new bytes(0);
+        }
+
+        RLPReader.RLPItem memory node = _node(_proof, path, 0, _root);
+        uint256 p = 1;  // position in path
+        uint256 depth = 0;  // nibbles of key consumed
+        while (true) {
+            RLPReader.RLPItem[] memory items = node.toList();
+            RLPReader.RLPItem memory child;
+            if (items.length == 17) {
+                if (depth == KEY_NIBBLES) {
+                    require(p == path.length, "Proof too long");
+                    return items[16].toBytes();
+                }
+                child = items[_nibble(_key, depth)];
+                depth += 1;
+            } else if (items.length == 2) {
+                (bool isLeaf, bool matched, uint256 length) = _matchPrefix(items[0], _key, depth);
+                if (!matched || isLeaf) {
+                    require(p == path.length, "Proof too long");
+                    if (!matched || depth + length != KEY_NIBBLES) {
+                        return new bytes(0);
+                    }
+                    return items[1].toBytes();
+                }
+                child = items[1];
+                depth += length;
+            } else {
+                revert("Invalid node");
+            }
+
+            if (child.isList()) {
+                // Embedded node
+                node = child;
+            } else if (child.len == 1) {
+                // Empty slot of a branch
+                require(p == path.length, "Proof too long");
+                return new bytes(0);
+            } else {
+                node = _node(_proof, path, p, bytes32(child.toUint()));
+                p += 1;
+            }
+        }
+    }
+
+    function _node(
+        MultiProof memory _proof,
+        bytes memory _path,
+        uint256 _p,
+        bytes32 _hash
+    ) private pure returns (RLPReader.RLPItem memory) {
+        require(_p < _path.length, "Proof too short");
+        uint256 index = uint8(_path[_p]);
+        require(_proof.hashes[index] == _hash, "Invalid node hash");
+        return _proof.nodes[index];
+    }
+
+    function _nibble(bytes32 _key, uint256 _i) private pure returns (uint256) {
+        return (uint256(_key) >> (4 * (KEY_NIBBLES - 1 - _i))) & 0x0f;
+    }
+
+    /// @dev Match hex-prefix encoded path of a leaf or extension node against `_key` from `_depth`
+    function _matchPrefix(
+        RLPReader.RLPItem memory _encoded,
+        bytes32 _key,
+        uint256 _depth
+    ) private pure returns (bool isLeaf, bool matched, uint256 length) {
+        bytes memory encoded = _encoded.toBytes();
+        require(encoded.length > 0, "Invalid node path");
+        uint256 flag = uint8(encoded[0]) >> 4;
+        isLeaf = flag >= 2;
+        uint256 skip = flag & 1 == 1 ? 1 : 2;  // nibbles of prefix
+        length = 2 * encoded.length - skip;
+        if (_depth + length > KEY_NIBBLES) {
+            return (isLeaf, false, length);
+        }
+
+        for (uint256 j = 0; j < length; j++) {
+            uint256 k = j + skip;
+            uint256 nibble = k % 2 == 0 ? uint8(encoded[k / 2]) >> 4 : uint8(encoded[k / 2]) & 0x0f;
+            if (nibble != _nibble(_key, _depth + j)) {
+                return (isLeaf, false, length);
+            }
+        }
+        matched = true;
+    }
+}
@@ -87,27 +87,38 @@ contract ScrvusdVerifierV1 {
         RLPReader.RLPItem[] memory proofs = proofRlp.toRlpItem().toList();
         require(proofs.length == PROOF_CNT, "Invalid number of proofs");
 
-        // Extract account proof
+        bytes32 storageRoot = _extractStorageRoot(stateRoot, proofs[0]);
+        return _extractParametersFromStorage(storageRoot, proofs);
+    }
+
+    /// @dev Verify the account proof of scrvUSD and return its storage root.
+    function _extractStorageRoot(
+        bytes32 stateRoot,
+        RLPReader.RLPItem memory accountProof
+    ) internal view returns (bytes32) {
         Verifier.Account memory account = Verifier.extractAccountFromProof(
             SCRVUSD_HASH,
             stateRoot,
-            proofs[0].toList()
+            accountProof.toList()
         );
         require(account.exists, "scrvUSD account does not exist");
+        return account.storageRoot;
+    }
 
-        // Extract slot values
-        uint256[PARAM_CNT] memory params;
+    /// @dev Extract parameters from storage proofs `proofs[1:PROOF_CNT]`, `proofs[0]` is the account proof.
+    function _extractParametersFromStorage(
+        bytes32 storageRoot,
+        RLPReader.RLPItem[] memory proofs
+    ) internal view returns (uint256[PARAM_CNT] memory params) {
         for (uint256 i = 1; i < PROOF_CNT; i++) {
             Verifier.SlotValue memory slot = Verifier.extractSlotValueFromProof(
                 keccak256(abi.encode(PARAM_SLOTS[i])),
-                account.storageRoot,
+                storageRoot,
                 proofs[i].toList()
             );
             // Slots might not exist, but typically we just read them.
             params[i - 1] = slot.value;
         }
-
-        return params;
     }
 
     /// @dev Calls the oracle to update the price parameters.
@@ -58,18 +58,19 @@ contract ScrvusdVerifierV2 is ScrvusdVerifierV1 {
         RLPReader.RLPItem[] memory proofs = proofRlp.toRlpItem().toList();
         require(proofs.length == 2, "Invalid number of proofs");
 
-        // Extract account proof
-        Verifier.Account memory account = Verifier.extractAccountFromProof(
-            ScrvusdVerifierV1.SCRVUSD_HASH,
-            stateRoot,
-            proofs[0].toList()
-        );
-        require(account.exists, "scrvUSD account does not exist");
+        bytes32 storageRoot = _extractStorageRoot(stateRoot, proofs[0]);
+        return _extractPeriodFromStorage(storageRoot, proofs[1]);
+    }
 
+    /// @dev Extract period from its storage proof.
+    function _extractPeriodFromStorage(
+        bytes32 storageRoot,
+        RLPReader.RLPItem memory periodProof
+    ) internal view returns (uint256) {
         Verifier.SlotValue memory slot = Verifier.extractSlotValueFromProof(
             keccak256(abi.encode(PERIOD_SLOT)),
-            account.storageRoot,
-            proofs[1].toList()
+            storageRoot,
+            periodProof.toList()
         );
         require(slot.exists);
 
@@ -0,0 +1,196 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.18;
+
+import {IBlockHashOracle, PARAM_CNT, PROOF_CNT} from "./ScrvusdVerifierV1.sol";
+import {ScrvusdVerifierV2, IScrvusdOracleV2} from "./ScrvusdVerifierV2.sol";
+import {RLPReader} from "hamdiallam/Solidity-RLP@2.0.7/contracts/RLPReader.sol";
+import {StateProofVerifier as Verifier} from "../../xdao/contracts/libs/StateProofVerifier.sol";
+import {MultiProofVerifier} from "./MultiProofVerifier.sol";
+
+uint256 constant COMBINED_PROOF_CNT = PROOF_CNT + 1; // + period
+
+contract ScrvusdVerifierV3 is ScrvusdVerifierV2 {
+    using RLPReader for bytes;
+    using RLPReader for RLPReader.RLPItem;
+
+    constructor(address _block_hash_oracle, address _scrvusd_oracle)
+        ScrvusdVerifierV2(_block_hash_oracle, _scrvusd_oracle) {}
+
+    /// @notice Update price parameters and period in one transaction
+    /// @param _block_header_rlp The RLP-encoded block header
+    /// @param _proof_rlp The state proof of the parameters followed by the period
+    /// @return Absolute relative price change and whether the period changed
+    function verifyScrvusdAndPeriodByBlockHash(
+        bytes memory _block_header_rlp,
+        bytes memory _proof_rlp
+    ) external returns (uint256, bool) {
+        Verifier.BlockHeader memory block_header = Verifier.parseBlockHeader(_block_header_rlp);
+        require(block_header.hash != bytes32(0), "Invalid blockhash");
+        require(
+            block_header.hash == IBlockHashOracle(BLOCK_HASH_ORACLE).get_block_hash(block_header.number),
+            "Blockhash mismatch"
+        );
+
+        (uint256[PARAM_CNT] memory params, uint256 period) = _extractParametersAndPeriodFromProof(
+            block_header.stateRootHash,
+            _proof_rlp
+        );
+        return _updatePriceAndPeriod(params, true, period, block_header.timestamp, block_header.number);
+    }
+
+    /// @notice Update price parameters and period in one transaction
+    /// @param _block_number Number of the block to use state root hash
+    /// @param _proof_rlp The state proof of the parameters followed by the period
+    /// @return Absolute relative price change and whether the period changed
+    function verifyScrvusdAndPeriodByStateRoot(
+        uint256 _block_number,
+        bytes memory _proof_rlp
+    ) external returns (uint256, bool) {
+        bytes32 state_root = IBlockHashOracle(BLOCK_HASH_ORACLE).get_state_root(_block_number);
+
+        (uint256[PARAM_CNT] memory params, uint256 period) = _extractParametersAndPeriodFromProof(
+            state_root,
+            _proof_rlp
+        );
+        // Use last_profit_update as the timestamp surrogate
+        return _updatePriceAndPeriod(params, true, period, params[5], _block_number);
+    }
+
+    /// @notice Update price parameters, and period if proven, using compact proof
+    /// @param _block_header_rlp The RLP-encoded block header
+    /// @param _multiproof Proof of parameters and optionally period, see `MultiProofVerifier`
+    /// @return Absolute relative price change and whether the period changed
+    function verifyScrvusdByBlockHashCompact(
+        bytes memory _block_header_rlp,
+        bytes memory _multiproof
+    ) external returns (uint256, bool) {
+        Verifier.BlockHeader memory block_header = Verifier.parseBlockHeader(_block_header_rlp);
+        require(block_header.hash != bytes32(0), "Invalid blockhash");
+        require(
+            block_header.hash == IBlockHashOracle(BLOCK_HASH_ORACLE).get_block_hash(block_header.number),
+            "Blockhash mismatch"
+        );
+
+        (uint256[PARAM_CNT] memory params, bool with_period, uint256 period) = _extractFromMultiproof(
+            block_header.stateRootHash,
+            _multiproof
+        );
+        return _updatePriceAndPeriod(params, with_period, period, block_header.timestamp, block_header.number);
+    }
+
+    /// @notice Update price parameters, and period if proven, using compact proof
+    /// @param _block_number Number of the block to use state root hash
+    /// @param _multiproof Proof of parameters and optionally period, see `MultiProofVerifier`
+    /// @return Absolute relative price change and whether the period changed
+    function verifyScrvusdByStateRootCompact(
+        uint256 _block_number,
+        bytes memory _multiproof
+    ) external returns (uint256, bool) {
+        bytes32 state_root = IBlockHashOracle(BLOCK_HASH_ORACLE).get_state_root(_block_number);
+
+        (uint256[PARAM_CNT] memory params, bool with_period, uint256 period) = _extractFromMultiproof(
+            state_root,
+            _multiproof
+        );
+        // Use last_profit_update as the timestamp surrogate
+        return _updatePriceAndPeriod(params, with_period, period, params[5], _block_number);
+    }
+
+    /// @notice Update price parameters with several blocks in one transaction, e.g. to catch up
+    /// @dev Blocks must be in ascending order, each one becomes a checkpoint of the oracle.
+    ///      Last prices are smoothed by the first update only, as all share the block timestamp.
+    /// @param _block_headers_rlp The RLP-encoded block headers
+    /// @param _multiproofs Compact proofs of parameters and optionally period, one per block
+    /// @return price_change Absolute relative price change of the last update
+    /// @return period_changed Whether the period changed in any update
+    function verifyScrvusdByBlockHashes(
+        bytes[] memory _block_headers_rlp,
+        bytes[] memory _multiproofs
+    ) external returns (uint256 price_change, bool period_changed) {
+        require(_block_headers_rlp.length > 0, "No blocks");
+        require(_block_headers_rlp.length == _multiproofs.length, "Length mismatch");
+
+        for (uint256 i = 0; i < _block_headers_rlp.length; i++) {
+            Verifier.BlockHeader memory block_header = Verifier.parseBlockHeader(_block_headers_rlp[i]);
+            require(block_header.hash != bytes32(0), "Invalid blockhash");
+            require(
+                block_header.hash == IBlockHashOracle(BLOCK_HASH_ORACLE).get_block_hash(block_header.number),
+                "Blockhash mismatch"
+            );
+
+            (uint256[PARAM_CNT] memory params, bool with_period, uint256 period) = _extractFromMultiproof(
+                block_header.stateRootHash,
+                _multiproofs[i]
+            );
+            bool changed;
+            (price_change, changed) = _updatePriceAndPeriod(
+                params, with_period, period, block_header.timestamp, block_header.number
+            );
+            period_changed = period_changed || changed;
+        }
+    }
+
+    /// @dev Extract parameters and period from the state proof using the given state root.
+    ///      Account proof is verified once for all slots.
+    function _extractParametersAndPeriodFromProof(
+        bytes32 stateRoot,
+        bytes memory proofRlp
+    ) internal view returns (uint256[PARAM_CNT] memory params, uint256 period) {
+        RLPReader.RLPItem[] memory proofs = proofRlp.toRlpItem().toList();
+        require(proofs.length == COMBINED_PROOF_CNT, "Invalid number of proofs");
+
+        bytes32 storageRoot = _extractStorageRoot(stateRoot, proofs[0]);
+        params = _extractParametersFromStorage(storageRoot, proofs);
+        period = _extractPeriodFromStorage(storageRoot, proofs[PROOF_CNT]);
+    }
+
+    /// @dev Extract parameters and optional period from compact proof, nodes are hashed once.
+    function _extractFromMultiproof(
+        bytes32 stateRoot,
+        bytes memory multiproof
+    ) internal view returns (uint256[PARAM_CNT] memory params, bool with_period, uint256 period) {
+        MultiProofVerifier.MultiProof memory proof = MultiProofVerifier.decode(multiproof);
+        with_period = proof.paths.length == COMBINED_PROOF_CNT;
+        require(with_period || proof.paths.length == PROOF_CNT, "Invalid number of proofs");
+
+        Verifier.Account memory account = MultiProofVerifier.extractAccount(proof, SCRVUSD_HASH, stateRoot);
+        require(account.exists, "scrvUSD account does not exist");
+
+        for (uint256 i = 1; i < PROOF_CNT; i++) {
+            Verifier.SlotValue memory slot = MultiProofVerifier.extractSlotValue(
+                proof,
+                i,
+                keccak256(abi.encode(PARAM_SLOTS[i])),
+                account.storageRoot
+            );
+            params[i - 1] = slot.value;
+        }
+
+        if (with_period) {
+            Verifier.SlotValue memory period_slot = MultiProofVerifier.extractSlotValue(
+                proof,
+                PROOF_CNT,
+                keccak256(abi.encode(PERIOD_SLOT)),
+                account.storageRoot
+            );
+            require(period_slot.exists);
+            period = period_slot.value;
+        }
+    }
+
+    /// @dev Price goes first, so last prices are smoothed with the period they were obtained with.
+    function _updatePriceAndPeriod(
+        uint256[PARAM_CNT] memory params,
+        bool with_period,
+        uint256 period,
+        uint256 ts,
+        uint256 number
+    ) internal returns (uint256, bool) {
+        uint256 price_change = _updatePrice(params, ts, number);
+        if (!with_period) {
+            return (price_change, false);
+        }
+        bool period_changed = IScrvusdOracleV2(SCRVUSD_ORACLE).update_profit_max_unlock_time(period, number);
+        return (price_change, period_changed);
+    }
+}
@@ -0,0 +1,154 @@
+"""
+Archive of scrvUSD storage at every block where it changed, written by `collector.py`
+and replayed by `backtest.py`.
+
+Archive is columnar: a directory with a file per field of `ARCHIVE_FIELDS`,
+holding big-endian values of `COLUMN_WIDTHS` bytes one after another.
+Records are appended to every column, the number of complete records is the shortest column,
+so a partially written record is ignored and dropped by `ColumnArchive.truncate()`.
+Columns are read in chunks of `CHUNK_SIZE` records, so archive size is not limited by memory.
+JSONL objects or CSV with a header of `ARCHIVE_FIELDS` are read as well.
+"""
+
+import csv
+import json
+import os
+from contextlib import ExitStack
+from typing import Iterable, Iterator, NamedTuple
+
+from scrvusd_oracle import PriceParams
+
+ARCHIVE = "scrvusd_archive"  # ALTER
+
+ARCHIVE_FIELDS = ("block_number", "timestamp", *PriceParams._fields, "profit_max_unlock_time")
+# Bytes per value, storage slots are uint256
+COLUMN_WIDTHS = {field: 32 for field in ARCHIVE_FIELDS} | {"block_number": 8, "timestamp": 8}
+CHUNK_SIZE = 4096
+
+
+class Record(NamedTuple):
+    block_number: int
+    timestamp: int
+    params: PriceParams
+    profit_max_unlock_time: int
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        :param row: {field: value} of `ARCHIVE_FIELDS`, values might be strings
+        """
+        return cls(
+            block_number=int(row["block_number"]),
+            timestamp=int(row["timestamp"]),
+            params=PriceParams(*[int(row[field]) for field in PriceParams._fields]),
+            profit_max_unlock_time=int(row["profit_max_unlock_time"]),
+        )
+
+    def to_row(self):
+        return {
+            "block_number": self.block_number,
+            "timestamp": self.timestamp,
+            **self.params._asdict(),
+            "profit_max_unlock_time": self.profit_max_unlock_time,
+        }
+
+
+class ColumnArchive:
+    """
+    Append-only columnar archive in directory `path`.
+    """
+
+    def __init__(self, path=ARCHIVE):
+        self.path = path
+
+    def column_path(self, field):
+        return os.path.join(self.path, f"{field}.bin")
+
+    def exists(self) -> bool:
+        return all(os.path.exists(self.column_path(field)) for field in ARCHIVE_FIELDS)
+
+    def create(self):
+        """
+        Create empty columns, dropping existing ones.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        for field in ARCHIVE_FIELDS:
+            open(self.column_path(field), "wb").close()
+
+    def size(self) -> int:
+        """
+        :return: Number of complete records
+        """
+        return min(
+            os.path.getsize(self.column_path(field)) // COLUMN_WIDTHS[field]
+            for field in ARCHIVE_FIELDS
+        )
+
+    def truncate(self, size):
+        """
+        Drop records after the first `size`.
+        """
+        for field in ARCHIVE_FIELDS:
+            with open(self.column_path(field), "r+b") as f:
+                f.truncate(size * COLUMN_WIDTHS[field])
+
+    def append(self, records: Iterable[Record]):
+        """
+        Append `records` to every column and flush them to disk.
+        """
+        rows = [record.to_row() for record in records]
+        for field in ARCHIVE_FIELDS:
+            width = COLUMN_WIDTHS[field]
+            with open(self.column_path(field), "ab") as f:
+                f.write(b"".join(row[field].to_bytes(width, "big") for row in rows))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def column(self, field) -> Iterator[int]:
+        """
+        Stream values of a single `field`.
+        """
+        width = COLUMN_WIDTHS[field]
+        with open(self.column_path(field), "rb") as f:
+            for _ in range(self.size()):
+                yield int.from_bytes(f.read(width), "big")
+
+    def read(self) -> Iterator[Record]:
+        """
+        Stream complete records in order of appending.
+        """
+        size = self.size()
+        with ExitStack() as stack:
+            files = {
+                field: stack.enter_context(open(self.column_path(field), "rb"))
+                for field in ARCHIVE_FIELDS
+            }
+            for start in range(0, size, CHUNK_SIZE):
+                count = min(CHUNK_SIZE, size - start)
+                columns = {}
+                for field, f in files.items():
+                    width = COLUMN_WIDTHS[field]
+                    data = f.read(count * width)
+                    columns[field] = [
+                        int.from_bytes(data[i : i + width], "big")
+                        for i in range(0, count * width, width)
+                    ]
+                for i in range(count):
+                    yield Record.from_row({field: columns[field][i] for field in ARCHIVE_FIELDS})
+
+
+def read_archive(path) -> Iterator[Record]:
+    """
+    Stream records of an archive ordered by block number.
+    :param path: `ColumnArchive` directory, `.jsonl` or `.csv` file
+    """
+    if os.path.isdir(path):
+        yield from ColumnArchive(path).read()
+        return
+    with open(path, newline="") as f:
+        if path.endswith(".jsonl"):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for row in rows:
+            yield Record.from_row(row)
@@ -0,0 +1,207 @@
+"""
+Replay of archived scrvUSD states through a simulated keeper and `ScrvusdOracleV2`.
+Used to tune `max_price_increment`, `max_v2_duration` and keeper's `REL_CHANGE_THRESHOLD`
+and to estimate keeper gas by verification path, see `Gas`.
+
+Archive holds scrvUSD storage at every block where it changed, see `archive.py`.
+Records are streamed, so archive size is not limited by memory.
+"""
+
+import json
+from typing import Iterable, NamedTuple
+
+from archive import ARCHIVE, Record, read_archive
+from scrvusd_oracle import (
+    DEFAULT_MAX_PRICE_INCREMENT,
+    DEFAULT_MAX_V2_DURATION,
+    ScrvusdOracleV2,
+    price_per_share,
+)
+
+GAS_BASELINE = "../../tests/scrvusd/benchmark/gas_baseline.json"  # ALTER
+PROOF_SIZE = 4096  # ALTER, trie size of verifier gas benchmarks to take gas of
+APPLY_GAS = None  # ALTER, gas of `apply()` of the blockhash oracle, not benchmarked here
+
+
+class Gas(NamedTuple):
+    """
+    Gas of an update by verification path, taken from gas benchmarks by `from_baseline()`.
+    """
+
+    block_hash: int  # `verifyScrvusdByBlockHash`
+    state_root: int  # `verifyScrvusdByStateRoot`
+    period: int  # extra of proving `profit_max_unlock_time` along with the price
+    apply: int  # `apply()` of a blockhash before proving by it
+
+    @classmethod
+    def from_baseline(cls, path=GAS_BASELINE, size=PROOF_SIZE, apply=APPLY_GAS):
+        """
+        :param size: Trie size of verifier benchmarks, deeper tries give larger proofs
+        """
+        with open(path) as f:
+            baseline = json.load(f)
+        names = {
+            "block_hash": f"ScrvusdVerifierV3.verifyScrvusdByBlockHash[{size}]",
+            "state_root": f"ScrvusdVerifierV3.verifyScrvusdByStateRoot[{size}]",
+            "combined": f"ScrvusdVerifierV3.verifyScrvusdAndPeriodByBlockHash[{size}]",
+        }
+        missing = [name for name in names.values() if name not in baseline]
+        if missing:
+            raise ValueError(
+                f"No gas of {missing} in {path}, run verifier benchmarks with --update-gas-baseline"
+            )
+        if apply is None:
+            raise ValueError("Gas of apply() is not benchmarked, set APPLY_GAS")
+        gas = {key: baseline[name] for key, name in names.items()}
+        return cls(
+            block_hash=gas["block_hash"],
+            state_root=gas["state_root"],
+            period=gas["combined"] - gas["block_hash"],
+            apply=apply,
+        )
+
+
+class Config(NamedTuple):
+    max_price_increment: int = DEFAULT_MAX_PRICE_INCREMENT
+    max_v2_duration: int = DEFAULT_MAX_V2_DURATION
+    rel_change_threshold: float = 1.00005  # keeper updates when price / oracle price exceeds it
+    max_update_interval: int = 4 * 3600  # keeper updates at least this often
+    version: int = 2  # oracle price the keeper follows
+    step: int = 3600  # seconds between checks, records are checked additionally
+    gas: Gas = None  # gas is not estimated without it
+    by_state_root: bool = False  # keeper verifies by state root, else by block hash
+    # Share of block hash updates sending `apply()`, others prove blocks already known to L2
+    apply_share: float = 1.0
+
+
+class Report(NamedTuple):
+    samples: int
+    updates: int
+    period_updates: int
+    gas: int  # None if not estimated
+    # Relative error of price_v0, v1, v2 against `pricePerShare`
+    mean_errors: list
+    max_errors: list
+
+    def __str__(self):
+        errors = ", ".join(
+            f"v{i}: mean {mean * 1e4:.4f} bps, max {max_ * 1e4:.4f} bps"
+            for i, (mean, max_) in enumerate(zip(self.mean_errors, self.max_errors))
+        )
+        gas = "gas not estimated" if self.gas is None else f"{self.gas} gas"
+        return (
+            f"{self.samples} samples, {self.updates} updates "
+            f"({self.period_updates} with period), {gas}\n{errors}"
+        )
+
+
+class Backtest:
+    """
+    Keeper checks the oracle every `Config.step` seconds and at every record,
+    updating it with the latest record like `scrvusd_keeper.time_to_update()` decides.
+    Price errors are sampled at checks before the keeper acts.
+    """
+
+    def __init__(self, config=Config()):
+        self.config = config
+        self.oracle = None
+        self.last_update = None
+
+        self.samples = 0
+        self.updates = 0
+        self.period_updates = 0
+        self.gas = 0
+        self.error_sums = [0.0] * 3
+        self.max_errors = [0.0] * 3
+
+    def run(self, records: Iterable[Record]) -> Report:
+        records = iter(records)
+        record = next(records, None)
+        if record is None:
+            return self.report()
+        if self.oracle is None:
+            self._deploy(record)
+
+        while record is not None:
+            next_record = next(records, None)
+            ts = record.timestamp
+            while True:
+                self.check(record, ts)
+                ts += self.config.step
+                if next_record is None or ts >= next_record.timestamp:
+                    break
+            record = next_record
+        return self.report()
+
+    def _deploy(self, record: Record):
+        ts = record.timestamp
+        self.oracle = ScrvusdOracleV2(price_per_share(record.params, ts), ts)
+        self.oracle.max_price_increment = self.config.max_price_increment
+        self.oracle.max_v2_duration = self.config.max_v2_duration
+        self.oracle.profit_max_unlock_time = record.profit_max_unlock_time
+        self._update(record, ts)
+
+    def check(self, record: Record, ts):
+        """
+        Sample oracle prices at `ts` and update the oracle if the keeper would.
+        """
+        price = price_per_share(record.params, ts)
+        oracle_prices = [
+            self.oracle.price_v0(ts),
+            self.oracle.price_v1(ts),
+            self.oracle.price_v2(ts),
+        ]
+
+        self.samples += 1
+        for i, oracle_price in enumerate(oracle_prices):
+            error = abs(oracle_price - price) / price
+            self.error_sums[i] += error
+            self.max_errors[i] = max(self.max_errors[i], error)
+
+        if (
+            ts - self.last_update >= self.config.max_update_interval
+            or price / oracle_prices[self.config.version] > self.config.rel_change_threshold
+        ):
+            self._update(record, ts)
+
+    def _update(self, record: Record, ts):
+        # Same order as combined verifier: price first, then period
+        self.oracle.update_price(record.params, ts, record.block_number, ts)
+        period = record.profit_max_unlock_time != self.oracle.profit_max_unlock_time
+        if period:
+            self.oracle.update_profit_max_unlock_time(
+                record.profit_max_unlock_time, record.block_number
+            )
+            self.period_updates += 1
+        self.updates += 1
+        self.last_update = ts
+        self.gas += self.update_gas(period)
+
+    def update_gas(self, period) -> float:
+        """
+        Expected gas of an update on the path of `Config`.
+        :param period: Whether `profit_max_unlock_time` is proven as well
+        """
+        gas = self.config.gas
+        if gas is None:
+            return 0
+        if self.config.by_state_root:
+            update_gas = gas.state_root
+        else:
+            update_gas = gas.block_hash + self.config.apply_share * gas.apply
+        return update_gas + (gas.period if period else 0)
+
+    def report(self) -> Report:
+        return Report(
+            samples=self.samples,
+            updates=self.updates,
+            period_updates=self.period_updates,
+            gas=None if self.config.gas is None else round(self.gas),
+            mean_errors=[error_sum / max(self.samples, 1) for error_sum in self.error_sums],
+            max_errors=list(self.max_errors),
+        )
+
+
+if __name__ == "__main__":
+    gas = Gas.from_baseline() if APPLY_GAS is not None else None
+    print(Backtest(Config(gas=gas)).run(read_archive(ARCHIVE)))
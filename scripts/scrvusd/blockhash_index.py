@@ -0,0 +1,139 @@
+"""
+Index of Ethereum blockhashes known to a blockhash oracle on L2.
+Kept current by incremental paged `eth_getLogs` scans of `ApplyBlockHash` and `CommitBlockHash`,
+stored in sqlite so scans resume after restarts.
+Allows the keeper to prove against an already known block instead of paying for `apply()`.
+"""
+
+import sqlite3
+import threading
+
+from web3 import Web3
+
+APPLY_BLOCK_HASH = Web3.keccak(text="ApplyBlockHash(uint256,bytes32)")
+COMMIT_BLOCK_HASH = Web3.keccak(text="CommitBlockHash(address,uint256,bytes32)")
+
+PAGE_SIZE = 10_000  # L2 blocks per `eth_getLogs` request
+INITIAL_SCAN = 100_000  # L2 blocks to scan back on the first sync
+
+
+class BlockHashIndex:
+    """
+    Blockhashes from events of `boracle`: {block number: (hash, applied)}.
+    Applied ones are returned by `get_block_hash()`, committed ones only once applied,
+    so the latter are candidates to check.
+    """
+
+    def __init__(self, l2_web3, boracle, path=None, page_size=PAGE_SIZE, from_block=None):
+        """
+        :param boracle: Address of blockhash oracle
+        :param path: sqlite database to keep the index in, shared by oracles of all chains
+        :param from_block: L2 block to start the first scan from, `INITIAL_SCAN` back by default
+        """
+        self.l2_web3 = l2_web3
+        self.boracle = boracle.lower()
+        self.page_size = page_size
+        self.blocks = {}
+        self.scanned = None if from_block is None else from_block - 1  # last L2 block scanned
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS blockhashes ("
+                "boracle TEXT, number INTEGER, hash BLOB, applied INTEGER, "
+                "PRIMARY KEY (boracle, number))"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS scans (boracle TEXT PRIMARY KEY, scanned INTEGER)"
+            )
+            self._db.commit()
+            self._load()
+
+    def _load(self):
+        for number, block_hash, applied in self._db.execute(
+            "SELECT number, hash, applied FROM blockhashes WHERE boracle = ?", (self.boracle,)
+        ):
+            self.blocks[number] = (block_hash, bool(applied))
+        row = self._db.execute(
+            "SELECT scanned FROM scans WHERE boracle = ?", (self.boracle,)
+        ).fetchone()
+        if row is not None:
+            self.scanned = row[0]
+
+    def sync(self, to_block="latest"):
+        """
+        Scan L2 blocks after the last scanned one up to `to_block`.
+        :return: Number of events found
+        """
+        if to_block == "latest":
+            to_block = self.l2_web3.eth.block_number
+        from_block = max(to_block - INITIAL_SCAN, 0) if self.scanned is None else self.scanned + 1
+        found = 0
+        for start in range(from_block, to_block + 1, self.page_size):
+            end = min(start + self.page_size - 1, to_block)
+            logs = self.l2_web3.eth.get_logs(
+                {
+                    "address": Web3.to_checksum_address(self.boracle),
+                    "fromBlock": start,
+                    "toBlock": end,
+                    "topics": [[APPLY_BLOCK_HASH, COMMIT_BLOCK_HASH]],
+                }
+            )
+            events = [_decode(log) for log in logs]
+            self._update(events, end)
+            found += len(events)
+        return found
+
+    def _update(self, events, scanned):
+        with self._lock:
+            for number, block_hash, applied in events:
+                if number in self.blocks and self.blocks[number][1] and not applied:
+                    continue  # commit does not replace applied blockhash
+                self.blocks[number] = (block_hash, applied)
+            self.scanned = scanned
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO blockhashes VALUES (?, ?, ?, ?)",
+                    [(self.boracle, number, *self.blocks[number]) for number, _, _ in events],
+                )
+                if scanned is not None:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO scans VALUES (?, ?)", (self.boracle, scanned)
+                    )
+                self._db.commit()
+
+    def mark_applied(self, number, block_hash):
+        """
+        Record blockhash found applied otherwise, e.g. by `get_block_hash()`.
+        """
+        self._update([(number, bytes(block_hash), True)], self.scanned)
+
+    def is_applied(self, number) -> bool:
+        entry = self.blocks.get(number)
+        return entry is not None and entry[1]
+
+    def candidates(self, min_block_number=0):
+        """
+        :return: [(block number, applied)] not older than `min_block_number`, latest first
+        """
+        with self._lock:
+            return sorted(
+                (
+                    (number, applied)
+                    for number, (_, applied) in self.blocks.items()
+                    if number >= min_block_number
+                ),
+                reverse=True,
+            )
+
+
+def _decode(log):
+    """
+    :return: (block number, hash, applied) of `ApplyBlockHash` or `CommitBlockHash` log
+    """
+    topics = log["topics"]
+    applied = bytes(topics[0]) == APPLY_BLOCK_HASH
+    # CommitBlockHash(committer indexed, number indexed, hash), ApplyBlockHash(number indexed, hash)
+    number = int.from_bytes(topics[1] if applied else topics[2], "big")
+    return number, bytes(log["data"]), applied
@@ -0,0 +1,152 @@
+"""
+Collector of scrvUSD storage history into an archive for `backtest.py`.
+Blocks where storage changed are found by vault events in paged `eth_getLogs` requests,
+storage of all proven slots is fetched in batched `eth_getStorageAt` requests.
+Records are appended to a columnar archive (see `archive.py`),
+a checkpoint next to it allows to resume collection.
+"""
+
+import asyncio
+import json
+import os
+
+from web3 import AsyncWeb3, Web3
+
+from archive import ARCHIVE, ColumnArchive, Record
+from proof import SCRVUSD, proof_slots
+from provider import close_sessions
+from scrvusd_oracle import PriceParams
+from trigger import DEPOSIT, STRATEGY_REPORTED, WITHDRAW
+
+ETH_NETWORK = "http://localhost:8545"  # ALTER
+FROM_BLOCK = 21_000_000  # ALTER, any block before scrvUSD deployment
+
+UPDATE_PROFIT_MAX_UNLOCK_TIME = Web3.keccak(text="UpdateProfitMaxUnlockTime(uint256)").to_0x_hex()
+
+# Price parameters and profit_max_unlock_time, in order of `ARCHIVE_FIELDS`
+SLOTS = [
+    slot if isinstance(slot, int) else int.from_bytes(slot, "big")
+    for slot in proof_slots(with_period=True)
+]
+
+
+class Collector:
+    """
+    Appends a record for every block with scrvUSD events to `path`.
+    Checkpoint holds the last block scanned and number of records at that moment,
+    so records written after it (e.g. on interruption) are discarded on resume.
+    """
+
+    def __init__(self, eth_web3, path=ARCHIVE, page_size=10_000, batch_size=10, concurrency=4):
+        """
+        :param eth_web3: `AsyncWeb3` instance connected to Ethereum
+        :param page_size: Blocks per `eth_getLogs` request
+        :param batch_size: Blocks per JSON-RPC batch of storage requests
+        :param concurrency: Max batches in flight
+        """
+        self.eth_web3 = eth_web3
+        self.path = path
+        self.archive = ColumnArchive(path)
+        self.checkpoint_path = path + ".checkpoint"
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+
+    def checkpoint(self):
+        """
+        :return: {"block_number": last block scanned, "size": number of records} or None
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path) as f:
+            return json.load(f)
+
+    def _save_checkpoint(self, block_number, size):
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"block_number": block_number, "size": size}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    async def collect(self, from_block=FROM_BLOCK, to_block="latest"):
+        """
+        Scan blocks up to `to_block`, continuing from the checkpoint if there is one.
+        :return: Number of records appended
+        """
+        if to_block == "latest":
+            to_block = await self.eth_web3.eth.block_number
+
+        checkpoint = self.checkpoint()
+        if checkpoint is None or not self.archive.exists():
+            self.archive.create()
+            size = 0
+        else:
+            from_block = checkpoint["block_number"] + 1
+            size = checkpoint["size"]
+            self.archive.truncate(size)
+
+        appended = 0
+        for start in range(from_block, to_block + 1, self.page_size):
+            end = min(start + self.page_size - 1, to_block)
+            records = await self.fetch(await self._change_blocks(start, end))
+            self.archive.append(records)
+            size += len(records)
+            self._save_checkpoint(end, size)
+            appended += len(records)
+        return appended
+
+    async def _change_blocks(self, from_block, to_block):
+        logs = await self.eth_web3.eth.get_logs(
+            {
+                "address": SCRVUSD,
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "topics": [[DEPOSIT, WITHDRAW, STRATEGY_REPORTED, UPDATE_PROFIT_MAX_UNLOCK_TIME]],
+            }
+        )
+        return sorted({log["blockNumber"] for log in logs})
+
+    async def fetch(self, block_numbers):
+        """
+        Fetch records of `block_numbers` in concurrent batches.
+        :return: Records in order of `block_numbers`
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch_batch(batch):
+            async with semaphore:
+                return await self._fetch_batch(batch)
+
+        batches = [
+            block_numbers[i : i + self.batch_size]
+            for i in range(0, len(block_numbers), self.batch_size)
+        ]
+        results = await asyncio.gather(*map(fetch_batch, batches))
+        return [record for batch in results for record in batch]
+
+    async def _fetch_batch(self, block_numbers):
+        async with self.eth_web3.batch_requests() as batch:
+            for block_number in block_numbers:
+                batch.add(self.eth_web3.eth.get_block(block_number))
+                for slot in SLOTS:
+                    batch.add(self.eth_web3.eth.get_storage_at(SCRVUSD, slot, block_number))
+            responses = await batch.async_execute()
+
+        records = []
+        for i, block_number in enumerate(block_numbers):
+            block, *values = responses[i * (1 + len(SLOTS)) : (i + 1) * (1 + len(SLOTS))]
+            *params, period = [int.from_bytes(value, "big") for value in values]
+            records.append(Record(block_number, block["timestamp"], PriceParams(*params), period))
+        return records
+
+
+async def main():
+    eth_web3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(ETH_NETWORK))
+    try:
+        appended = await Collector(eth_web3).collect()
+        print(f"Appended {appended} records to {ARCHIVE}")
+    finally:
+        await close_sessions(eth_web3.provider)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
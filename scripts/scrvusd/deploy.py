@@ -8,7 +8,8 @@ import os
 from getpass import getpass
 from eth_account import account
 
-from proof import generate_proof, submit_proof
+from proof import ProofCache, generate_proof, submit_proof
+from provider import FailoverProvider
 
 
 NETWORK = (
@@ -18,16 +19,17 @@ NETWORK = (
 SCRVUSD = "0x0655977FEb2f289A4aB78af67BAB0d17aAb84367"
 
 eth_web3 = Web3(
-    provider=Web3.HTTPProvider(
-        f"https://eth-mainnet.alchemyapi.io/v2/{os.environ['WEB3_ETHEREUM_MAINNET_ALCHEMY_API_KEY']}",
+    provider=FailoverProvider(
+        [
+            f"https://eth-mainnet.alchemyapi.io/v2/{os.environ['WEB3_ETHEREUM_MAINNET_ALCHEMY_API_KEY']}",
+            "https://ethereum-rpc.publicnode.com/",
+        ]
     ),
 )
 
-l2_web3 = Web3(
-    provider=Web3.HTTPProvider(
-        NETWORK,
-    ),
-)
+l2_web3 = Web3(provider=FailoverProvider([NETWORK, "https://mainnet.optimism.io/"]))
+
+proof_cache = ProofCache(path="proofs.sqlite")
 
 
 def deploy():
@@ -56,7 +58,7 @@ def prove(boracle, soracle, verifier):
     number = boracle.apply()
     print(f"Applied block: {number}, {boracle.get_block_hash(number).hex()}")
 
-    proofs = generate_proof(eth_web3, number, log=True)
+    proofs = generate_proof(eth_web3, number, log=True, cache=proof_cache)
     submit_proof(proofs, verifier)
     print("Sibmitted proof")
 
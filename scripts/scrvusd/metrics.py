@@ -0,0 +1,211 @@
+"""
+Metrics and structured logs of the keeper.
+Metrics are exposed in Prometheus text format by `serve()`, logs are JSON lines on stdout.
+Both are off until `enable()`, recording is a no-op then.
+"""
+
+import bisect
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (256, 512, 1024, 2048, 4096, 8192, 16384)
+
+enabled = False
+json_logs = False
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values = {}  # label values: value
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        assert set(labels) == set(self.labels), f"{self.name} is labeled by {self.labels}"
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def _format_labels(self, key, extra=()):
+        pairs = [*zip(self.labels, key), *extra]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{label}="{value}"' for label, value in pairs) + "}"
+
+    def samples(self):
+        """
+        :return: [(name with labels, value)]
+        """
+        with self._lock:
+            return [
+                (self.name + self._format_labels(key), value)
+                for key, value in sorted(self._values.items())
+            ]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type}"]
+        lines += [f"{name} {_format_value(value)}" for name, value in self.samples()]
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if not enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        """
+        :param value: Number or callable evaluated on render, e.g. time since an event
+        """
+        if not enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self):
+        return [(name, value() if callable(value) else value) for name, value in super().samples()]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, description, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        if not enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip([*self.buckets, "+Inf"], counts):
+                    cumulative += count
+                    labels = self._format_labels(key, [("le", bound)])
+                    samples.append((f"{self.name}_bucket{labels}", cumulative))
+                samples.append((f"{self.name}_sum{self._format_labels(key)}", total))
+                samples.append((f"{self.name}_count{self._format_labels(key)}", cumulative))
+        return samples
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+STAGE_SECONDS = Histogram("keeper_stage_seconds", "Duration of keeper stages", ["stage", "chain"])
+RPC_REQUESTS = Counter("keeper_rpc_requests_total", "JSON-RPC requests by method", ["method"])
+PROOF_BYTES = Histogram(
+    "keeper_proof_bytes", "Size of generated proofs", ["part"], buckets=SIZE_BUCKETS
+)
+GAS_USED = Counter("keeper_gas_used_total", "Gas used by keeper transactions", ["chain"])
+PRICE_DEVIATION = Gauge(
+    "keeper_price_deviation", "Relative deviation of mainnet price from oracle price", ["chain"]
+)
+SECONDS_SINCE_UPDATE = Gauge(
+    "keeper_seconds_since_update", "Time since the last successful update", ["chain"]
+)
+
+METRICS = [
+    STAGE_SECONDS,
+    RPC_REQUESTS,
+    PROOF_BYTES,
+    GAS_USED,
+    PRICE_DEVIATION,
+    SECONDS_SINCE_UPDATE,
+]
+
+
+def render(metrics=METRICS):
+    """
+    :return: Metrics in Prometheus text format
+    """
+    return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+def log(event, **fields):
+    """
+    Write a JSON line with `event` and `fields` if JSON logs are enabled.
+    """
+    if json_logs:
+        print(json.dumps({"ts": time.time(), "event": event, **fields}, default=str))
+        sys.stdout.flush()
+
+
+@contextmanager
+def timed(stage, chain=""):
+    """
+    Record duration of the block as `stage` of `chain`.
+    """
+    if not (enabled or json_logs):
+        yield
+        return
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        duration = time.monotonic() - start
+        STAGE_SECONDS.observe(duration, stage=stage, chain=chain)
+        log("stage", stage=stage, chain=chain, seconds=duration)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port, host="0.0.0.0"):
+    """
+    Serve metrics over HTTP in a background thread.
+    :return: Server, `shutdown()` it to stop
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def enable(metrics=True, logs=False):
+    global enabled, json_logs
+    enabled, json_logs = metrics, logs
+
+
+def disable():
+    enable(False, False)
+    for metric in METRICS:
+        metric.reset()
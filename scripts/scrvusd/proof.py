@@ -1,7 +1,14 @@
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+
 import eth_abi
 import rlp
 import web3
 from hexbytes import HexBytes
+from web3.method import Method, default_root_munger
+from web3.types import RPCEndpoint
 
 BLOCK_NUMBER = 18578883
 SCRVUSD = "0x0655977FEb2f289A4aB78af67BAB0d17aAb84367"
@@ -20,6 +27,9 @@ SUPPLY_PARAM_SLOTS = [
     web3.Web3.keccak(eth_abi.encode(["(uint256,address)"], [[18, SCRVUSD]])),  # balance_of_self
     # ts from block header
 ]
+PERIOD_SLOT = 37  # profit_max_unlock_time
+
+GET_PROOF_METHOD = Method(RPCEndpoint("eth_getProof"), mungers=[default_root_munger])
 
 # https://github.com/ethereum/go-ethereum/blob/master/core/types/block.go#L69
 BLOCK_HEADER = (
@@ -46,58 +56,337 @@ BLOCK_HEADER = (
 )
 
 
+RLP_STRING = 0x80
+RLP_LIST = 0xC0
+
+
+def _rlp_prefix(length, offset):
+    """
+    :param offset: `RLP_STRING` or `RLP_LIST`
+    :return: RLP prefix of an item with `length` bytes of payload
+    """
+    if length < 56:
+        return bytes([offset + length])
+    length_bytes = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes([offset + 55 + len(length_bytes)]) + length_bytes
+
+
+def _as_bytes(value):
+    """
+    :param value: Hex string or bytes-like, the latter is viewed without copying
+    """
+    if isinstance(value, str):
+        value = value[2:] if value.startswith("0x") else value
+        return bytes.fromhex(value if len(value) % 2 == 0 else "0" + value)
+    return memoryview(value)
+
+
+def _header_field(value):
+    if isinstance(value, int):
+        return value.to_bytes((value.bit_length() + 7) // 8, "big")
+    if value == "0x0":
+        return b""
+    return _as_bytes(value)
+
+
 def serialize_block(block):
-    block_header = [
-        HexBytes("0x")
-        if (isinstance((v := block[k]), int) and v == 0) or v == "0x0"
-        else HexBytes(block[k])
-        for k in BLOCK_HEADER
-        if k in block
-    ]
-    block_header[14] = HexBytes("0x0000000000000000")  # nonce
-    return rlp.encode(block_header)
+    """
+    RLP-encode block header, fields are spliced into the output with their prefixes.
+    :param block: Result of `eth_getBlockByNumber`
+    """
+    fields = [_header_field(block[k]) for k in BLOCK_HEADER if k in block]
+    fields[14] = bytes(8)  # nonce
+    parts = []
+    for field in fields:
+        # Single byte below 0x80 is its own encoding
+        if not (len(field) == 1 and field[0] < RLP_STRING):
+            parts.append(_rlp_prefix(len(field), RLP_STRING))
+        parts.append(field)
+    return b"".join([_rlp_prefix(sum(map(len, parts)), RLP_LIST), *parts])
 
 
 def serialize_proofs(proofs):
-    account_proof = list(map(rlp.decode, map(HexBytes, proofs["accountProof"])))
-    storage_proofs = [
-        list(map(rlp.decode, map(HexBytes, proof["proof"]))) for proof in proofs["storageProof"]
-    ]
-    return rlp.encode([account_proof, *storage_proofs])
+    """
+    RLP-encode [account_proof, *storage_proofs].
+    Trie nodes of `eth_getProof` are RLP-encoded already, so they are spliced into the output
+    as is with precomputed list prefixes instead of decoding and encoding them again.
+    :param proofs: Result of `eth_getProof`
+    """
+    parts = []
+    for proof in [proofs["accountProof"], *(proof["proof"] for proof in proofs["storageProof"])]:
+        nodes = [_as_bytes(node) for node in proof]
+        parts.append(_rlp_prefix(sum(map(len, nodes)), RLP_LIST))
+        parts.extend(nodes)
+    # Output is allocated once and every part is copied into it once
+    return b"".join([_rlp_prefix(sum(map(len, parts)), RLP_LIST), *parts])
 
 
-def generate_proof(eth_web3, block_number=BLOCK_NUMBER, log=False):
-    block = eth_web3.eth.get_block(block_number)
-    if log:
-        print(f"Generating proof for block {block.number}, {block.hash.hex()}")
-    block_header_rlp = serialize_block(block)
-    proof_rlp = serialize_proofs(
-        eth_web3.eth.get_proof(SCRVUSD, ASSET_PARAM_SLOTS + SUPPLY_PARAM_SLOTS, block_number)
+def serialize_multiproof(proofs):
+    """
+    Compact form of `serialize_proofs`, see `MultiProofVerifier.sol`.
+    Trie nodes shared between proofs(upper branches of storage trie) are encoded once,
+    proofs are byte strings of node indices.
+    :param proofs: Result of `eth_getProof`
+    :return: RLP-encoded [nodes, [account_path, *storage_paths]]
+    """
+    return _multiproof(
+        [proofs["accountProof"], *(proof["proof"] for proof in proofs["storageProof"])]
     )
 
-    if log:
-        with open("header.txt", "w") as f:
-            f.write(block_header_rlp.hex())
-        with open("proof.txt", "w") as f:
-            f.write(proof_rlp.hex())
 
-    return block_header_rlp.hex(), proof_rlp.hex()
+def compact_proof(proof_rlp):
+    """
+    Convert output of `serialize_proofs` to `serialize_multiproof` format.
+    """
+    return _multiproof([[rlp.encode(node) for node in proof] for proof in rlp.decode(proof_rlp)])
+
+
+def _multiproof(proofs):
+    nodes, indices = [], {}
+    paths = []
+    for proof in proofs:
+        path = bytearray()
+        for i, node in enumerate(map(bytes, map(HexBytes, proof))):
+            # Embedded nodes are verified as part of their parent
+            if i > 0 and len(node) < 32:
+                continue
+            if node not in indices:
+                indices[node] = len(nodes)
+                nodes.append(rlp.decode(node))
+            path.append(indices[node])
+        paths.append(bytes(path))
+    assert len(nodes) <= 256, "Too many nodes to index with a byte"
+    return rlp.encode([nodes, paths])
+
+
+class ProofCache:
+    """
+    Cache of generated proofs keyed by (block_number, address, slots).
+    Keeps the last `size` proofs in memory, and all of them in sqlite database at `path` if given,
+    so proofs survive restarts.
+    """
+
+    def __init__(self, size=128, path=None):
+        self.size = size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS proofs ("
+                "block_number INTEGER, address TEXT, slots TEXT, header BLOB, proof BLOB, "
+                "PRIMARY KEY (block_number, address, slots))"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key(block_number, address=SCRVUSD, slots=None):
+        if slots is None:
+            slots = ASSET_PARAM_SLOTS + SUPPLY_PARAM_SLOTS
+        slots = ",".join(
+            hex(slot if isinstance(slot, int) else int.from_bytes(slot, "big")) for slot in slots
+        )
+        return block_number, address.lower(), slots
+
+    def get(self, block_number, address=SCRVUSD, slots=None):
+        """
+        :return: (block_header_rlp, proof_rlp) or None if not cached
+        """
+        return self._get(self.key(block_number, address, slots))
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT header, proof FROM proofs "
+                "WHERE block_number = ? AND address = ? AND slots = ?",
+                key,
+            ).fetchone()
+        if row is None:
+            return None
+        proofs = bytes(row[0]), bytes(row[1])
+        self._remember(key, proofs)
+        return proofs
+
+    def put(self, block_number, proofs, address=SCRVUSD, slots=None):
+        key = self.key(block_number, address, slots)
+        self._remember(key, proofs)
+        if self._db is not None:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO proofs VALUES (?, ?, ?, ?, ?)",
+                    (*key, *proofs),
+                )
+                self._db.commit()
 
+    def latest(self, address=SCRVUSD, slots=None, with_header=False):
+        """
+        :param with_header: Skip proofs cached without block header (for verification by state root)
+        :return: Proofs of the highest block number stored, None if there are none
+        """
+        _, address, slots = self.key(0, address, slots)
+        with self._lock:
+            cached = [
+                key[0]
+                for key, proofs in self._memory.items()
+                if key[1:] == (address, slots) and (proofs[0] or not with_header)
+            ]
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT MAX(block_number) FROM proofs WHERE address = ? AND slots = ?"
+                    + (" AND length(header) > 0" if with_header else ""),
+                    (address, slots),
+                ).fetchone()
+                if row[0] is not None:
+                    cached.append(row[0])
+        if not cached:
+            return None
+        return self._get((max(cached), address, slots))
 
-def submit_proof(proofs, verifier=VERIFIER):
-    if proofs:
-        block_header_rlp, proof_rlp = proofs
+    def _remember(self, key, proofs):
+        with self._lock:
+            self._memory[key] = proofs
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.size:
+                self._memory.popitem(last=False)
+
+
+def proof_slots(with_period=False):
+    """
+    :param with_period: Append `profit_max_unlock_time` slot for combined verification
+    :return: Storage slots to prove, in order expected by the verifier
+    """
+    slots = ASSET_PARAM_SLOTS + SUPPLY_PARAM_SLOTS
+    if with_period:
+        slots = slots + [PERIOD_SLOT]
+    return slots
+
+
+def _finalize_proof(block_number, block, proofs, cache=None, slots=None):
+    """
+    :param block: Block to serialize header of, None to leave header empty
+    """
+    block_header_rlp = serialize_block(block) if block is not None else b""
+    proof_rlp = serialize_proofs(proofs)
+
+    result = block_header_rlp, proof_rlp
+    if cache is not None:
+        cache.put(block_number, result, slots=slots)
+    return result
+
+
+def _cached_proof(cache, block_number, log=False, slots=None, with_header=True):
+    # Only exact block numbers can be cached, not tags like "latest"
+    if cache is None or not isinstance(block_number, int):
+        return None
+    proofs = cache.get(block_number, slots=slots)
+    if proofs is not None and with_header and not proofs[0]:
+        return None  # cached for verification by state root
+    if proofs is not None and log:
+        print(f"Using cached proof for block {block_number}")
+    return proofs
+
+
+def generate_proof(
+    eth_web3, block_number=BLOCK_NUMBER, log=False, cache=None, with_period=False, with_header=True
+):
+    """
+    :param with_period: Also prove `profit_max_unlock_time` for `ScrvusdVerifierV3`
+    :param with_header: Serialize block header for verification by blockhash.
+        Verification by state root does not need it, header is empty then and `block_number`
+        should be an exact number.
+    """
+    slots = proof_slots(with_period)
+    if (proofs := _cached_proof(cache, block_number, log, slots, with_header)) is not None:
+        return proofs
+
+    block = None
+    if with_header:
+        block = eth_web3.eth.get_block(block_number)
+        block_number = block.number
+        if log:
+            print(f"Generating proof for block {block.number}, {block.hash.hex()}")
+    elif log:
+        print(f"Generating proof for block {block_number}")
+    proofs = eth_web3.eth.get_proof(SCRVUSD, slots, block_number)
+    return _finalize_proof(block_number, block, proofs, cache=cache, slots=slots)
+
+
+def _get_proof_async(eth_web3, block_number, slots):
+    # `AsyncEth` does not provide `eth_getProof`.
+    # Binding at call time, so the request is batched inside `batch_requests()`.
+    get_proof = GET_PROOF_METHOD.__get__(eth_web3.eth)
+    return get_proof(SCRVUSD, slots, block_number)
+
+
+async def generate_proof_async(
+    eth_web3,
+    block_number=BLOCK_NUMBER,
+    log=False,
+    batch=False,
+    cache=None,
+    with_period=False,
+    with_header=True,
+):
+    """
+    Same as `generate_proof`, but block header and proofs are requested concurrently.
+    `block_number` should be an exact number, so both requests refer to the same block.
+    :param eth_web3: `AsyncWeb3` instance connected to Ethereum
+    :param batch: Send both requests as a single JSON-RPC batch
+    :param cache: `ProofCache` to reuse proofs from
+    :param with_period: Also prove `profit_max_unlock_time` for `ScrvusdVerifierV3`
+    :param with_header: Serialize block header, not needed for verification by state root
+    :return: (block_header_rlp, proof_rlp), header is empty without `with_header`
+    """
+    slots = proof_slots(with_period)
+    if (proofs := _cached_proof(cache, block_number, log, slots, with_header)) is not None:
+        return proofs
+
+    if not with_header:
+        if log:
+            print(f"Generating proof for block {block_number}")
+        proofs = await _get_proof_async(eth_web3, block_number, slots)
+        return _finalize_proof(block_number, None, proofs, cache=cache, slots=slots)
+
+    if batch:
+        async with eth_web3.batch_requests() as batch_requests:
+            batch_requests.add(eth_web3.eth.get_block(block_number))
+            batch_requests.add(_get_proof_async(eth_web3, block_number, slots))
+            block, proofs = await batch_requests.async_execute()
     else:
-        with open("header.txt") as f:
-            block_header_rlp = f.read()
-        with open("proof.txt") as f:
-            proof_rlp = f.read()
+        block, proofs = await asyncio.gather(
+            eth_web3.eth.get_block(block_number),
+            _get_proof_async(eth_web3, block_number, slots),
+        )
+
+    if log:
+        print(f"Generating proof for block {block.number}, {block.hash.hex()}")
+    return _finalize_proof(block.number, block, proofs, cache=cache, slots=slots)
+
+
+def submit_proof(proofs, verifier=VERIFIER, cache=None):
+    """
+    :param proofs: (block_header_rlp, proof_rlp), latest proof with block header from `cache` if empty
+    """
+    if not proofs:
+        if cache is None:
+            raise ValueError("No proofs to submit, pass them or a cache to take the latest from")
+        proofs = cache.latest(with_header=True)
+        if proofs is None:
+            raise ValueError("No proofs with block header in cache")
+    block_header_rlp, proof_rlp = proofs
+    assert block_header_rlp, "Proof without block header, verify it by state root"
 
     if isinstance(verifier, str):
         # do web3py
         pass
     else:
-        verifier.prove(bytes.fromhex(block_header_rlp), bytes.fromhex(proof_rlp))
+        verifier.prove(block_header_rlp, proof_rlp)
 
 
 def scrvusd_pps(w3_eth, block_number):
@@ -0,0 +1,285 @@
+"""
+JSON-RPC providers over several ranked endpoints of one network.
+Requests go to the endpoint with the best latency weighted by rank over keep-alive connections
+and fail over to the next one on connection errors and timeouts.
+Endpoints that keep failing or responding slowly are skipped for a while (circuit breaking).
+`eth_getProof` is hedged: sent to the next endpoint as well if the first one is slow,
+so one degraded endpoint does not stall a keeper cycle.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import AsyncHTTPProvider, HTTPProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.providers.base import JSONBaseProvider
+
+import metrics
+
+TIMEOUT = 10  # seconds per request to one endpoint
+SLOW_LATENCY = 3  # seconds, slower responses count as failures of the endpoint
+HEDGE_DELAY = 1  # seconds before duplicating a hedged request to the next endpoint
+HEDGED_METHODS = {"eth_getProof"}
+MAX_FAILURES = 3  # consecutive failures opening the circuit of an endpoint
+COOLDOWN = 60  # seconds an endpoint with open circuit is skipped
+POOL_SIZE = 16  # keep-alive connections per endpoint
+
+INITIAL_LATENCY = 1  # seconds, assumed for endpoints not used yet
+LATENCY_WEIGHT = 0.3  # of the latest request in the moving average
+RANK_WEIGHT = 0.5  # latency penalty per rank, fallbacks are used when notably faster
+
+TRANSPORT_ERRORS = (OSError, asyncio.TimeoutError, aiohttp.ClientError)
+
+
+class Endpoint:
+    def __init__(self, url, rank):
+        self.url = url
+        self.rank = rank
+        self.latency = None  # exponential moving average, seconds
+        self.failures = 0  # consecutive
+        self.open_until = 0  # time.monotonic() until which the circuit is open
+
+    def score(self):
+        latency = INITIAL_LATENCY if self.latency is None else self.latency
+        return latency * (1 + RANK_WEIGHT * self.rank)
+
+    def __repr__(self):
+        return f"Endpoint({self.url}, latency={self.latency}, failures={self.failures})"
+
+
+class EndpointPool:
+    """
+    Ranking and circuit breaking of endpoints, shared between threads.
+    """
+
+    def __init__(
+        self, urls, slow_latency=SLOW_LATENCY, max_failures=MAX_FAILURES, cooldown=COOLDOWN
+    ):
+        """
+        :param urls: Endpoints in order of preference
+        """
+        assert urls, "No endpoints"
+        self.endpoints = [Endpoint(url, rank) for rank, url in enumerate(urls)]
+        self.slow_latency = slow_latency
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+
+    def ordered(self):
+        """
+        :return: Endpoints to try, best first.
+            Ones with open circuit follow as a last resort, earliest to close first.
+        """
+        now = time.monotonic()
+        with self._lock:
+            closed = [endpoint for endpoint in self.endpoints if endpoint.open_until <= now]
+            opened = [endpoint for endpoint in self.endpoints if endpoint.open_until > now]
+            return sorted(closed, key=Endpoint.score) + sorted(
+                opened, key=lambda endpoint: endpoint.open_until
+            )
+
+    def record(self, endpoint, latency=None):
+        """
+        :param latency: Seconds the request took, None if it failed
+        """
+        with self._lock:
+            if latency is not None:
+                endpoint.latency = (
+                    latency
+                    if endpoint.latency is None
+                    else LATENCY_WEIGHT * latency + (1 - LATENCY_WEIGHT) * endpoint.latency
+                )
+            if latency is not None and latency < self.slow_latency:
+                endpoint.failures = 0
+                return
+            endpoint.failures += 1
+            if endpoint.failures >= self.max_failures:
+                endpoint.open_until = time.monotonic() + self.cooldown
+
+
+class FailoverProvider(JSONBaseProvider):
+    """
+    Synchronous provider over `urls`, safe to use from several threads.
+    """
+
+    def __init__(
+        self, urls, timeout=TIMEOUT, hedge_delay=HEDGE_DELAY, pool_size=POOL_SIZE, **kwargs
+    ):
+        """
+        :param urls: Endpoints in order of preference
+        :param kwargs: Circuit breaking parameters of `EndpointPool`
+        """
+        super().__init__()
+        self.pool = EndpointPool(urls, **kwargs)
+        self.hedge_delay = hedge_delay
+        self.providers = {}
+        for url in urls:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            # Retries are replaced by failover
+            self.providers[url] = HTTPProvider(
+                url,
+                request_kwargs={"timeout": timeout},
+                session=session,
+                exception_retry_configuration=None,
+            )
+        self._executor = ThreadPoolExecutor(max_workers=pool_size)
+
+    def best_url(self):
+        return self.pool.ordered()[0].url
+
+    def make_request(self, method, params):
+        metrics.RPC_REQUESTS.inc(method=method)
+        return self._failover(
+            lambda provider: provider.make_request(method, params), method in HEDGED_METHODS
+        )
+
+    def make_batch_request(self, requests):
+        for method, _ in requests:
+            metrics.RPC_REQUESTS.inc(method=method)
+        return self._failover(
+            lambda provider: provider.make_batch_request(requests),
+            any(method in HEDGED_METHODS for method, _ in requests),
+        )
+
+    def _call(self, endpoint, fn):
+        start = time.monotonic()
+        try:
+            response = fn(self.providers[endpoint.url])
+        except TRANSPORT_ERRORS:
+            self.pool.record(endpoint)
+            raise
+        self.pool.record(endpoint, time.monotonic() - start)
+        return response
+
+    def _failover(self, fn, hedged):
+        if hedged:
+            return self._hedge(fn)
+        error = None
+        for endpoint in self.pool.ordered():
+            try:
+                return self._call(endpoint, fn)
+            except TRANSPORT_ERRORS as e:
+                error = e
+        raise error
+
+    def _hedge(self, fn):
+        """
+        Start a request to the next endpoint every `hedge_delay` or on failure, first response wins.
+        """
+        endpoints = iter(self.pool.ordered())
+        futures, error = set(), None
+        while True:
+            endpoint = next(endpoints, None)
+            if endpoint is not None:
+                futures.add(self._executor.submit(self._call, endpoint, fn))
+            elif not futures:
+                raise error
+            done, futures = wait(
+                futures,
+                timeout=None if endpoint is None else self.hedge_delay,
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+
+
+async def close_sessions(provider: AsyncHTTPProvider):
+    """
+    Close aiohttp sessions cached by `provider`,
+    `AsyncHTTPProvider.disconnect()` is not implemented in web3 7.6.
+    """
+    cache = provider._request_session_manager.session_cache
+    for _, session in cache.items():
+        await session.close()
+    cache.clear()
+
+
+class AsyncFailoverProvider(AsyncJSONBaseProvider):
+    """
+    Asynchronous provider over `urls`, see `FailoverProvider`.
+    """
+
+    def __init__(self, urls, timeout=TIMEOUT, hedge_delay=HEDGE_DELAY, **kwargs):
+        super().__init__()
+        self.pool = EndpointPool(urls, **kwargs)
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+        # aiohttp sessions keep connections alive
+        self.providers = {
+            url: AsyncHTTPProvider(url, exception_retry_configuration=None) for url in urls
+        }
+
+    def best_url(self):
+        return self.pool.ordered()[0].url
+
+    async def disconnect(self):
+        for provider in self.providers.values():
+            await close_sessions(provider)
+
+    async def make_request(self, method, params):
+        metrics.RPC_REQUESTS.inc(method=method)
+        return await self._failover(
+            lambda provider: provider.make_request(method, params), method in HEDGED_METHODS
+        )
+
+    async def make_batch_request(self, requests):
+        for method, _ in requests:
+            metrics.RPC_REQUESTS.inc(method=method)
+        return await self._failover(
+            lambda provider: provider.make_batch_request(requests),
+            any(method in HEDGED_METHODS for method, _ in requests),
+        )
+
+    async def _call(self, endpoint, fn):
+        start = time.monotonic()
+        try:
+            response = await asyncio.wait_for(fn(self.providers[endpoint.url]), self.timeout)
+        except TRANSPORT_ERRORS:
+            self.pool.record(endpoint)
+            raise
+        self.pool.record(endpoint, time.monotonic() - start)
+        return response
+
+    async def _failover(self, fn, hedged):
+        if hedged:
+            return await self._hedge(fn)
+        error = None
+        for endpoint in self.pool.ordered():
+            try:
+                return await self._call(endpoint, fn)
+            except TRANSPORT_ERRORS as e:
+                error = e
+        raise error
+
+    async def _hedge(self, fn):
+        endpoints = iter(self.pool.ordered())
+        tasks, error = set(), None
+        try:
+            while True:
+                endpoint = next(endpoints, None)
+                if endpoint is not None:
+                    tasks.add(asyncio.create_task(self._call(endpoint, fn)))
+                elif not tasks:
+                    raise error
+                done, tasks = await asyncio.wait(
+                    tasks,
+                    timeout=None if endpoint is None else self.hedge_delay,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -1,19 +1,28 @@
 # ruff: noqa: F541  # One format to easily change RPCs
+import asyncio
+import functools
 import time
-from time import sleep
 
-from web3 import Web3
+from web3 import AsyncWeb3, Web3
 from web3.contract import Contract
+from web3.exceptions import ContractLogicError
 import json
 import os
 
 from getpass import getpass
 from eth_account import account, Account
 
-from proof import generate_proof
+import metrics
+from blockhash_index import BlockHashIndex
+from proof import ProofCache, generate_proof, generate_proof_async
+from provider import AsyncFailoverProvider, FailoverProvider
+from simulation import Simulator, simulate_call
+from submitter import Submitter
+from trigger import VaultWatcher, fetch_price_params, oracle_price, submitted_params
 
 
 CHAIN = "optimism"  # ALTER
+CHAINS = [CHAIN]  # ALTER, e.g. list(CONTRACTS) to keep all chains updated from one process
 BLOCK_NUMBER = None  # ALTER, None will take latest
 ETH_NETWORK = f"https://eth-mainnet.alchemyapi.io/v2/{os.environ['WEB3_ETHEREUM_MAINNET_ALCHEMY_API_KEY']}/"  # ALTER
 L2_NETWORK = {  # ALTER
@@ -23,11 +32,18 @@ L2_NETWORK = {  # ALTER
     "mantle": f"https://rpc.mantle.xyz/",
     "arbitrum": f"https://arb-mainnet.g.alchemy.com/v2/{os.environ['WEB3_ARBITRUM_MAINNET_ALCHEMY_API_KEY']}/",
     "taiko": f"https://rpc.taiko.xyz/",
-}[CHAIN]
+}
+# Ranked fallbacks used when the endpoints above fail or are slow
+ETH_FALLBACKS = ["https://ethereum-rpc.publicnode.com/"]  # ALTER, must serve eth_getProof
+L2_FALLBACKS = {  # ALTER
+    "optimism": ["https://mainnet.optimism.io/"],
+    "base": ["https://base-rpc.publicnode.com/"],
+    "arbitrum": ["https://arb1.arbitrum.io/rpc"],
+}
 
 SCRVUSD = "0x0655977FEb2f289A4aB78af67BAB0d17aAb84367"
 
-B_ORACLE, S_ORACLE, PROVER = {
+CONTRACTS = {  # B_ORACLE, S_ORACLE, PROVER
     "optimism": (
         "0x988d1037e9608B21050A8EFba0c6C45e01A3Bce7",
         "0xC772063cE3e622B458B706Dd2e36309418A1aE42",
@@ -49,12 +65,14 @@ B_ORACLE, S_ORACLE, PROVER = {
         "0x09F8D940EAD55853c51045bcbfE67341B686C071",
     ),
     # "arbitrum": ("0x47ca04Ee05f167583122833abfb0f14aC5677Ee4", "0x3195A313F409714e1f173ca095Dba7BfBb5767F7", "0x8Fb3Ec8f2d1Dc089E70CD61f1E49496d443B2124"), redeploy?
-    "taiko": {
+    "taiko": (
         "0x1670000000000000000000000000000000000005",
         "0x070A5C8a99002F50C18B52B90e938BC477611b16",
         "0x004A476B5B76738E34c86C7144554B9d34402F13",
-    },
-}[CHAIN]
+    ),
+}
+# Provers verifying by state root of blockhash oracle, no block header is submitted then
+STATE_ROOT_PROVERS = {}  # ALTER, {chain: address}, e.g. ScrvusdVerifierV1
 VERSION = {
     "optimism": "ScrvusdOracle",
     "base": "ScrvusdOracle",
@@ -62,30 +80,27 @@ VERSION = {
     "mantle": "ScrvusdOracle",
     # "arbitrum": "ScrvusdOracle",
     "taiko": "ScrvusdOracleV1",
-}[CHAIN]
+}
 
-last_update = 0  # time.time()
 REL_CHANGE_THRESHOLD = 1.00005  # 0.5 bps, should be >1
-
-APPLY_BLOCK_HASH = Web3.keccak(text="ApplyBlockHash(uint256,bytes32)").hex()
-COMMIT_BLOCK_HASH = Web3.keccak(text="CommitBlockHash(address,uint256,bytes32)").hex()
+PROOF_REUSE_BLOCKS = 25  # ALTER, max blocks to go back to share one proof between chains
+PROOF_CACHE = "scrvusd_proofs.sqlite"  # ALTER, None to keep proofs in memory only
+PROVE_GAS = (
+    1_000_000  # ALTER, max gas of prove() after pending apply(), limit is taken from simulation
+)
+TX_TIMEOUT = 60  # ALTER, seconds before replacing a pending transaction with bumped fees
+SIMULATION = "fork"  # ALTER, "fork" of L2, "call" for eth_call (no pending apply()) or None
+SKIP_DELAY = 600  # ALTER, seconds to wait after a simulation found the update not worth it
+DRY_RUN = False  # ALTER, only simulate updates without submitting anything
+METRICS_PORT = None  # ALTER, e.g. 9100 to serve Prometheus metrics
+JSON_LOGS = False  # ALTER, structured logs with stage durations
+BLOCKHASH_INDEX = "scrvusd_blockhashes.sqlite"  # ALTER, None to keep the index in memory only
+KNOWN_BLOCK_AGE = 50  # ALTER, max mainnet blocks behind head to prove a known blockhash
 
 
-eth_web3 = Web3(
-    provider=Web3.HTTPProvider(
-        ETH_NETWORK,
-        # {"verify_ssl": False},
-    ),
-    # modules={"eth": (AsyncEth,)},
-)
+eth_web3 = Web3(provider=FailoverProvider([ETH_NETWORK, *ETH_FALLBACKS]))
 
-l2_web3 = Web3(
-    provider=Web3.HTTPProvider(
-        L2_NETWORK,
-        # {"verify_ssl": False},
-    ),
-    # modules={"eth": (AsyncEth,)},
-)
+eth_async_web3 = AsyncWeb3(provider=AsyncFailoverProvider([ETH_NETWORK, *ETH_FALLBACKS]))
 
 
 def account_load_pkey(fname):
@@ -97,24 +112,78 @@ def account_load_pkey(fname):
 
 wallet = Account.from_key(account_load_pkey("curve"))  # ALTER
 
+proof_cache = ProofCache(path=PROOF_CACHE)
+
+
+class Chain:
+    """
+    L2 network with scrvUSD oracle contracts to keep updated.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.version = VERSION[name]
+        self.last_update = 0  # time.time()
+        self.block_number = 0  # last block proven
+        self.delay_until = 0  # time.time() before which updates are not attempted
+        self.oracle_params = None  # (params, ts) oracle was updated with
+
+        self.l2_web3 = Web3(
+            provider=FailoverProvider([L2_NETWORK[name], *L2_FALLBACKS.get(name, [])]),
+        )
+        self.submitter = Submitter(self.l2_web3, wallet, timeout=TX_TIMEOUT)
+
+        b_oracle, s_oracle, prover = CONTRACTS[name]
+        # fmt: off
+        if name in ["taiko"]:
+            self.boracle = self.l2_web3.eth.contract(b_oracle, abi=[{'inputs': [], 'name': 'FUNC_NOT_IMPLEMENTED', 'type': 'error'}, {'inputs': [], 'name': 'INVALID_PAUSE_STATUS', 'type': 'error'}, {'inputs': [], 'name': 'LTP_INVALID_ACCOUNT_PROOF', 'type': 'error'}, {'inputs': [], 'name': 'LTP_INVALID_INCLUSION_PROOF', 'type': 'error'}, {'inputs': [], 'name': 'REENTRANT_CALL', 'type': 'error'}, {'inputs': [], 'name': 'RESOLVER_DENIED', 'type': 'error'}, {'inputs': [], 'name': 'RESOLVER_INVALID_MANAGER', 'type': 'error'}, {'inputs': [], 'name': 'RESOLVER_UNEXPECTED_CHAINID', 'type': 'error'}, {'inputs': [{'internalType': 'uint64', 'name': 'chainId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': 'name', 'type': 'bytes32'}], 'name': 'RESOLVER_ZERO_ADDR', 'type': 'error'}, {'inputs': [], 'name': 'SS_EMPTY_PROOF', 'type': 'error'}, {'inputs': [], 'name': 'SS_INVALID_HOPS_WITH_LOOP', 'type': 'error'}, {'inputs': [], 'name': 'SS_INVALID_LAST_HOP_CHAINID', 'type': 'error'}, {'inputs': [], 'name': 'SS_INVALID_MID_HOP_CHAINID', 'type': 'error'}, {'inputs': [], 'name': 'SS_INVALID_STATE', 'type': 'error'}, {'inputs': [], 'name': 'SS_SIGNAL_NOT_FOUND', 'type': 'error'}, {'inputs': [], 'name': 'SS_UNAUTHORIZED', 'type': 'error'}, {'inputs': [], 'name': 'ZERO_ADDRESS', 'type': 'error'}, {'inputs': [], 'name': 'ZERO_VALUE', 'type': 'error'}, {'anonymous': False, 'inputs': [{'indexed': False, 'internalType': 'address', 'name': 'previousAdmin', 'type': 'address'}, {'indexed': False, 'internalType': 'address', 'name': 'newAdmin', 'type': 'address'}], 'name': 'AdminChanged', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'internalType': 'address', 'name': 'addr', 'type': 'address'}, {'indexed': False, 'internalType': 'bool', 'name': 'authorized', 'type': 'bool'}], 'name': 'Authorized', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'internalType': 'address', 'name': 'beacon', 'type': 'address'}], 'name': 'BeaconUpgraded', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'internalType': 'uint64', 'name': 'chainId', 'type': 'uint64'}, {'indexed': True, 'internalType': 'uint64', 'name': 'blockId', 'type': 'uint64'}, {'indexed': True, 'internalType': 'bytes32', 'name': 'kind', 'type': 'bytes32'}, {'indexed': False, 'internalType': 'bytes32', 'name': 'data', 'type': 'bytes32'}, {'indexed': False, 'internalType': 'bytes32', 'name': 'signal', 'type': 'bytes32'}], 'name': 'ChainDataSynced', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': False, 'internalType': 'uint8', 'name': 'version', 'type': 'uint8'}], 'name': 'Initialized', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'internalType': 'address', 'name': 'previousOwner', 'type': 'address'}, {'indexed': True, 'internalType': 'address', 'name': 'newOwner', 'type': 'address'}], 'name': 'OwnershipTransferStarted', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'internalType': 'address', 'name': 'previousOwner', 'type': 'address'}, {'indexed': True, 'internalType': 'address', 'name': 'newOwner', 'type': 'address'}], 'name': 'OwnershipTransferred', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': False, 'internalType': 'address', 'name': 'account', 'type': 'address'}], 'name': 'Paused', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': False, 'internalType': 'address', 'name': 'app', 'type': 'address'}, {'indexed': False, 'internalType': 'bytes32', 'name': 'signal', 'type': 'bytes32'}, {'indexed': False, 'internalType': 'bytes32', 'name': 'slot', 'type': 'bytes32'}, {'indexed': False, 'internalType': 'bytes32', 'name': 'value', 'type': 'bytes32'}], 'name': 'SignalSent', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': False, 'internalType': 'address', 'name': 'account', 'type': 'address'}], 'name': 'Unpaused', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'internalType': 'address', 'name': 'implementation', 'type': 'address'}], 'name': 'Upgraded', 'type': 'event'}, {'inputs': [], 'name': 'acceptOwnership', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'addressManager', 'outputs': [{'internalType': 'address', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'address', 'name': '_addr', 'type': 'address'}, {'internalType': 'bool', 'name': '_authorize', 'type': 'bool'}], 'name': 'authorize', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'address', 'name': '_app', 'type': 'address'}, {'internalType': 'bytes32', 'name': '_signal', 'type': 'bytes32'}], 'name': 'getSignalSlot', 'outputs': [{'internalType': 'bytes32', 'name': '', 'type': 'bytes32'}], 'stateMutability': 'pure', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': '_kind', 'type': 'bytes32'}, {'internalType': 'uint64', 'name': '_blockId', 'type': 'uint64'}], 'name': 'getSyncedChainData', 'outputs': [{'internalType': 'uint64', 'name': 'blockId_', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': 'chainData_', 'type': 'bytes32'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'impl', 'outputs': [{'internalType': 'address', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'inNonReentrant', 'outputs': [{'internalType': 'bool', 'name': '', 'type': 'bool'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'address', 'name': '_owner', 'type': 'address'}, {'internalType': 'address', 'name': '_addressManager', 'type': 'address'}], 'name': 'init', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'internalType': 'address', 'name': 'addr', 'type': 'address'}], 'name': 'isAuthorized', 'outputs': [{'internalType': 'bool', 'name': 'authorized', 'type': 'bool'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': '_kind', 'type': 'bytes32'}, {'internalType': 'uint64', 'name': '_blockId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': '_chainData', 'type': 'bytes32'}], 'name': 'isChainDataSynced', 'outputs': [{'internalType': 'bool', 'name': '', 'type': 'bool'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'address', 'name': '_app', 'type': 'address'}, {'internalType': 'bytes32', 'name': '_signal', 'type': 'bytes32'}], 'name': 'isSignalSent', 'outputs': [{'internalType': 'bool', 'name': '', 'type': 'bool'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'lastUnpausedAt', 'outputs': [{'internalType': 'uint64', 'name': '', 'type': 'uint64'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'owner', 'outputs': [{'internalType': 'address', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'pause', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'paused', 'outputs': [{'internalType': 'bool', 'name': '', 'type': 'bool'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'pendingOwner', 'outputs': [{'internalType': 'address', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'address', 'name': '_app', 'type': 'address'}, {'internalType': 'bytes32', 'name': '_signal', 'type': 'bytes32'}, {'internalType': 'bytes', 'name': '_proof', 'type': 'bytes'}], 'name': 'proveSignalReceived', 'outputs': [{'internalType': 'uint256', 'name': 'numCacheOps_', 'type': 'uint256'}], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'proxiableUUID', 'outputs': [{'internalType': 'bytes32', 'name': '', 'type': 'bytes32'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'renounceOwnership', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': '_name', 'type': 'bytes32'}, {'internalType': 'bool', 'name': '_allowZeroAddress', 'type': 'bool'}], 'name': 'resolve', 'outputs': [{'internalType': 'addresspayable', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'bytes32', 'name': '_name', 'type': 'bytes32'}, {'internalType': 'bool', 'name': '_allowZeroAddress', 'type': 'bool'}], 'name': 'resolve', 'outputs': [{'internalType': 'addresspayable', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'bytes32', 'name': '_signal', 'type': 'bytes32'}], 'name': 'sendSignal', 'outputs': [{'internalType': 'bytes32', 'name': '', 'type': 'bytes32'}], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': '_kind', 'type': 'bytes32'}, {'internalType': 'uint64', 'name': '_blockId', 'type': 'uint64'}], 'name': 'signalForChainData', 'outputs': [{'internalType': 'bytes32', 'name': '', 'type': 'bytes32'}], 'stateMutability': 'pure', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': '_kind', 'type': 'bytes32'}, {'internalType': 'uint64', 'name': '_blockId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': '_chainData', 'type': 'bytes32'}], 'name': 'syncChainData', 'outputs': [{'internalType': 'bytes32', 'name': '', 'type': 'bytes32'}], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': 'chainId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': 'kind', 'type': 'bytes32'}], 'name': 'topBlockId', 'outputs': [{'internalType': 'uint64', 'name': 'blockId', 'type': 'uint64'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'address', 'name': 'newOwner', 'type': 'address'}], 'name': 'transferOwnership', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'unpause', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'internalType': 'address', 'name': 'newImplementation', 'type': 'address'}], 'name': 'upgradeTo', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'internalType': 'address', 'name': 'newImplementation', 'type': 'address'}, {'internalType': 'bytes', 'name': 'data', 'type': 'bytes'}], 'name': 'upgradeToAndCall', 'outputs': [], 'stateMutability': 'payable', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'address', 'name': '_app', 'type': 'address'}, {'internalType': 'bytes32', 'name': '_signal', 'type': 'bytes32'}, {'internalType': 'bytes', 'name': '_proof', 'type': 'bytes'}], 'name': 'verifySignalReceived', 'outputs': [], 'stateMutability': 'view', 'type': 'function'}])
+            self.prover = self.l2_web3.eth.contract(prover, abi=[{'inputs': [{'internalType': 'address', 'name': '_scrvusd_oracle', 'type': 'address'}], 'stateMutability': 'nonpayable', 'type': 'constructor'}, {'inputs': [], 'name': 'SCRVUSD_ORACLE', 'outputs': [{'internalType': 'address', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'SIGNAL_SERVICE', 'outputs': [{'internalType': 'address', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_block_number', 'type': 'uint64'}, {'internalType': 'bytes', 'name': '_proof_rlp', 'type': 'bytes'}], 'name': 'prove', 'outputs': [{'internalType': 'uint256', 'name': '', 'type': 'uint256'}], 'stateMutability': 'nonpayable', 'type': 'function'}])
+        else:
+            self.boracle = self.l2_web3.eth.contract(b_oracle, abi=[{'name': 'CommitBlockHash', 'inputs': [{'name': 'committer', 'type': 'address', 'indexed': True}, {'name': 'number', 'type': 'uint256', 'indexed': True}, {'name': 'hash', 'type': 'bytes32', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'ApplyBlockHash', 'inputs': [{'name': 'number', 'type': 'uint256', 'indexed': True}, {'name': 'hash', 'type': 'bytes32', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'stateMutability': 'view', 'type': 'function', 'name': 'get_block_hash', 'inputs': [{'name': '_number', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'bytes32'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'get_state_root', 'inputs': [{'name': '_number', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'bytes32'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'commit', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'apply', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'block_hash', 'inputs': [{'name': 'arg0', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'bytes32'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'commitments', 'inputs': [{'name': 'arg0', 'type': 'address'}, {'name': 'arg1', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'bytes32'}]}])
+            self.blockhashes = BlockHashIndex(self.l2_web3, b_oracle, path=BLOCKHASH_INDEX)
+            self.prover = self.l2_web3.eth.contract(prover, abi=[{"inputs": [{"internalType": "bytes", "name": "_block_header_rlp", "type": "bytes"}, {"internalType": "bytes", "name": "_proof_rlp", "type": "bytes"}], "name": "prove", "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}], "stateMutability": "nonpayable", "type": "function"}])
+        self.state_root_prover = None
+        if name in STATE_ROOT_PROVERS:
+            self.state_root_prover = self.l2_web3.eth.contract(STATE_ROOT_PROVERS[name], abi=[{"inputs": [{"internalType": "uint256", "name": "_block_number", "type": "uint256"}, {"internalType": "bytes", "name": "_proof_rlp", "type": "bytes"}], "name": "verifyScrvusdByStateRoot", "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}], "stateMutability": "nonpayable", "type": "function"}])
+        if self.version == "ScrvusdOracle":
+            self.soracle = self.l2_web3.eth.contract(s_oracle, abi=[{'anonymous': False, 'inputs': [{'indexed': False, 'name': 'new_price', 'type': 'uint256'}, {'indexed': False, 'name': 'at', 'type': 'uint256'}], 'name': 'PriceUpdate', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': False, 'name': 'prover', 'type': 'address'}], 'name': 'SetProver', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'name': 'previous_owner', 'type': 'address'}, {'indexed': True, 'name': 'new_owner', 'type': 'address'}], 'name': 'OwnershipTransferred', 'type': 'event'}, {'inputs': [{'name': 'new_owner', 'type': 'address'}], 'name': 'transfer_ownership', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'renounce_ownership', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'owner', 'outputs': [{'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'pricePerShare', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': 'ts', 'type': 'uint256'}], 'name': 'pricePerShare', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'pricePerAsset', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': 'ts', 'type': 'uint256'}], 'name': 'pricePerAsset', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'price_oracle', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': 'i', 'type': 'uint256'}], 'name': 'price_oracle', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_parameters', 'type': 'uint256[8]'}], 'name': 'update_price', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'name': '_max_acceleration', 'type': 'uint256'}], 'name': 'set_max_acceleration', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'name': '_prover', 'type': 'address'}], 'name': 'set_prover', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'version', 'outputs': [{'name': '', 'type': 'string'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'prover', 'outputs': [{'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'price', 'outputs': [{'components': [{'name': 'previous', 'type': 'uint256'}, {'name': 'future', 'type': 'uint256'}], 'name': '', 'type': 'tuple'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'time', 'outputs': [{'components': [{'name': 'previous', 'type': 'uint256'}, {'name': 'future', 'type': 'uint256'}], 'name': '', 'type': 'tuple'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'max_acceleration', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_initial_price', 'type': 'uint256'}, {'name': '_max_acceleration', 'type': 'uint256'}], 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'constructor'}])
+        elif self.version == "ScrvusdOracleV1":
+            self.soracle = self.l2_web3.eth.contract(s_oracle, abi=[{'anonymous': False, 'inputs': [{'indexed': False, 'name': 'new_price', 'type': 'uint256'}, {'indexed': False, 'name': 'price_params_ts', 'type': 'uint256'}], 'name': 'PriceUpdate', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': False, 'name': 'prover', 'type': 'address'}], 'name': 'SetProver', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'name': 'previous_owner', 'type': 'address'}, {'indexed': True, 'name': 'new_owner', 'type': 'address'}], 'name': 'OwnershipTransferred', 'type': 'event'}, {'inputs': [{'name': 'new_owner', 'type': 'address'}], 'name': 'transfer_ownership', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'renounce_ownership', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'owner', 'outputs': [{'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'price_v0', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_i', 'type': 'uint256'}], 'name': 'price_v0', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'price_v1', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_i', 'type': 'uint256'}], 'name': 'price_v1', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'raw_price', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_i', 'type': 'uint256'}], 'name': 'raw_price', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_i', 'type': 'uint256'}, {'name': '_ts', 'type': 'uint256'}], 'name': 'raw_price', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_parameters', 'type': 'uint256[7]'}, {'name': 'ts', 'type': 'uint256'}], 'name': 'update_price', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'name': '_max_acceleration', 'type': 'uint256'}], 'name': 'set_max_acceleration', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'name': '_prover', 'type': 'address'}], 'name': 'set_prover', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'version', 'outputs': [{'name': '', 'type': 'string'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'prover', 'outputs': [{'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'max_acceleration', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_initial_price', 'type': 'uint256'}, {'name': '_max_acceleration', 'type': 'uint256'}], 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'constructor'}])
+        # fmt: on
+
+    def log(self, message, **fields):
+        if metrics.json_logs:
+            metrics.log(message, chain=self.name, **fields)
+        else:
+            print(f"[{self.name}] {message}")
+
+
+def _timed(stage):
+    """
+    Record duration of `fn(chain, ...)` as `stage` of the chain.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(chain, *args, **kwargs):
+            with metrics.timed(stage, chain.name):
+                return fn(chain, *args, **kwargs)
+
+        return wrapper
 
-def _retrieve_last_applied_block(baddr, logs) -> (int, int):
-    block_number = -1
-    apply_block_number = -1
-    for log in logs:
-        if log["address"] != baddr:
-            continue
-        if log.get("topics") and log["topics"][0].hex() == APPLY_BLOCK_HASH:
-            block_number = max(block_number, int(log["topics"][1].hex(), 16))
-            apply_block_number = max(apply_block_number, int(log["blockNumber"]))
-        if log.get("event") and log["event"] == "ApplyBlockHash":
-            block_number = max(block_number, log["args"]["number"])
-            apply_block_number = max(apply_block_number, int(log["blockNumber"]))
-    return block_number, apply_block_number
+    return decorator
 
 
-def fetch_block_number(boracle):
-    if CHAIN in ["taiko"]:
+def _observe_proof(proofs):
+    if proofs[0]:
+        metrics.PROOF_BYTES.observe(len(proofs[0]), part="block_header")
+    metrics.PROOF_BYTES.observe(len(proofs[1]), part="state_proof")
+
+
+@_timed("fetch_block_number")
+def fetch_block_number(chain):
+    l2_web3, boracle = chain.l2_web3, chain.boracle
+    if chain.name in ["taiko"]:
         # Fetch last available
         to = l2_web3.eth.block_number
         logs = boracle.events.ChainDataSynced().get_logs(
@@ -127,96 +196,304 @@ def fetch_block_number(boracle):
         )
         block_number = max(map(lambda log: log["args"]["blockId"], logs))
         time.sleep(1)
-        print(f"Fetched block: {block_number}")
+        chain.log(f"Fetched block: {block_number}")
     else:
-        # Apply latest available blockhash
-        tx = boracle.functions.apply().build_transaction(
-            {
-                "from": wallet.address,
-                "nonce": l2_web3.eth.get_transaction_count(wallet.address),
-            }
-        )
-        signed_tx = l2_web3.eth.account.sign_transaction(tx, private_key=wallet.key)
-        tx_hash = l2_web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        l2_web3.eth.wait_for_transaction_receipt(tx_hash)
-        tx_receipt = l2_web3.eth.get_transaction_receipt(tx_hash)
-        block_number, _ = _retrieve_last_applied_block(boracle.address, tx_receipt["logs"])
+        block_number = known_block_number(chain)
+        if block_number is not None:
+            chain.log(f"Fetched known block: {block_number}")
+            return block_number
+        # Latest available blockhash, applied by `prove()` if needed
+        block_number = boracle.functions.apply().call({"from": wallet.address})
         assert block_number > 0, "Applied block number not retrieved"
-        print(f"Applied block: {block_number}")
-        time.sleep(1)
+        chain.log(f"Fetched block: {block_number}")
     return block_number
 
 
-def prove(boracle, prover, block_number=None):
+def known_block_number(chain):
+    """
+    Find the latest block within `KNOWN_BLOCK_AGE` that blockhash oracle of `chain` already knows,
+    so no `apply()` is needed to prove it. Blocks not newer than the last proven one are skipped.
+    :return: Block number or None
+    """
+    chain.blockhashes.sync()
+    min_block_number = max(eth_web3.eth.block_number - KNOWN_BLOCK_AGE, chain.block_number + 1)
+    for block_number, applied in chain.blockhashes.candidates(min_block_number):
+        if applied or has_block(chain, block_number):
+            return block_number
+    return None
+
+
+def has_block(chain, block_number) -> bool:
+    """
+    Check whether blockhash oracle of `chain` knows `block_number`.
+    """
+    if chain.name in ["taiko"]:
+        return False  # only synced blocks are known, can not query arbitrary one
+    if chain.blockhashes.is_applied(block_number):
+        return True
+    try:
+        block_hash = chain.boracle.functions.get_block_hash(block_number).call()
+    except ContractLogicError:
+        return False
+    if block_hash == bytes(32):
+        return False
+    chain.blockhashes.mark_applied(block_number, block_hash)
+    return True
+
+
+def has_state_root(chain, block_number) -> bool:
+    """
+    Check whether `chain` can verify `block_number` by state root, which needs no block header.
+    """
+    if chain.state_root_prover is None:
+        return False
+    try:
+        return chain.boracle.functions.get_state_root(block_number).call() != bytes(32)
+    except ContractLogicError:
+        return False
+
+
+def needs_header(chain, by_state_root) -> bool:
+    """
+    :return: Whether proving to `chain` needs block header
+    """
+    return chain.name not in ["taiko"] and not by_state_root
+
+
+def simulate(chain, txs):
+    """
+    Simulate `txs` of `chain` according to `SIMULATION`.
+    :return: Simulation of the last transaction, None if not simulated
+    """
+    if SIMULATION == "fork" or (SIMULATION == "call" and len(txs) > 1):
+        # eth_call can not follow `apply()` that is not mined yet
+        return Simulator.fork(chain.l2_web3.provider.best_url()).simulate(txs)
+    if SIMULATION == "call":
+        return simulate_call(chain.l2_web3, txs[-1])
+    return None
+
+
+@_timed("prove")
+def prove(chain, block_number=None, proofs=None, by_state_root=None) -> bool:
+    """
+    Prove scrvUSD state of `block_number` to `chain` if simulation finds it worth it.
+    Verification by state root is preferred, it needs neither block header nor `apply()`.
+    :param by_state_root: Whether to verify by state root, checked with `has_state_root()` if None
+    :return: Whether the proof was submitted
+    """
+    boracle, prover = chain.boracle, chain.prover
     if not block_number:
-        block_number = fetch_block_number(boracle)
+        block_number = fetch_block_number(chain)
+    if by_state_root is None:
+        by_state_root = has_state_root(chain, block_number)
 
-    proofs = generate_proof(eth_web3, block_number)
+    if not proofs:
+        with metrics.timed("generate_proof", chain.name):
+            proofs = generate_proof(
+                eth_web3,
+                block_number,
+                cache=proof_cache,
+                with_header=needs_header(chain, by_state_root),
+            )
+        _observe_proof(proofs)
 
-    if CHAIN in ["taiko"]:
-        if isinstance(prover, Contract):
-            tx = prover.functions.prove(block_number, bytes.fromhex(proofs[1])).build_transaction(
-                {
-                    "from": wallet.address,
-                    "nonce": l2_web3.eth.get_transaction_count(wallet.address),
-                }
+    txs = []
+    if chain.name in ["taiko"]:
+        if not isinstance(prover, Contract):
+            prover.prove(block_number, proofs[1])
+            chain.log(f"Submitted proof")
+            return True
+        txs.append(
+            prover.functions.prove(block_number, proofs[1]).build_transaction(
+                {"from": wallet.address}
             )
-            signed_tx = l2_web3.eth.account.sign_transaction(tx, private_key=wallet.key)
-            l2_web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            l2_web3.eth.wait_for_transaction_receipt(signed_tx)
-        else:
-            prover.prove(block_number, bytes.fromhex(proofs[1]))
+        )
+    elif by_state_root:
+        txs.append(
+            chain.state_root_prover.functions.verifyScrvusdByStateRoot(
+                block_number, proofs[1]
+            ).build_transaction({"from": wallet.address})
+        )
     else:
-        tx = prover.functions.prove(
-            bytes.fromhex(proofs[0]), bytes.fromhex(proofs[1])
-        ).build_transaction(
-            {
-                "from": wallet.address,
-                "nonce": l2_web3.eth.get_transaction_count(wallet.address),
-            }
+        if not has_block(chain, block_number):
+            txs.append(boracle.functions.apply().build_transaction({"from": wallet.address}))
+        # Sent after pending `apply()`, so gas can not be estimated, capped until simulated
+        txs.append(
+            prover.functions.prove(proofs[0], proofs[1]).build_transaction(
+                {"from": wallet.address, "gas": PROVE_GAS}
+            )
         )
-        signed_tx = l2_web3.eth.account.sign_transaction(tx, private_key=wallet.key)
-        l2_web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        l2_web3.eth.wait_for_transaction_receipt(signed_tx)
-    print(f"Submitted proof")
 
+    simulation = simulate(chain, txs)
+    if simulation is not None:
+        chain.log(f"Simulated block {block_number}: {simulation}")
+        if not simulation.worth_submitting():
+            chain.delay_until = time.time() + SKIP_DELAY
+            return False
+        if len(txs) > 1 and simulation.gas_used is not None:
+            txs[-1]["gas"] = min(simulation.gas_limit(), PROVE_GAS)
+    if DRY_RUN:
+        return False
 
-def time_to_update(scrvusd, soracle):
-    # can be any relative change or time
-    if time.time() - last_update >= 4 * 3600:  # Every 4 hours
-        return True
-    price = scrvusd.functions.pricePerShare().call()
-    if VERSION == "ScrvusdOracle":
-        oracle_price = soracle.functions.price().call()[1]  # take price.future = latest set
-    elif VERSION == "ScrvusdOracleV1":
-        oracle_price = soracle.functions.raw_price().call()
-    return price / oracle_price > REL_CHANGE_THRESHOLD
+    # Sent back-to-back, `prove()` follows `apply()` without waiting for its receipt
+    pending = [chain.submitter.send(tx) for tx in txs]
+    receipts = [chain.submitter.wait(tx) for tx in pending]
+    gas_used = sum(receipt["gasUsed"] for receipt in receipts)
+    metrics.GAS_USED.inc(gas_used, chain=chain.name)
+    receipt = receipts[-1]
+    assert receipt["status"] == 1, f"Proof reverted: {receipt['transactionHash'].hex()}"
+    chain.log(f"Submitted proof", block_number=block_number, gas_used=gas_used)
+    return True
 
 
-def loop():
-    # fmt: off
-    scrvusd = eth_web3.eth.contract(SCRVUSD, abi=[{'name': 'Deposit', 'inputs': [{'name': 'sender', 'type': 'address', 'indexed': True}, {'name': 'owner', 'type': 'address', 'indexed': True}, {'name': 'assets', 'type': 'uint256', 'indexed': False}, {'name': 'shares', 'type': 'uint256', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'Withdraw', 'inputs': [{'name': 'sender', 'type': 'address', 'indexed': True}, {'name': 'receiver', 'type': 'address', 'indexed': True}, {'name': 'owner', 'type': 'address', 'indexed': True}, {'name': 'assets', 'type': 'uint256', 'indexed': False}, {'name': 'shares', 'type': 'uint256', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'Transfer', 'inputs': [{'name': 'sender', 'type': 'address', 'indexed': True}, {'name': 'receiver', 'type': 'address', 'indexed': True}, {'name': 'value', 'type': 'uint256', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'Approval', 'inputs': [{'name': 'owner', 'type': 'address', 'indexed': True}, {'name': 'spender', 'type': 'address', 'indexed': True}, {'name': 'value', 'type': 'uint256', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'StrategyChanged', 'inputs': [{'name': 'strategy', 'type': 'address', 'indexed': True}, {'name': 'change_type', 'type': 'uint256', 'indexed': True}], 'anonymous': False, 'type': 'event'}, {'name': 'StrategyReported', 'inputs': [{'name': 'strategy', 'type': 'address', 'indexed': True}, {'name': 'gain', 'type': 'uint256', 'indexed': False}, {'name': 'loss', 'type': 'uint256', 'indexed': False}, {'name': 'current_debt', 'type': 'uint256', 'indexed': False}, {'name': 'protocol_fees', 'type': 'uint256', 'indexed': False}, {'name': 'total_fees', 'type': 'uint256', 'indexed': False}, {'name': 'total_refunds', 'type': 'uint256', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'DebtUpdated', 'inputs': [{'name': 'strategy', 'type': 'address', 'indexed': True}, {'name': 'current_debt', 'type': 'uint256', 'indexed': False}, {'name': 'new_debt', 'type': 'uint256', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'RoleSet', 'inputs': [{'name': 'account', 'type': 'address', 'indexed': True}, {'name': 'role', 'type': 'uint256', 'indexed': True}], 'anonymous': False, 'type': 'event'}, {'name': 'UpdateFutureRoleManager', 'inputs': [{'name': 'future_role_manager', 'type': 'address', 'indexed': True}], 'anonymous': False, 'type': 'event'}, {'name': 'UpdateRoleManager', 'inputs': [{'name': 'role_manager', 'type': 'address', 'indexed': True}], 'anonymous': False, 'type': 'event'}, {'name': 'UpdateAccountant', 'inputs': [{'name': 'accountant', 'type': 'address', 'indexed': True}], 'anonymous': False, 'type': 'event'}, {'name': 'UpdateDepositLimitModule', 'inputs': [{'name': 'deposit_limit_module', 'type': 'address', 'indexed': True}], 'anonymous': False, 'type': 'event'}, {'name': 'UpdateWithdrawLimitModule', 'inputs': [{'name': 'withdraw_limit_module', 'type': 'address', 'indexed': True}], 'anonymous': False, 'type': 'event'}, {'name': 'UpdateDefaultQueue', 'inputs': [{'name': 'new_default_queue', 'type': 'address[]', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'UpdateUseDefaultQueue', 'inputs': [{'name': 'use_default_queue', 'type': 'bool', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'UpdateAutoAllocate', 'inputs': [{'name': 'auto_allocate', 'type': 'bool', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'UpdatedMaxDebtForStrategy', 'inputs': [{'name': 'sender', 'type': 'address', 'indexed': True}, {'name': 'strategy', 'type': 'address', 'indexed': True}, {'name': 'new_debt', 'type': 'uint256', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'UpdateDepositLimit', 'inputs': [{'name': 'deposit_limit', 'type': 'uint256', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'UpdateMinimumTotalIdle', 'inputs': [{'name': 'minimum_total_idle', 'type': 'uint256', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'UpdateProfitMaxUnlockTime', 'inputs': [{'name': 'profit_max_unlock_time', 'type': 'uint256', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'DebtPurchased', 'inputs': [{'name': 'strategy', 'type': 'address', 'indexed': True}, {'name': 'amount', 'type': 'uint256', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'Shutdown', 'inputs': [], 'anonymous': False, 'type': 'event'}, {'stateMutability': 'nonpayable', 'type': 'constructor', 'inputs': [], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'initialize', 'inputs': [{'name': 'asset', 'type': 'address'}, {'name': 'name', 'type': 'string'}, {'name': 'symbol', 'type': 'string'}, {'name': 'role_manager', 'type': 'address'}, {'name': 'profit_max_unlock_time', 'type': 'uint256'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'setName', 'inputs': [{'name': 'name', 'type': 'string'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'setSymbol', 'inputs': [{'name': 'symbol', 'type': 'string'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'set_accountant', 'inputs': [{'name': 'new_accountant', 'type': 'address'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'set_default_queue', 'inputs': [{'name': 'new_default_queue', 'type': 'address[]'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'set_use_default_queue', 'inputs': [{'name': 'use_default_queue', 'type': 'bool'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'set_auto_allocate', 'inputs': [{'name': 'auto_allocate', 'type': 'bool'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'set_deposit_limit', 'inputs': [{'name': 'deposit_limit', 'type': 'uint256'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'set_deposit_limit', 'inputs': [{'name': 'deposit_limit', 'type': 'uint256'}, {'name': 'override', 'type': 'bool'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'set_deposit_limit_module', 'inputs': [{'name': 'deposit_limit_module', 'type': 'address'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'set_deposit_limit_module', 'inputs': [{'name': 'deposit_limit_module', 'type': 'address'}, {'name': 'override', 'type': 'bool'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'set_withdraw_limit_module', 'inputs': [{'name': 'withdraw_limit_module', 'type': 'address'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'set_minimum_total_idle', 'inputs': [{'name': 'minimum_total_idle', 'type': 'uint256'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'setProfitMaxUnlockTime', 'inputs': [{'name': 'new_profit_max_unlock_time', 'type': 'uint256'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'set_role', 'inputs': [{'name': 'account', 'type': 'address'}, {'name': 'role', 'type': 'uint256'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'add_role', 'inputs': [{'name': 'account', 'type': 'address'}, {'name': 'role', 'type': 'uint256'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'remove_role', 'inputs': [{'name': 'account', 'type': 'address'}, {'name': 'role', 'type': 'uint256'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'transfer_role_manager', 'inputs': [{'name': 'role_manager', 'type': 'address'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'accept_role_manager', 'inputs': [], 'outputs': []}, {'stateMutability': 'view', 'type': 'function', 'name': 'isShutdown', 'inputs': [], 'outputs': [{'name': '', 'type': 'bool'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'unlockedShares', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'pricePerShare', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'get_default_queue', 'inputs': [], 'outputs': [{'name': '', 'type': 'address[]'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'process_report', 'inputs': [{'name': 'strategy', 'type': 'address'}], 'outputs': [{'name': '', 'type': 'uint256'}, {'name': '', 'type': 'uint256'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'buy_debt', 'inputs': [{'name': 'strategy', 'type': 'address'}, {'name': 'amount', 'type': 'uint256'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'add_strategy', 'inputs': [{'name': 'new_strategy', 'type': 'address'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'add_strategy', 'inputs': [{'name': 'new_strategy', 'type': 'address'}, {'name': 'add_to_queue', 'type': 'bool'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'revoke_strategy', 'inputs': [{'name': 'strategy', 'type': 'address'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'force_revoke_strategy', 'inputs': [{'name': 'strategy', 'type': 'address'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'update_max_debt_for_strategy', 'inputs': [{'name': 'strategy', 'type': 'address'}, {'name': 'new_max_debt', 'type': 'uint256'}], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'update_debt', 'inputs': [{'name': 'strategy', 'type': 'address'}, {'name': 'target_debt', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'update_debt', 'inputs': [{'name': 'strategy', 'type': 'address'}, {'name': 'target_debt', 'type': 'uint256'}, {'name': 'max_loss', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'shutdown_vault', 'inputs': [], 'outputs': []}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'deposit', 'inputs': [{'name': 'assets', 'type': 'uint256'}, {'name': 'receiver', 'type': 'address'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'mint', 'inputs': [{'name': 'shares', 'type': 'uint256'}, {'name': 'receiver', 'type': 'address'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'withdraw', 'inputs': [{'name': 'assets', 'type': 'uint256'}, {'name': 'receiver', 'type': 'address'}, {'name': 'owner', 'type': 'address'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'withdraw', 'inputs': [{'name': 'assets', 'type': 'uint256'}, {'name': 'receiver', 'type': 'address'}, {'name': 'owner', 'type': 'address'}, {'name': 'max_loss', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'withdraw', 'inputs': [{'name': 'assets', 'type': 'uint256'}, {'name': 'receiver', 'type': 'address'}, {'name': 'owner', 'type': 'address'}, {'name': 'max_loss', 'type': 'uint256'}, {'name': 'strategies', 'type': 'address[]'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'redeem', 'inputs': [{'name': 'shares', 'type': 'uint256'}, {'name': 'receiver', 'type': 'address'}, {'name': 'owner', 'type': 'address'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'redeem', 'inputs': [{'name': 'shares', 'type': 'uint256'}, {'name': 'receiver', 'type': 'address'}, {'name': 'owner', 'type': 'address'}, {'name': 'max_loss', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'redeem', 'inputs': [{'name': 'shares', 'type': 'uint256'}, {'name': 'receiver', 'type': 'address'}, {'name': 'owner', 'type': 'address'}, {'name': 'max_loss', 'type': 'uint256'}, {'name': 'strategies', 'type': 'address[]'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'approve', 'inputs': [{'name': 'spender', 'type': 'address'}, {'name': 'amount', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'bool'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'transfer', 'inputs': [{'name': 'receiver', 'type': 'address'}, {'name': 'amount', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'bool'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'transferFrom', 'inputs': [{'name': 'sender', 'type': 'address'}, {'name': 'receiver', 'type': 'address'}, {'name': 'amount', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'bool'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'permit', 'inputs': [{'name': 'owner', 'type': 'address'}, {'name': 'spender', 'type': 'address'}, {'name': 'amount', 'type': 'uint256'}, {'name': 'deadline', 'type': 'uint256'}, {'name': 'v', 'type': 'uint8'}, {'name': 'r', 'type': 'bytes32'}, {'name': 's', 'type': 'bytes32'}], 'outputs': [{'name': '', 'type': 'bool'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'balanceOf', 'inputs': [{'name': 'addr', 'type': 'address'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'totalSupply', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'totalAssets', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'totalIdle', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'totalDebt', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'convertToShares', 'inputs': [{'name': 'assets', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'previewDeposit', 'inputs': [{'name': 'assets', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'previewMint', 'inputs': [{'name': 'shares', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'convertToAssets', 'inputs': [{'name': 'shares', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'maxDeposit', 'inputs': [{'name': 'receiver', 'type': 'address'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'maxMint', 'inputs': [{'name': 'receiver', 'type': 'address'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'maxWithdraw', 'inputs': [{'name': 'owner', 'type': 'address'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'maxWithdraw', 'inputs': [{'name': 'owner', 'type': 'address'}, {'name': 'max_loss', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'maxWithdraw', 'inputs': [{'name': 'owner', 'type': 'address'}, {'name': 'max_loss', 'type': 'uint256'}, {'name': 'strategies', 'type': 'address[]'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'maxRedeem', 'inputs': [{'name': 'owner', 'type': 'address'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'maxRedeem', 'inputs': [{'name': 'owner', 'type': 'address'}, {'name': 'max_loss', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'maxRedeem', 'inputs': [{'name': 'owner', 'type': 'address'}, {'name': 'max_loss', 'type': 'uint256'}, {'name': 'strategies', 'type': 'address[]'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'previewWithdraw', 'inputs': [{'name': 'assets', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'previewRedeem', 'inputs': [{'name': 'shares', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'FACTORY', 'inputs': [], 'outputs': [{'name': '', 'type': 'address'}]}, {'stateMutability': 'pure', 'type': 'function', 'name': 'apiVersion', 'inputs': [], 'outputs': [{'name': '', 'type': 'string'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'assess_share_of_unrealised_losses', 'inputs': [{'name': 'strategy', 'type': 'address'}, {'name': 'assets_needed', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'profitMaxUnlockTime', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'fullProfitUnlockDate', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'profitUnlockingRate', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'lastProfitUpdate', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'DOMAIN_SEPARATOR', 'inputs': [], 'outputs': [{'name': '', 'type': 'bytes32'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'asset', 'inputs': [], 'outputs': [{'name': '', 'type': 'address'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'decimals', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint8'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'strategies', 'inputs': [{'name': 'arg0', 'type': 'address'}], 'outputs': [{'name': '', 'type': 'tuple', 'components': [{'name': 'activation', 'type': 'uint256'}, {'name': 'last_report', 'type': 'uint256'}, {'name': 'current_debt', 'type': 'uint256'}, {'name': 'max_debt', 'type': 'uint256'}]}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'default_queue', 'inputs': [{'name': 'arg0', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'address'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'use_default_queue', 'inputs': [], 'outputs': [{'name': '', 'type': 'bool'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'auto_allocate', 'inputs': [], 'outputs': [{'name': '', 'type': 'bool'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'allowance', 'inputs': [{'name': 'arg0', 'type': 'address'}, {'name': 'arg1', 'type': 'address'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'minimum_total_idle', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'deposit_limit', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'accountant', 'inputs': [], 'outputs': [{'name': '', 'type': 'address'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'deposit_limit_module', 'inputs': [], 'outputs': [{'name': '', 'type': 'address'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'withdraw_limit_module', 'inputs': [], 'outputs': [{'name': '', 'type': 'address'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'roles', 'inputs': [{'name': 'arg0', 'type': 'address'}], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'role_manager', 'inputs': [], 'outputs': [{'name': '', 'type': 'address'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'future_role_manager', 'inputs': [], 'outputs': [{'name': '', 'type': 'address'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'name', 'inputs': [], 'outputs': [{'name': '', 'type': 'string'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'symbol', 'inputs': [], 'outputs': [{'name': '', 'type': 'string'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'nonces', 'inputs': [{'name': 'arg0', 'type': 'address'}], 'outputs': [{'name': '', 'type': 'uint256'}]}])
-    if CHAIN in ["taiko"]:
-        boracle = l2_web3.eth.contract(B_ORACLE, abi=[{'inputs': [], 'name': 'FUNC_NOT_IMPLEMENTED', 'type': 'error'}, {'inputs': [], 'name': 'INVALID_PAUSE_STATUS', 'type': 'error'}, {'inputs': [], 'name': 'LTP_INVALID_ACCOUNT_PROOF', 'type': 'error'}, {'inputs': [], 'name': 'LTP_INVALID_INCLUSION_PROOF', 'type': 'error'}, {'inputs': [], 'name': 'REENTRANT_CALL', 'type': 'error'}, {'inputs': [], 'name': 'RESOLVER_DENIED', 'type': 'error'}, {'inputs': [], 'name': 'RESOLVER_INVALID_MANAGER', 'type': 'error'}, {'inputs': [], 'name': 'RESOLVER_UNEXPECTED_CHAINID', 'type': 'error'}, {'inputs': [{'internalType': 'uint64', 'name': 'chainId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': 'name', 'type': 'bytes32'}], 'name': 'RESOLVER_ZERO_ADDR', 'type': 'error'}, {'inputs': [], 'name': 'SS_EMPTY_PROOF', 'type': 'error'}, {'inputs': [], 'name': 'SS_INVALID_HOPS_WITH_LOOP', 'type': 'error'}, {'inputs': [], 'name': 'SS_INVALID_LAST_HOP_CHAINID', 'type': 'error'}, {'inputs': [], 'name': 'SS_INVALID_MID_HOP_CHAINID', 'type': 'error'}, {'inputs': [], 'name': 'SS_INVALID_STATE', 'type': 'error'}, {'inputs': [], 'name': 'SS_SIGNAL_NOT_FOUND', 'type': 'error'}, {'inputs': [], 'name': 'SS_UNAUTHORIZED', 'type': 'error'}, {'inputs': [], 'name': 'ZERO_ADDRESS', 'type': 'error'}, {'inputs': [], 'name': 'ZERO_VALUE', 'type': 'error'}, {'anonymous': False, 'inputs': [{'indexed': False, 'internalType': 'address', 'name': 'previousAdmin', 'type': 'address'}, {'indexed': False, 'internalType': 'address', 'name': 'newAdmin', 'type': 'address'}], 'name': 'AdminChanged', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'internalType': 'address', 'name': 'addr', 'type': 'address'}, {'indexed': False, 'internalType': 'bool', 'name': 'authorized', 'type': 'bool'}], 'name': 'Authorized', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'internalType': 'address', 'name': 'beacon', 'type': 'address'}], 'name': 'BeaconUpgraded', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'internalType': 'uint64', 'name': 'chainId', 'type': 'uint64'}, {'indexed': True, 'internalType': 'uint64', 'name': 'blockId', 'type': 'uint64'}, {'indexed': True, 'internalType': 'bytes32', 'name': 'kind', 'type': 'bytes32'}, {'indexed': False, 'internalType': 'bytes32', 'name': 'data', 'type': 'bytes32'}, {'indexed': False, 'internalType': 'bytes32', 'name': 'signal', 'type': 'bytes32'}], 'name': 'ChainDataSynced', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': False, 'internalType': 'uint8', 'name': 'version', 'type': 'uint8'}], 'name': 'Initialized', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'internalType': 'address', 'name': 'previousOwner', 'type': 'address'}, {'indexed': True, 'internalType': 'address', 'name': 'newOwner', 'type': 'address'}], 'name': 'OwnershipTransferStarted', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'internalType': 'address', 'name': 'previousOwner', 'type': 'address'}, {'indexed': True, 'internalType': 'address', 'name': 'newOwner', 'type': 'address'}], 'name': 'OwnershipTransferred', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': False, 'internalType': 'address', 'name': 'account', 'type': 'address'}], 'name': 'Paused', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': False, 'internalType': 'address', 'name': 'app', 'type': 'address'}, {'indexed': False, 'internalType': 'bytes32', 'name': 'signal', 'type': 'bytes32'}, {'indexed': False, 'internalType': 'bytes32', 'name': 'slot', 'type': 'bytes32'}, {'indexed': False, 'internalType': 'bytes32', 'name': 'value', 'type': 'bytes32'}], 'name': 'SignalSent', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': False, 'internalType': 'address', 'name': 'account', 'type': 'address'}], 'name': 'Unpaused', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'internalType': 'address', 'name': 'implementation', 'type': 'address'}], 'name': 'Upgraded', 'type': 'event'}, {'inputs': [], 'name': 'acceptOwnership', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'addressManager', 'outputs': [{'internalType': 'address', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'address', 'name': '_addr', 'type': 'address'}, {'internalType': 'bool', 'name': '_authorize', 'type': 'bool'}], 'name': 'authorize', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'address', 'name': '_app', 'type': 'address'}, {'internalType': 'bytes32', 'name': '_signal', 'type': 'bytes32'}], 'name': 'getSignalSlot', 'outputs': [{'internalType': 'bytes32', 'name': '', 'type': 'bytes32'}], 'stateMutability': 'pure', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': '_kind', 'type': 'bytes32'}, {'internalType': 'uint64', 'name': '_blockId', 'type': 'uint64'}], 'name': 'getSyncedChainData', 'outputs': [{'internalType': 'uint64', 'name': 'blockId_', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': 'chainData_', 'type': 'bytes32'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'impl', 'outputs': [{'internalType': 'address', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'inNonReentrant', 'outputs': [{'internalType': 'bool', 'name': '', 'type': 'bool'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'address', 'name': '_owner', 'type': 'address'}, {'internalType': 'address', 'name': '_addressManager', 'type': 'address'}], 'name': 'init', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'internalType': 'address', 'name': 'addr', 'type': 'address'}], 'name': 'isAuthorized', 'outputs': [{'internalType': 'bool', 'name': 'authorized', 'type': 'bool'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': '_kind', 'type': 'bytes32'}, {'internalType': 'uint64', 'name': '_blockId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': '_chainData', 'type': 'bytes32'}], 'name': 'isChainDataSynced', 'outputs': [{'internalType': 'bool', 'name': '', 'type': 'bool'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'address', 'name': '_app', 'type': 'address'}, {'internalType': 'bytes32', 'name': '_signal', 'type': 'bytes32'}], 'name': 'isSignalSent', 'outputs': [{'internalType': 'bool', 'name': '', 'type': 'bool'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'lastUnpausedAt', 'outputs': [{'internalType': 'uint64', 'name': '', 'type': 'uint64'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'owner', 'outputs': [{'internalType': 'address', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'pause', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'paused', 'outputs': [{'internalType': 'bool', 'name': '', 'type': 'bool'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'pendingOwner', 'outputs': [{'internalType': 'address', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'address', 'name': '_app', 'type': 'address'}, {'internalType': 'bytes32', 'name': '_signal', 'type': 'bytes32'}, {'internalType': 'bytes', 'name': '_proof', 'type': 'bytes'}], 'name': 'proveSignalReceived', 'outputs': [{'internalType': 'uint256', 'name': 'numCacheOps_', 'type': 'uint256'}], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'proxiableUUID', 'outputs': [{'internalType': 'bytes32', 'name': '', 'type': 'bytes32'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'renounceOwnership', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': '_name', 'type': 'bytes32'}, {'internalType': 'bool', 'name': '_allowZeroAddress', 'type': 'bool'}], 'name': 'resolve', 'outputs': [{'internalType': 'addresspayable', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'bytes32', 'name': '_name', 'type': 'bytes32'}, {'internalType': 'bool', 'name': '_allowZeroAddress', 'type': 'bool'}], 'name': 'resolve', 'outputs': [{'internalType': 'addresspayable', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'bytes32', 'name': '_signal', 'type': 'bytes32'}], 'name': 'sendSignal', 'outputs': [{'internalType': 'bytes32', 'name': '', 'type': 'bytes32'}], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': '_kind', 'type': 'bytes32'}, {'internalType': 'uint64', 'name': '_blockId', 'type': 'uint64'}], 'name': 'signalForChainData', 'outputs': [{'internalType': 'bytes32', 'name': '', 'type': 'bytes32'}], 'stateMutability': 'pure', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': '_kind', 'type': 'bytes32'}, {'internalType': 'uint64', 'name': '_blockId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': '_chainData', 'type': 'bytes32'}], 'name': 'syncChainData', 'outputs': [{'internalType': 'bytes32', 'name': '', 'type': 'bytes32'}], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': 'chainId', 'type': 'uint64'}, {'internalType': 'bytes32', 'name': 'kind', 'type': 'bytes32'}], 'name': 'topBlockId', 'outputs': [{'internalType': 'uint64', 'name': 'blockId', 'type': 'uint64'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'address', 'name': 'newOwner', 'type': 'address'}], 'name': 'transferOwnership', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'unpause', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'internalType': 'address', 'name': 'newImplementation', 'type': 'address'}], 'name': 'upgradeTo', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'internalType': 'address', 'name': 'newImplementation', 'type': 'address'}, {'internalType': 'bytes', 'name': 'data', 'type': 'bytes'}], 'name': 'upgradeToAndCall', 'outputs': [], 'stateMutability': 'payable', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_chainId', 'type': 'uint64'}, {'internalType': 'address', 'name': '_app', 'type': 'address'}, {'internalType': 'bytes32', 'name': '_signal', 'type': 'bytes32'}, {'internalType': 'bytes', 'name': '_proof', 'type': 'bytes'}], 'name': 'verifySignalReceived', 'outputs': [], 'stateMutability': 'view', 'type': 'function'}])
-        prover = l2_web3.eth.contract(PROVER, abi=[{'inputs': [{'internalType': 'address', 'name': '_scrvusd_oracle', 'type': 'address'}], 'stateMutability': 'nonpayable', 'type': 'constructor'}, {'inputs': [], 'name': 'SCRVUSD_ORACLE', 'outputs': [{'internalType': 'address', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'SIGNAL_SERVICE', 'outputs': [{'internalType': 'address', 'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'internalType': 'uint64', 'name': '_block_number', 'type': 'uint64'}, {'internalType': 'bytes', 'name': '_proof_rlp', 'type': 'bytes'}], 'name': 'prove', 'outputs': [{'internalType': 'uint256', 'name': '', 'type': 'uint256'}], 'stateMutability': 'nonpayable', 'type': 'function'}])
+def time_to_update(vault, chain):
+    if time.time() < chain.delay_until:
+        return False
+    with metrics.timed("time_to_update", chain.name):
+        # can be any relative change or time
+        if time.time() - chain.last_update >= 4 * 3600:  # Every 4 hours
+            return True
+        # Both prices are replicated locally, so no requests needed
+        ts = int(time.time())
+        price = vault.price(ts)
+        rel_change = price / oracle_price(chain.version, *chain.oracle_params, ts)
+        metrics.PRICE_DEVIATION.set(rel_change - 1, chain=chain.name)
+        return rel_change > REL_CHANGE_THRESHOLD
+
+
+def _choose_block_numbers(chains, block_numbers):
+    """
+    Choose block to prove for each chain, so chains share proofs when possible.
+    Uses the latest block fetched for any chain within `PROOF_REUSE_BLOCKS`
+    that blockhash oracle of the chain knows.
+    """
+    candidates = sorted(set(block_numbers), reverse=True)
+    chosen = []
+    for chain, block_number in zip(chains, block_numbers):
+        for candidate in candidates:
+            if candidate == block_number or (
+                candidate >= block_number - PROOF_REUSE_BLOCKS and has_block(chain, candidate)
+            ):
+                chosen.append(candidate)
+                break
+    return chosen
+
+
+async def _gather_per_chain(chains, fn, *args):
+    """
+    Run blocking `fn(chain, *args)` for all chains concurrently.
+    :return: Chains and results of successful calls, errors are logged
+    """
+    results = await asyncio.gather(
+        *[
+            asyncio.to_thread(fn, chain, *[arg[i] for arg in args])
+            for i, chain in enumerate(chains)
+        ],
+        return_exceptions=True,
+    )
+    succeeded = []
+    for chain, result in zip(chains, results):
+        if isinstance(result, Exception):
+            chain.log(result)
+        else:
+            succeeded.append((chain, result))
+    return [chain for chain, _ in succeeded], [result for _, result in succeeded]
+
+
+async def _generate_proof(block_number, with_header=True):
+    with metrics.timed("generate_proof"):
+        proofs = await generate_proof_async(
+            eth_async_web3, block_number, batch=True, cache=proof_cache, with_header=with_header
+        )
+    _observe_proof(proofs)
+    return proofs
+
+
+async def update(vault, chains):
+    """
+    Update chains that need it, generating one mainnet proof per block number.
+    """
+    await asyncio.to_thread(vault.poll)
+    chains = [chain for chain in chains if time_to_update(vault, chain)]
+    if not chains:
+        return
+
+    if BLOCK_NUMBER:
+        block_numbers = [BLOCK_NUMBER] * len(chains)
     else:
-        boracle = l2_web3.eth.contract(B_ORACLE, abi=[{'name': 'CommitBlockHash', 'inputs': [{'name': 'committer', 'type': 'address', 'indexed': True}, {'name': 'number', 'type': 'uint256', 'indexed': True}, {'name': 'hash', 'type': 'bytes32', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'name': 'ApplyBlockHash', 'inputs': [{'name': 'number', 'type': 'uint256', 'indexed': True}, {'name': 'hash', 'type': 'bytes32', 'indexed': False}], 'anonymous': False, 'type': 'event'}, {'stateMutability': 'view', 'type': 'function', 'name': 'get_block_hash', 'inputs': [{'name': '_number', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'bytes32'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'commit', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'nonpayable', 'type': 'function', 'name': 'apply', 'inputs': [], 'outputs': [{'name': '', 'type': 'uint256'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'block_hash', 'inputs': [{'name': 'arg0', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'bytes32'}]}, {'stateMutability': 'view', 'type': 'function', 'name': 'commitments', 'inputs': [{'name': 'arg0', 'type': 'address'}, {'name': 'arg1', 'type': 'uint256'}], 'outputs': [{'name': '', 'type': 'bytes32'}]}])
-        prover = l2_web3.eth.contract(PROVER, abi=[{"inputs": [{"internalType": "bytes", "name": "_block_header_rlp", "type": "bytes"}, {"internalType": "bytes", "name": "_proof_rlp", "type": "bytes"}], "name": "prove", "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}], "stateMutability": "nonpayable", "type": "function"}])
-    if VERSION == "ScrvusdOracle":
-        soracle = l2_web3.eth.contract(S_ORACLE, abi=[{'anonymous': False, 'inputs': [{'indexed': False, 'name': 'new_price', 'type': 'uint256'}, {'indexed': False, 'name': 'at', 'type': 'uint256'}], 'name': 'PriceUpdate', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': False, 'name': 'prover', 'type': 'address'}], 'name': 'SetProver', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'name': 'previous_owner', 'type': 'address'}, {'indexed': True, 'name': 'new_owner', 'type': 'address'}], 'name': 'OwnershipTransferred', 'type': 'event'}, {'inputs': [{'name': 'new_owner', 'type': 'address'}], 'name': 'transfer_ownership', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'renounce_ownership', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'owner', 'outputs': [{'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'pricePerShare', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': 'ts', 'type': 'uint256'}], 'name': 'pricePerShare', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'pricePerAsset', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': 'ts', 'type': 'uint256'}], 'name': 'pricePerAsset', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'price_oracle', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': 'i', 'type': 'uint256'}], 'name': 'price_oracle', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_parameters', 'type': 'uint256[8]'}], 'name': 'update_price', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'name': '_max_acceleration', 'type': 'uint256'}], 'name': 'set_max_acceleration', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'name': '_prover', 'type': 'address'}], 'name': 'set_prover', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'version', 'outputs': [{'name': '', 'type': 'string'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'prover', 'outputs': [{'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'price', 'outputs': [{'components': [{'name': 'previous', 'type': 'uint256'}, {'name': 'future', 'type': 'uint256'}], 'name': '', 'type': 'tuple'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'time', 'outputs': [{'components': [{'name': 'previous', 'type': 'uint256'}, {'name': 'future', 'type': 'uint256'}], 'name': '', 'type': 'tuple'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'max_acceleration', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_initial_price', 'type': 'uint256'}, {'name': '_max_acceleration', 'type': 'uint256'}], 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'constructor'}])
-    elif VERSION == "ScrvusdOracleV1":
-        soracle = l2_web3.eth.contract(S_ORACLE, abi=[{'anonymous': False, 'inputs': [{'indexed': False, 'name': 'new_price', 'type': 'uint256'}, {'indexed': False, 'name': 'price_params_ts', 'type': 'uint256'}], 'name': 'PriceUpdate', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': False, 'name': 'prover', 'type': 'address'}], 'name': 'SetProver', 'type': 'event'}, {'anonymous': False, 'inputs': [{'indexed': True, 'name': 'previous_owner', 'type': 'address'}, {'indexed': True, 'name': 'new_owner', 'type': 'address'}], 'name': 'OwnershipTransferred', 'type': 'event'}, {'inputs': [{'name': 'new_owner', 'type': 'address'}], 'name': 'transfer_ownership', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'renounce_ownership', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'owner', 'outputs': [{'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'price_v0', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_i', 'type': 'uint256'}], 'name': 'price_v0', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'price_v1', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_i', 'type': 'uint256'}], 'name': 'price_v1', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'raw_price', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_i', 'type': 'uint256'}], 'name': 'raw_price', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_i', 'type': 'uint256'}, {'name': '_ts', 'type': 'uint256'}], 'name': 'raw_price', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_parameters', 'type': 'uint256[7]'}, {'name': 'ts', 'type': 'uint256'}], 'name': 'update_price', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'name': '_max_acceleration', 'type': 'uint256'}], 'name': 'set_max_acceleration', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [{'name': '_prover', 'type': 'address'}], 'name': 'set_prover', 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'function'}, {'inputs': [], 'name': 'version', 'outputs': [{'name': '', 'type': 'string'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'prover', 'outputs': [{'name': '', 'type': 'address'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [], 'name': 'max_acceleration', 'outputs': [{'name': '', 'type': 'uint256'}], 'stateMutability': 'view', 'type': 'function'}, {'inputs': [{'name': '_initial_price', 'type': 'uint256'}, {'name': '_max_acceleration', 'type': 'uint256'}], 'outputs': [], 'stateMutability': 'nonpayable', 'type': 'constructor'}])
-    # fmt: on
+        chains, block_numbers = await _gather_per_chain(chains, fetch_block_number)
+        block_numbers = await asyncio.to_thread(_choose_block_numbers, chains, block_numbers)
+    chain_block_numbers = dict(zip(chains, block_numbers))
+
+    # Headers are serialized only for blocks some chain verifies by blockhash
+    chains, by_state_root = await _gather_per_chain(chains, has_state_root, block_numbers)
+    block_numbers = [chain_block_numbers[chain] for chain in chains]
+    header_block_numbers = {
+        block_number
+        for chain, block_number, state_root in zip(chains, block_numbers, by_state_root)
+        if needs_header(chain, state_root)
+    }
 
+    unique_block_numbers = sorted(set(block_numbers))
+    proofs = await asyncio.gather(
+        *[
+            _generate_proof(block_number, block_number in header_block_numbers)
+            for block_number in unique_block_numbers
+        ]
+    )
+    proofs = dict(zip(unique_block_numbers, proofs))
+
+    chain_by_state_root = dict(zip(chains, by_state_root))
+    chains, submitted = await _gather_per_chain(
+        chains,
+        prove,
+        block_numbers,
+        [proofs[block_number] for block_number in block_numbers],
+        by_state_root,
+    )
+    chains = [chain for chain, is_submitted in zip(chains, submitted) if is_submitted]
+    # Parameters oracles were updated with to follow their prices locally
+    oracle_params = {}
+    for chain in chains:
+        block_number = chain_block_numbers[chain]
+        if block_number not in oracle_params:
+            oracle_params[block_number] = await asyncio.to_thread(
+                fetch_price_params, eth_web3, block_number
+            )
+        chain.oracle_params = submitted_params(
+            *oracle_params[block_number], chain_by_state_root[chain]
+        )
+        chain.last_update = time.time()
+        chain.block_number = block_number
+        chain.log("Updated", block_number=block_number)
+
+
+async def serve(vault, chains):
     while True:
-        if time_to_update(scrvusd, soracle):
-            try:
-                prove(boracle, prover, block_number=BLOCK_NUMBER)
-                global last_update
-                last_update = time.time()
-            except Exception as e:
-                print(e)
-        sleep(12)
+        try:
+            with metrics.timed("update"):
+                await update(vault, chains)
+        except Exception as e:
+            if metrics.json_logs:
+                metrics.log("Update failed", error=repr(e))
+            else:
+                print(f"Update failed: {e!r}")
+        await asyncio.sleep(12)
+
+
+def loop():
+    vault = VaultWatcher(eth_web3)
+    chains = [Chain(name) for name in CHAINS]
+    metrics.enable(METRICS_PORT is not None, JSON_LOGS)
+    if METRICS_PORT is not None:
+        metrics.serve(METRICS_PORT)
+    for chain in chains:
+        if chain.state_root_prover is None and chain.name not in ["taiko"]:
+            chain.log("Verifying by block hash only, no prover in STATE_ROOT_PROVERS")
+        metrics.SECONDS_SINCE_UPDATE.set(
+            lambda chain=chain: time.time() - chain.last_update, chain=chain.name
+        )
+    asyncio.run(serve(vault, chains))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,392 @@
+"""
+Replication of `ScrvusdOracleV2` price math in Python.
+Uses the same integer arithmetic, so results are equal to the contract.
+Reverts of the contract (division by zero, underflow) are not replicated.
+"""
+
+import bisect
+from typing import NamedTuple
+
+MAX_BPS_EXTENDED = 1_000_000_000_000
+MAX_V2_DURATION = 4 * 12 * 4  # 4 years
+CHECKPOINT_CNT = 64
+MAX_PRICE_FACTOR = 10**36
+PRICE_POWER_CNT = 32
+
+DEFAULT_PROFIT_MAX_UNLOCK_TIME = 7 * 86400
+DEFAULT_MAX_V2_DURATION = 4 * 6
+DEFAULT_MAX_PRICE_INCREMENT = 2 * 10**12
+
+
+class PriceParams(NamedTuple):
+    # assets
+    total_debt: int
+    total_idle: int
+    # supply
+    total_supply: int
+    full_profit_unlock_date: int
+    profit_unlocking_rate: int
+    last_profit_update: int
+    balance_of_self: int
+
+
+class Checkpoint(NamedTuple):
+    block_number: int
+    ts: int  # timestamp at which `params` are true
+    params: PriceParams
+
+
+def fits_checkpoint(checkpoint: Checkpoint) -> bool:
+    """
+    Fields fit their packed widths, see `ScrvusdOracleV2._fits_checkpoint()`.
+    """
+    p = checkpoint.params
+    return (
+        max(checkpoint.block_number, checkpoint.ts, p.full_profit_unlock_date, p.last_profit_update)
+        < 2**64
+        and max(p.total_debt, p.total_idle, p.total_supply, p.balance_of_self) < 2**128
+    )
+
+
+def unpack_checkpoint(packed) -> Checkpoint:
+    """
+    :param packed: 4 storage slots of a checkpoint, see `ScrvusdOracleV2.checkpoints`
+    """
+    mask_64, mask_128 = 2**64 - 1, 2**128 - 1
+    return Checkpoint(
+        block_number=packed[0] & mask_64,
+        ts=(packed[0] >> 64) & mask_64,
+        params=PriceParams(
+            total_debt=packed[1] & mask_128,
+            total_idle=packed[1] >> 128,
+            total_supply=packed[2] & mask_128,
+            full_profit_unlock_date=(packed[0] >> 128) & mask_64,
+            profit_unlocking_rate=packed[3],
+            last_profit_update=packed[0] >> 192,
+            balance_of_self=packed[2] >> 128,
+        ),
+    )
+
+
+def unlocked_shares(
+    full_profit_unlock_date, profit_unlocking_rate, last_profit_update, balance_of_self, ts
+):
+    """
+    Amount of shares that have been unlocked, see `VaultV3._unlocked_shares()`.
+    """
+    if full_profit_unlock_date > ts:
+        return profit_unlocking_rate * (ts - last_profit_update) // MAX_BPS_EXTENDED
+    elif full_profit_unlock_date != 0:
+        return balance_of_self
+    return 0
+
+
+def total_supply(p: PriceParams, ts):
+    return p.total_supply - unlocked_shares(
+        p.full_profit_unlock_date,
+        p.profit_unlocking_rate,
+        p.last_profit_update,
+        p.balance_of_self,
+        ts,
+    )
+
+
+def total_assets(p: PriceParams):
+    return p.total_idle + p.total_debt
+
+
+def price_per_share(p: PriceParams, ts):
+    """
+    `scrvUSD.pricePerShare()` at `ts` if nobody interacts with the vault.
+    """
+    return total_assets(p) * 10**18 // total_supply(p, ts)
+
+
+def obtain_price_params(
+    params: PriceParams,
+    parameters_ts,
+    profit_max_unlock_time=DEFAULT_PROFIT_MAX_UNLOCK_TIME,
+    max_v2_duration=DEFAULT_MAX_V2_DURATION,
+) -> PriceParams:
+    """
+    Price parameters true or assumed to be true at `parameters_ts`.
+    Assumes constant gain(in crvUSD rewards) through distribution periods.
+    """
+    number_of_periods = _number_of_periods(
+        params, parameters_ts, profit_max_unlock_time, max_v2_duration
+    )
+    if number_of_periods is None:
+        return params
+    return _project_price_params(params, number_of_periods, profit_max_unlock_time)
+
+
+def _number_of_periods(params: PriceParams, parameters_ts, profit_max_unlock_time, max_v2_duration):
+    """
+    :return: Number of periods to project parameters for, None if no projection is needed
+    """
+    if params.last_profit_update + profit_max_unlock_time >= parameters_ts:
+        return None
+    number_of_periods = min(
+        (parameters_ts - params.last_profit_update) // profit_max_unlock_time, max_v2_duration
+    )
+    # Closed form divides by `unlocked_supply + number_of_periods * balance_of_self`
+    if number_of_periods == 0 or params.total_supply == 0:
+        return None
+    return number_of_periods
+
+
+def _project_price_params(params: PriceParams, number_of_periods, period) -> PriceParams:
+    """
+    Closed form of `VaultV3._process_report()` repeated `number_of_periods` times,
+    see `project_periods_iteratively` for the original recurrence.
+    """
+    # locked shares at moment params.last_profit_update
+    gain = params.balance_of_self * (params.total_idle + params.total_debt) // params.total_supply
+    total_idle = params.total_idle + gain * number_of_periods
+
+    unlocked_supply = params.total_supply - params.balance_of_self
+    balance_of_self = (
+        params.balance_of_self
+        * unlocked_supply
+        // (unlocked_supply + number_of_periods * params.balance_of_self)
+    )
+    supply = unlocked_supply + balance_of_self
+
+    if params.full_profit_unlock_date > params.last_profit_update:
+        profit_unlocking_rate = (
+            balance_of_self
+            * MAX_BPS_EXTENDED
+            // (params.full_profit_unlock_date - params.last_profit_update)
+        )
+    else:
+        profit_unlocking_rate = 0
+
+    return PriceParams(
+        total_debt=params.total_debt,
+        total_idle=total_idle,
+        total_supply=supply,
+        full_profit_unlock_date=params.full_profit_unlock_date + number_of_periods * period,
+        profit_unlocking_rate=profit_unlocking_rate,
+        last_profit_update=params.last_profit_update + number_of_periods * period,
+        balance_of_self=balance_of_self,
+    )
+
+
+def project_periods_iteratively(balance_of_self, total_supply, number_of_periods):
+    """
+    Period-by-period projection of locked shares and supply as done by `ScrvusdOracleV2` before.
+    Closed form differs from it by at most `n * (n + 3) / 2` wei for `n` periods.
+    :return: (balance_of_self, total_supply)
+    """
+    for _ in range(number_of_periods):
+        if total_supply == 0:  # all shares were locked and burnt
+            break
+        balance_of_self, total_supply = (
+            balance_of_self * (total_supply - balance_of_self) // total_supply,
+            total_supply - balance_of_self * balance_of_self // total_supply,
+        )
+    return balance_of_self, total_supply
+
+
+def raw_price(
+    params: PriceParams,
+    ts,
+    parameters_ts,
+    profit_max_unlock_time=DEFAULT_PROFIT_MAX_UNLOCK_TIME,
+    max_v2_duration=DEFAULT_MAX_V2_DURATION,
+):
+    """
+    Price replication from scrvUSD vault, see `ScrvusdOracleV2._raw_price()`.
+    """
+    parameters = obtain_price_params(params, parameters_ts, profit_max_unlock_time, max_v2_duration)
+    return total_assets(parameters) * 10**18 // total_supply(parameters, ts)
+
+
+def raw_prices(
+    params: PriceParams,
+    timestamps,
+    parameters_timestamps=None,
+    profit_max_unlock_time=DEFAULT_PROFIT_MAX_UNLOCK_TIME,
+    max_v2_duration=DEFAULT_MAX_V2_DURATION,
+):
+    """
+    Evaluate `raw_price` for many timestamps at once.
+    Parameters are projected once per number of periods instead of once per timestamp.
+    :param timestamps: Timestamps to see price at
+    :param parameters_timestamps: Timestamps to obtain parameters for, `timestamps` by default
+    :return: List of prices
+    """
+    if parameters_timestamps is None:
+        parameters_timestamps = timestamps
+    projected = {}
+    prices = []
+    for ts, parameters_ts in zip(timestamps, parameters_timestamps):
+        number_of_periods = _number_of_periods(
+            params, parameters_ts, profit_max_unlock_time, max_v2_duration
+        )
+        if number_of_periods not in projected:
+            projected[number_of_periods] = (
+                params
+                if number_of_periods is None
+                else _project_price_params(params, number_of_periods, profit_max_unlock_time)
+            )
+        parameters = projected[number_of_periods]
+        prices.append(total_assets(parameters) * 10**18 // total_supply(parameters, ts))
+    return prices
+
+
+def max_price_factor(max_price_increment, dt):
+    """
+    (1 + max_price_increment / 10**18) ** dt with 10**18 precision, rounded down and saturated
+    at `MAX_PRICE_FACTOR`, see `ScrvusdOracleV2._max_price_factor()`.
+    """
+    if dt >= 2**PRICE_POWER_CNT:
+        return MAX_PRICE_FACTOR
+    factor = 10**18
+    power = 10**18 + max_price_increment  # (1 + increment) ** (2 ** k)
+    while True:
+        if dt & 1:
+            factor = min(factor * power // 10**18, MAX_PRICE_FACTOR)
+        dt >>= 1
+        if dt == 0:
+            return factor
+        power = min(power * power // 10**18, MAX_PRICE_FACTOR)
+
+
+def smoothed_price(last_price, raw_price, max_price_increment, dt):
+    """
+    Price limited to change by `max_price_increment` per second compounded, see
+    `ScrvusdOracleV2._smoothed_price()`.
+    :param dt: Time passed since the last update
+    """
+    # Linear factor does not exceed the compounded one, which is rounded down below it at most
+    # by a few wei, so the larger one is used
+    factor = min(10**18 + max_price_increment * dt, MAX_PRICE_FACTOR)
+    if dt > 1:
+        factor = max(max_price_factor(max_price_increment, dt), factor)
+    max_price = last_price * factor // 10**18
+    if raw_price > max_price:
+        return max_price
+    min_price = last_price * 10**18 // factor
+    if raw_price < min_price:
+        return min_price
+    return raw_price
+
+
+class ScrvusdOracleV2:
+    """
+    State of `ScrvusdOracleV2` contract. Timestamps of calls are passed explicitly.
+    """
+
+    def __init__(self, initial_price, ts):
+        self.last_block_number = 0
+        self.last_prices = [initial_price, initial_price, initial_price]
+        self.last_update = ts
+
+        self.profit_max_unlock_time = DEFAULT_PROFIT_MAX_UNLOCK_TIME
+        self.price_params = PriceParams(
+            total_debt=0,
+            total_idle=1,
+            total_supply=1,
+            full_profit_unlock_date=0,
+            profit_unlocking_rate=0,
+            last_profit_update=0,
+            balance_of_self=0,
+        )
+        self.price_params_ts = 0
+
+        self.max_price_increment = DEFAULT_MAX_PRICE_INCREMENT
+        self.max_v2_duration = DEFAULT_MAX_V2_DURATION
+
+        self.checkpoints = []  # kept ones, oldest first
+
+    def raw_price(self, ts, parameters_ts):
+        return raw_price(
+            self.price_params,
+            ts,
+            parameters_ts,
+            self.profit_max_unlock_time,
+            self.max_v2_duration,
+        )
+
+    def price_v0(self, ts):
+        return self._smoothed_price(
+            0, ts, self.raw_price(self.price_params_ts, self.price_params.last_profit_update)
+        )
+
+    def price_v1(self, ts):
+        return self._smoothed_price(1, ts, self.raw_price(ts, self.price_params_ts))
+
+    def price_v2(self, ts):
+        return self._smoothed_price(2, ts, self.raw_price(ts, ts))
+
+    def prices(self, timestamps, version=2):
+        """
+        Evaluate `price_v{version}` for many timestamps at once, see `raw_prices`.
+        """
+        if version == 0:
+            raw = [self.raw_price(self.price_params_ts, self.price_params.last_profit_update)]
+            raw *= len(timestamps)
+        else:
+            raw = raw_prices(
+                self.price_params,
+                timestamps,
+                [self.price_params_ts] * len(timestamps) if version == 1 else timestamps,
+                self.profit_max_unlock_time,
+                self.max_v2_duration,
+            )
+        return [self._smoothed_price(version, ts, price) for ts, price in zip(timestamps, raw)]
+
+    def find_checkpoint(self, ts) -> Checkpoint:
+        i = bisect.bisect_right([checkpoint.ts for checkpoint in self.checkpoints], ts)
+        assert i > 0, "No checkpoint"
+        return self.checkpoints[i - 1]
+
+    def price_at(self, ts):
+        return price_per_share(self.find_checkpoint(ts).params, ts)
+
+    def _smoothed_price(self, i, ts, raw):
+        return smoothed_price(
+            self.last_prices[i], raw, self.max_price_increment, ts - self.last_update
+        )
+
+    def update_price(self, parameters, ts, block_number, block_ts):
+        """
+        :param parameters: Parameters of scrvUSD in order of `PriceParams`
+        :param ts: Timestamp at which these parameters are true
+        :param block_ts: Timestamp of the update transaction
+        :return: Absolute relative price change of final price with 10^18 precision
+        """
+        assert self.last_block_number <= block_number, "Outdated"
+        self.last_block_number = block_number
+
+        self.last_prices = [
+            self.price_v0(block_ts),
+            self.price_v1(block_ts),
+            self.price_v2(block_ts),
+        ]
+        self.last_update = block_ts
+
+        current_price = self.raw_price(self.price_params_ts, self.price_params_ts)
+        self.price_params = PriceParams(*parameters)
+        self.price_params_ts = ts
+
+        # Kept ordered by `ts`, resubmit of the same block replaces its checkpoint
+        checkpoint = Checkpoint(block_number, ts, self.price_params)
+        kept = self.checkpoints
+        if kept and kept[-1].block_number == block_number:
+            kept = kept[:-1]
+        if (not kept or kept[-1].ts <= ts) and fits_checkpoint(checkpoint):
+            self.checkpoints = kept[-CHECKPOINT_CNT + 1 :]
+            self.checkpoints.append(checkpoint)
+
+        new_price = self.raw_price(ts, ts)
+        return abs(new_price - current_price) * 10**18 // current_price
+
+    def update_profit_max_unlock_time(self, profit_max_unlock_time, block_number):
+        assert self.last_block_number <= block_number, "Outdated"
+        self.last_block_number = block_number
+
+        prev_value = self.profit_max_unlock_time
+        self.profit_max_unlock_time = profit_max_unlock_time
+        return prev_value != profit_max_unlock_time
@@ -0,0 +1,115 @@
+"""
+Simulation of keeper transactions before submitting them.
+`prove()` returns relative price change of the oracle, so updates that would change nothing
+or revert (e.g. "Outdated" when a newer block was proven by someone else) are not paid for.
+Gas measured on a fork gives the limit of `prove()` sent right after a pending `apply()`.
+"""
+
+import math
+from typing import NamedTuple, Optional
+
+import boa
+from boa.rpc import EthereumRPC
+from eth_abi import decode
+from hexbytes import HexBytes
+from web3.exceptions import ContractLogicError
+
+MIN_PRICE_CHANGE = 10**12  # ALTER, with 10^18 precision, i.e. 0.01 bps
+GAS_MARGIN = 1.25  # ALTER, state might change between simulation and inclusion
+
+ERROR_SELECTOR = bytes.fromhex("08c379a0")  # Error(string)
+
+
+class Simulation(NamedTuple):
+    price_change: Optional[int]  # relative with 10^18 precision, None if not returned
+    error: Optional[str] = None  # revert reason
+    gas_used: Optional[int] = None  # by the last transaction including intrinsic gas
+
+    def gas_limit(self, margin=GAS_MARGIN) -> Optional[int]:
+        """
+        :return: Gas limit to submit the last transaction with, None if gas was not measured
+        """
+        if self.gas_used is None:
+            return None
+        return math.ceil(self.gas_used * margin)
+
+    def worth_submitting(self, min_price_change=MIN_PRICE_CHANGE) -> bool:
+        if self.error is not None:
+            return False
+        # Provers not returning price change can not be judged
+        return self.price_change is None or self.price_change >= min_price_change
+
+
+def _result(output: bytes, gas_used=None) -> Simulation:
+    if len(output) < 32:
+        return Simulation(None, gas_used=gas_used)
+    return Simulation(decode(["uint256"], output[:32])[0], gas_used=gas_used)
+
+
+def intrinsic_gas(data: bytes) -> int:
+    """
+    Gas charged before execution of a call transaction without access list.
+    """
+    zeros = data.count(0)
+    return 21_000 + 4 * zeros + 16 * (len(data) - zeros)
+
+
+def _revert_reason(output: bytes) -> str:
+    if output[:4] == ERROR_SELECTOR:
+        return decode(["string"], output[4:])[0]
+    return f"reverted 0x{output.hex()}"
+
+
+def simulate_call(web3, tx) -> Simulation:
+    """
+    Simulate `tx` with `eth_call` on the latest L2 state.
+    Transactions it depends on (e.g. `apply()` of blockhash) must be mined already.
+    """
+    call = {field: tx[field] for field in ["from", "to", "data", "value"] if field in tx}
+    try:
+        output = web3.eth.call(call)
+    except ContractLogicError as e:
+        if isinstance(e.data, str):
+            return Simulation(None, _revert_reason(bytes(HexBytes(e.data))))
+        return Simulation(None, e.message)
+    return _result(bytes(output))
+
+
+class Simulator:
+    """
+    Executes transactions one after another in a boa environment and rolls them back.
+    Allows to simulate `prove()` right after `apply()` of the blockhash it needs.
+    """
+
+    def __init__(self, env=None):
+        """
+        :param env: boa environment, local one to run without network
+        """
+        self.env = env or boa.env
+
+    @classmethod
+    def fork(cls, url, block_identifier="latest"):
+        """
+        Simulator over a fork of L2 network at `url`.
+        """
+        env = boa.Env()
+        env.fork_rpc(EthereumRPC(url), block_identifier=block_identifier)
+        return cls(env)
+
+    def simulate(self, txs) -> Simulation:
+        """
+        :param txs: Built transactions, result of the last one is returned
+        """
+        with self.env.anchor():
+            for tx in txs:
+                data = bytes(HexBytes(tx["data"]))
+                computation = self.env.execute_code(
+                    to_address=tx["to"],
+                    sender=tx["from"],
+                    gas=tx.get("gas"),
+                    value=tx.get("value", 0),
+                    data=data,
+                )
+                if computation.is_error:
+                    return Simulation(None, _revert_reason(bytes(computation.output or b"")))
+        return _result(bytes(computation.output), computation.get_gas_used() + intrinsic_gas(data))
@@ -0,0 +1,140 @@
+"""
+Transaction submission of the keeper.
+Transactions of one account are sent back-to-back with locally tracked nonces,
+so dependent transactions (e.g. blockhash `apply()` and `prove()`) land in one L2 block
+instead of waiting for a receipt in between.
+"""
+
+import math
+import threading
+import time
+
+from web3.exceptions import TransactionNotFound
+
+GAS_BUMP = 1.125  # nodes accept a replacement with fees increased by at least 10%
+
+
+class NonceManager:
+    """
+    Nonce of an account fetched once and incremented locally for every transaction.
+    """
+
+    def __init__(self, web3, address):
+        self.web3 = web3
+        self.address = address
+        self._nonce = None
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        with self._lock:
+            if self._nonce is None:
+                self._nonce = self.web3.eth.get_transaction_count(self.address, "pending")
+            nonce = self._nonce
+            self._nonce += 1
+            return nonce
+
+    def reset(self):
+        """
+        Fetch nonce again, e.g. after a failed send or a transaction sent elsewhere.
+        """
+        with self._lock:
+            self._nonce = None
+
+
+class PendingTransaction:
+    """
+    Transaction with its replacements, any of them can be mined.
+    """
+
+    def __init__(self, tx):
+        self.tx = tx
+        self.hashes = []
+
+    @property
+    def nonce(self):
+        return self.tx["nonce"]
+
+
+class Submitter:
+    """
+    Signs and sends transactions of `account` without waiting for receipts.
+    Transactions not mined in `timeout` are replaced with bumped fees.
+    """
+
+    def __init__(self, web3, account, timeout=60, max_bumps=3, poll_latency=1):
+        """
+        :param timeout: Seconds to wait for a transaction before bumping fees
+        :param max_bumps: Replacements before giving up on a transaction
+        """
+        self.web3 = web3
+        self.account = account
+        self.nonces = NonceManager(web3, account.address)
+        self.timeout = timeout
+        self.max_bumps = max_bumps
+        self.poll_latency = poll_latency
+        self.pending = {}  # nonce: PendingTransaction
+
+    def send(self, tx) -> PendingTransaction:
+        """
+        :param tx: Built transaction without nonce, e.g. from `build_transaction()`.
+            Provide "gas" if the transaction depends on a pending one, so it is not estimated.
+        """
+        pending = PendingTransaction(dict(tx, nonce=self.nonces.next()))
+        try:
+            self._send(pending)
+        except Exception:
+            # Nonce was not used, following transactions would get stuck
+            self.nonces.reset()
+            raise
+        self.pending[pending.nonce] = pending
+        return pending
+
+    def _send(self, pending):
+        signed_tx = self.account.sign_transaction(pending.tx)
+        pending.hashes.append(self.web3.eth.send_raw_transaction(signed_tx.raw_transaction))
+
+    def wait(self, pending: PendingTransaction):
+        """
+        Wait for `pending` to be mined, replacing it and earlier stuck transactions on timeout.
+        :return: Receipt
+        """
+        for _ in range(self.max_bumps + 1):
+            deadline = time.time() + self.timeout
+            while time.time() < deadline:
+                if (receipt := self._receipt(pending)) is not None:
+                    self._forget(pending.nonce)
+                    return receipt
+                time.sleep(self.poll_latency)
+            self.bump(pending.nonce)
+        raise TimeoutError(f"Transaction with nonce {pending.nonce} was not mined")
+
+    def bump(self, nonce):
+        """
+        Replace transactions up to `nonce` that are not mined yet with increased fees.
+        """
+        for pending in [self.pending[n] for n in sorted(self.pending) if n <= nonce]:
+            if self._receipt(pending) is not None:
+                self._forget(pending.nonce)
+                continue
+            for field in ["gasPrice", "maxFeePerGas", "maxPriorityFeePerGas"]:
+                if field in pending.tx:
+                    pending.tx[field] = math.ceil(pending.tx[field] * GAS_BUMP)
+            try:
+                self._send(pending)
+            except Exception:
+                # Mined in between ("nonce too low", "already known"), else retried on next bump
+                if self._receipt(pending) is not None:
+                    self._forget(pending.nonce)
+
+    def _receipt(self, pending):
+        for tx_hash in pending.hashes:
+            try:
+                return self.web3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+        return None
+
+    def _forget(self, nonce):
+        # Transactions with lower nonces are mined as well
+        for n in [n for n in self.pending if n <= nonce]:
+            del self.pending[n]
@@ -0,0 +1,97 @@
+"""
+Event-driven trigger of oracle updates.
+scrvUSD price parameters only change with vault events, so the price is computed locally
+between them instead of querying scrvUSD and oracles every block.
+"""
+
+from web3 import Web3
+
+from proof import ASSET_PARAM_SLOTS, SCRVUSD, SUPPLY_PARAM_SLOTS
+from scrvusd_oracle import PriceParams, price_per_share, raw_price
+
+# Events changing price parameters
+DEPOSIT = Web3.keccak(text="Deposit(address,address,uint256,uint256)").to_0x_hex()
+WITHDRAW = Web3.keccak(text="Withdraw(address,address,address,uint256,uint256)").to_0x_hex()
+STRATEGY_REPORTED = Web3.keccak(
+    text="StrategyReported(address,uint256,uint256,uint256,uint256,uint256,uint256)"
+).to_0x_hex()
+
+
+def fetch_price_params(eth_web3, block_number) -> (PriceParams, int):
+    """
+    Fetch scrvUSD price parameters in one batch request.
+    :return: Parameters and timestamp of the block
+    """
+    with eth_web3.batch_requests() as batch:
+        batch.add(eth_web3.eth.get_block(block_number))
+        for slot in ASSET_PARAM_SLOTS + SUPPLY_PARAM_SLOTS:
+            if not isinstance(slot, int):
+                slot = int.from_bytes(slot, "big")
+            batch.add(eth_web3.eth.get_storage_at(SCRVUSD, slot, block_number))
+        block, *values = batch.execute()
+    return PriceParams(*[int.from_bytes(value, "big") for value in values]), block["timestamp"]
+
+
+def submitted_params(params: PriceParams, block_ts, by_state_root):
+    """
+    Parameters and timestamp an oracle is updated with by a proof of them.
+    Verification by state root has no block header, so `last_profit_update` stands for timestamp.
+    :return: (params, params_ts) for `oracle_price()`
+    """
+    return params, params.last_profit_update if by_state_root else block_ts
+
+
+def oracle_price(version, params: PriceParams, params_ts, ts):
+    """
+    Price reported by oracle at `ts` after being updated with `params` at `params_ts`.
+    """
+    if version == "ScrvusdOracle":  # price is fixed at the moment of update
+        return raw_price(params, params_ts, params_ts)
+    return raw_price(params, ts, params_ts)
+
+
+class VaultWatcher:
+    """
+    Follows scrvUSD price parameters by `Deposit`, `Withdraw` and `StrategyReported` logs.
+    """
+
+    def __init__(self, eth_web3, page_size=10_000):
+        self.eth_web3 = eth_web3
+        self.page_size = page_size
+
+        self.block_number = None  # last block checked for events
+        self.params = None
+
+    def poll(self) -> bool:
+        """
+        Check new blocks for events and refresh parameters if there were any.
+        :return: True if parameters were refreshed
+        """
+        latest = self.eth_web3.eth.block_number
+        if self.block_number is None:
+            self.params, _ = fetch_price_params(self.eth_web3, latest)
+            self.block_number = latest
+            return True
+
+        changed = False
+        while self.block_number < latest:
+            to_block = min(self.block_number + self.page_size, latest)
+            logs = self.eth_web3.eth.get_logs(
+                {
+                    "address": SCRVUSD,
+                    "fromBlock": self.block_number + 1,
+                    "toBlock": to_block,
+                    "topics": [[DEPOSIT, WITHDRAW, STRATEGY_REPORTED]],
+                }
+            )
+            changed |= len(logs) > 0
+            self.block_number = to_block
+        if changed:
+            self.params, _ = fetch_price_params(self.eth_web3, latest)
+        return changed
+
+    def price(self, ts):
+        """
+        `scrvUSD.pricePerShare()` at `ts` according to the latest events.
+        """
+        return price_per_share(self.params, ts)
@@ -13,6 +13,32 @@ def pytest_addoption(parser):
         "--forked", action="store_true", default=False, help="Run tests in forked environment"
     )
     parser.addoption("--slow", action="store_true", default=False, help="Run tests marked as slow")
+    parser.addoption(
+        "--slow-shards",
+        type=int,
+        default=1,
+        help="Split examples of slow stateful tests into several tests to run them in parallel",
+    )
+    parser.addoption(
+        "--gas-threshold",
+        type=float,
+        default=0.01,
+        help="Relative gas increase over the baseline that fails benchmarks",
+    )
+    parser.addoption(
+        "--gas-report", default="gas_report.json", help="Path to write measured gas to"
+    )
+    parser.addoption(
+        "--update-gas-baseline",
+        action="store_true",
+        default=False,
+        help="Overwrite gas baseline with measured values",
+    )
+
+
+def pytest_configure(config):
+    # Vyper artifacts are cached by source and compiler version, shared by xdist workers
+    boa.interpret.set_cache_dir(config.cache.mkdir("titanoboa"))
 
 
 def pytest_collection_modifyitems(config, items):
@@ -30,13 +56,43 @@ def pytest_collection_modifyitems(config, items):
             if "slow" in item.keywords:
                 item.add_marker(skip_slow)
 
-    # Put integration tests after others
+    # Put integration tests after others, the order is the same on every xdist worker
     items.sort(
         key=lambda item: [
             node if node != "integration" else "\uffff" for node in str(item.path).split("/")
         ]
     )
 
+    # Keep tests sharing reports or reusing other modules on one worker with `--dist loadgroup`
+    for item in items:
+        for group in ["integration", "benchmark"]:
+            if f"/{group}/" in str(item.path):
+                item.add_marker(pytest.mark.xdist_group(group))
+
+
+def pytest_generate_tests(metafunc):
+    shards = metafunc.config.getoption("--slow-shards")
+    if "shard" in metafunc.fixturenames and shards > 1:
+        metafunc.parametrize("shard", range(shards))
+
+
+@pytest.fixture()
+def shard():
+    """
+    Index of the shard, parametrized with `--slow-shards`.
+    """
+    return 0
+
+
+@pytest.fixture()
+def shard_examples(request, shard):
+    """
+    Split `max_examples` of a stateful test between shards.
+    Each shard runs with its own random seed, so shards explore different examples.
+    """
+    shards = request.config.getoption("--slow-shards")
+    return lambda max_examples: -(-max_examples // shards)
+
 
 @pytest.fixture(scope="session")
 def anne():
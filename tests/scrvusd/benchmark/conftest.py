@@ -0,0 +1,73 @@
+import json
+import warnings
+from pathlib import Path
+
+import pytest
+
+BASELINE_PATH = Path(__file__).parent / "gas_baseline.json"
+
+
+class GasBaselineWarning(UserWarning):
+    pass
+
+
+def _load_baseline():
+    if BASELINE_PATH.exists():
+        return json.loads(BASELINE_PATH.read_text())
+    return {}
+
+
+@pytest.fixture(scope="session")
+def gas_results(request):
+    """
+    Gas measured in this session: {name: gas}.
+    Written to `--gas-report` and merged into the baseline with `--update-gas-baseline`.
+    """
+    results = {}
+    yield results
+    if not results:
+        return
+
+    Path(request.config.getoption("--gas-report")).write_text(
+        json.dumps(results, indent=2, sort_keys=True) + "\n"
+    )
+    if request.config.getoption("--update-gas-baseline"):
+        baseline = _load_baseline() | results
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.fixture(scope="session")
+def gas_baseline():
+    return _load_baseline()
+
+
+@pytest.fixture()
+def record_gas(request, gas_results, gas_baseline):
+    """
+    Record gas used by the last call to `contract`.
+    Fails if it exceeds the baseline by more than `--gas-threshold`,
+    warns if there is no baseline to compare with.
+    """
+    threshold = request.config.getoption("--gas-threshold")
+    update = request.config.getoption("--update-gas-baseline")
+
+    def record(name, contract):
+        gas = contract._computation.get_gas_used()
+        gas_results[name] = gas
+
+        if update:
+            return gas
+        expected = gas_baseline.get(name)
+        if expected is None:
+            warnings.warn(
+                f"{name} used {gas} gas, no baseline to compare with, "
+                "record it with --update-gas-baseline",
+                GasBaselineWarning,
+            )
+        elif gas > expected * (1 + threshold):
+            pytest.fail(
+                f"{name} used {gas} gas, baseline is {expected} (+{gas / expected - 1:.2%})"
+            )
+        return gas
+
+    return record
@@ -0,0 +1 @@
+from tests.scrvusd.oracle.conftest import soracle, set_verifier  # noqa: F401  # reusing fixture
@@ -0,0 +1,76 @@
+import boa
+import pytest
+
+from scripts.scrvusd.scrvusd_oracle import CHECKPOINT_CNT, MAX_BPS_EXTENDED, MAX_V2_DURATION
+from tests.conftest import WEEK
+
+STALE_PERIODS = [0, 1, 24, MAX_V2_DURATION]
+
+
+def _price_params(ts, i=0):
+    """
+    scrvUSD in the middle of rewards distribution, allowing to project all periods.
+    :param i: Index of update to make every slot of parameters change
+    """
+    supply, balance_of_self = 10**24 + i, 10**21 + i
+    return [
+        10**24 + i,  # total_debt
+        supply // 10 + i,  # total_idle
+        supply,  # total_supply
+        ts + WEEK // 2,  # full_profit_unlock_date
+        balance_of_self * MAX_BPS_EXTENDED // WEEK,  # profit_unlocking_rate
+        ts - WEEK // 2,  # last_profit_update
+        balance_of_self,  # balance_of_self
+    ]
+
+
+@pytest.fixture(scope="module")
+def price_params(soracle, verifier, admin):
+    with boa.env.prank(admin):
+        soracle.set_max_v2_duration(MAX_V2_DURATION)
+
+    params = _price_params(boa.env.evm.patch.timestamp)
+    with boa.env.prank(verifier):
+        soracle.update_price(params, boa.env.evm.patch.timestamp, 1)
+    return params
+
+
+@pytest.mark.parametrize("periods", STALE_PERIODS)
+def test_prices(soracle, price_params, record_gas, periods):
+    with boa.env.anchor():
+        boa.env.evm.patch.timestamp += periods * WEEK
+        for fn in ["price_v0", "price_v1", "price_v2"]:
+            getattr(soracle, fn)()
+            record_gas(f"ScrvusdOracleV2.{fn}[{periods}]", soracle)
+
+
+@pytest.mark.parametrize("periods", STALE_PERIODS)
+def test_update_price(soracle, verifier, price_params, record_gas, periods):
+    with boa.env.anchor():
+        boa.env.evm.patch.timestamp += periods * WEEK
+        with boa.env.prank(verifier):
+            soracle.update_price(price_params, boa.env.evm.patch.timestamp, 2)
+        record_gas(f"ScrvusdOracleV2.update_price[{periods}]", soracle)
+
+
+def test_update_price_ring(admin, verifier, record_gas):
+    """
+    Updates with new parameters every block while the ring buffer of checkpoints fills up
+    and once it is full, so the oldest checkpoint is overwritten.
+    Run in a separate environment, committing storage between updates like between transactions.
+    Otherwise slots written before are charged as already changed in the same transaction.
+    """
+    with boa.swap_env(boa.Env()):
+        with boa.env.prank(admin):
+            soracle = boa.load("contracts/scrvusd/oracles/ScrvusdOracleV2.vy", 10**18)
+            soracle.grantRole(soracle.PRICE_PARAMETERS_VERIFIER(), verifier)
+
+        with boa.env.prank(verifier):
+            for block_number in range(1, CHECKPOINT_CNT + 3):
+                boa.env.time_travel(seconds=12, block_delta=1)
+                ts = boa.env.evm.patch.timestamp
+                boa.env.evm.vm.state.lock_changes()
+                soracle.update_price(_price_params(ts, block_number), ts, block_number)
+                if block_number == 2:
+                    record_gas("ScrvusdOracleV2.update_price[filling]", soracle)
+        record_gas("ScrvusdOracleV2.update_price[full]", soracle)
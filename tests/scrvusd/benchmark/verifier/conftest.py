@@ -0,0 +1,3 @@
+from tests.scrvusd.oracle.conftest import soracle, set_verifier  # noqa: F401  # reusing fixture
+from tests.scrvusd.verifier.conftest import verifier, verifier_deployer  # noqa: F401  # reusing fixture
+from tests.scrvusd.verifier.unitary.test_price import scrvusd_slot_values  # noqa: F401  # reusing fixture
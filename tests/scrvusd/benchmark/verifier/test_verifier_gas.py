@@ -0,0 +1,105 @@
+import random
+
+import boa
+import pytest
+import rlp
+
+from scripts.scrvusd.proof import serialize_multiproof, serialize_proofs
+from tests.scrvusd.verifier.unitary.test_multiblock import prove_blocks
+from tests.shared.verifier import get_block_and_proofs
+
+# Number of extra accounts and scrvUSD slots, making proofs deeper
+TRIE_SIZES = [0, 16, 256, 4096]
+
+
+def _grow_tries(scrvusd, size):
+    rng = random.Random(size)
+    for _ in range(size):
+        boa.env.set_storage(boa.env.generate_address(), 0, 1)
+        boa.env.set_storage(scrvusd.address, rng.getrandbits(256), 1)
+
+
+@pytest.mark.parametrize("size", TRIE_SIZES)
+def test_by_blockhash(
+    verifier, soracle_price_slots, boracle, scrvusd, scrvusd_slot_values, record_gas, size
+):
+    with boa.env.anchor():
+        _grow_tries(scrvusd, size)
+        block_header, proofs = get_block_and_proofs([(scrvusd, soracle_price_slots)])
+        boracle._set_block_hash(block_header.block_number, block_header.hash)
+
+        verifier.verifyScrvusdByBlockHash(rlp.encode(block_header), serialize_proofs(proofs[0]))
+        record_gas(f"ScrvusdVerifierV3.verifyScrvusdByBlockHash[{size}]", verifier)
+
+
+@pytest.mark.parametrize("size", TRIE_SIZES)
+def test_by_stateroot(
+    verifier, soracle_price_slots, boracle, scrvusd, scrvusd_slot_values, record_gas, size
+):
+    with boa.env.anchor():
+        _grow_tries(scrvusd, size)
+        block_header, proofs = get_block_and_proofs([(scrvusd, soracle_price_slots)])
+        boracle._set_state_root(block_header.block_number, block_header.state_root)
+
+        verifier.verifyScrvusdByStateRoot(block_header.block_number, serialize_proofs(proofs[0]))
+        record_gas(f"ScrvusdVerifierV3.verifyScrvusdByStateRoot[{size}]", verifier)
+
+
+@pytest.mark.parametrize("size", TRIE_SIZES)
+def test_combined_by_blockhash(
+    verifier,
+    soracle_price_slots,
+    soracle_period_slots,
+    boracle,
+    scrvusd,
+    scrvusd_slot_values,
+    record_gas,
+    size,
+):
+    with boa.env.anchor():
+        _grow_tries(scrvusd, size)
+        block_header, proofs = get_block_and_proofs(
+            [(scrvusd, soracle_price_slots + soracle_period_slots)]
+        )
+        boracle._set_block_hash(block_header.block_number, block_header.hash)
+
+        verifier.verifyScrvusdAndPeriodByBlockHash(
+            rlp.encode(block_header), serialize_proofs(proofs[0])
+        )
+        record_gas(f"ScrvusdVerifierV3.verifyScrvusdAndPeriodByBlockHash[{size}]", verifier)
+
+
+@pytest.mark.parametrize("size", TRIE_SIZES)
+def test_compact_by_blockhash(
+    verifier, soracle_price_slots, boracle, scrvusd, scrvusd_slot_values, record_gas, size
+):
+    with boa.env.anchor():
+        _grow_tries(scrvusd, size)
+        block_header, proofs = get_block_and_proofs([(scrvusd, soracle_price_slots)])
+        boracle._set_block_hash(block_header.block_number, block_header.hash)
+
+        verifier.verifyScrvusdByBlockHashCompact(
+            rlp.encode(block_header), serialize_multiproof(proofs[0])
+        )
+        record_gas(f"ScrvusdVerifierV3.verifyScrvusdByBlockHashCompact[{size}]", verifier)
+
+
+@pytest.mark.parametrize("cnt", [1, 4])
+def test_by_blockhashes(
+    verifier,
+    soracle_price_slots,
+    boracle,
+    scrvusd,
+    crvusd,
+    admin,
+    scrvusd_slot_values,
+    record_gas,
+    cnt,
+):
+    with boa.env.anchor():
+        blocks = prove_blocks(scrvusd, crvusd, admin, boracle, soracle_price_slots, cnt)
+        verifier.verifyScrvusdByBlockHashes(
+            [rlp.encode(block_header) for block_header, _ in blocks],
+            [multiproof for _, multiproof in blocks],
+        )
+        record_gas(f"ScrvusdVerifierV3.verifyScrvusdByBlockHashes[{cnt}]", verifier)
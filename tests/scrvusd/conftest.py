@@ -14,11 +14,16 @@ def crvusd():
     return boa.load("tests/shared/contracts/ERC20Mock.vy", "CRV USD", "crvUSD", 18)
 
 
+@pytest.fixture(scope="session")
+def scrvusd_deployer():
+    # Compiled once per worker
+    return boa.load_partial("tests/scrvusd/contracts/scrvusd/contracts/yearn/VaultV3.vy")
+
+
 @pytest.fixture(scope="module")
-def scrvusd(crvusd, admin):
+def scrvusd(crvusd, admin, scrvusd_deployer):
     with boa.env.prank(admin):
-        scrvusd = boa.load(
-            "tests/scrvusd/contracts/scrvusd/contracts/yearn/VaultV3.vy",
+        scrvusd = scrvusd_deployer.deploy(
             override_address="0x0655977feb2f289a4ab78af67bab0d17aab84367",
         )
         # Undo `self.asset = self`
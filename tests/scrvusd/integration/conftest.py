@@ -1,2 +1,2 @@
 from tests.scrvusd.oracle.conftest import soracle, set_verifier  # noqa: F401  # reusing fixture
-from tests.scrvusd.verifier.conftest import verifier  # noqa: F401  # reusing fixture
+from tests.scrvusd.verifier.conftest import verifier, verifier_deployer  # noqa: F401  # reusing fixture
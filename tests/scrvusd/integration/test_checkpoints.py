@@ -0,0 +1,65 @@
+import boa
+import rlp
+
+from scripts.scrvusd.proof import serialize_proofs
+from tests.scrvusd.verifier.unitary.test_multiblock import prove_blocks
+from tests.shared.verifier import get_block_and_proofs
+
+
+def test_by_blockhashes(verifier, soracle_price_slots, soracle, boracle, scrvusd, crvusd, admin):
+    with boa.env.anchor():
+        cnt = soracle.checkpoint_cnt()
+        blocks = prove_blocks(scrvusd, crvusd, admin, boracle, soracle_price_slots, 4)
+        verifier.verifyScrvusdByBlockHashes(
+            [rlp.encode(block_header) for block_header, _ in blocks],
+            [multiproof for _, multiproof in blocks],
+        )
+
+        assert soracle.checkpoint_cnt() == cnt + len(blocks)
+        prices = []
+        for block_header, _ in blocks:
+            checkpoint = soracle.find_checkpoint(block_header.timestamp)
+            assert checkpoint[:2] == (block_header.block_number, block_header.timestamp)
+            prices.append(soracle.price_at(block_header.timestamp))
+        # Rewards are reported between blocks
+        assert prices == sorted(prices)
+        assert tuple(checkpoint[2]) == tuple(soracle._storage.price_params.get().values())
+
+        # Blocks in descending order are outdated
+        with boa.reverts("Outdated"):
+            verifier.verifyScrvusdByBlockHashes(
+                [rlp.encode(block_header) for block_header, _ in blocks[::-1]],
+                [multiproof for _, multiproof in blocks[::-1]],
+            )
+
+
+def test_with_state_root(verifier, soracle_price_slots, soracle, boracle, scrvusd, crvusd, admin):
+    """
+    State root verifications submit parameters true at `last_profit_update`,
+    so ones before the previous checkpoint are not kept.
+    """
+    with boa.env.anchor():
+        with boa.env.prank(admin):
+            crvusd._mint_for_testing(scrvusd, 10**16)
+            scrvusd.process_report(scrvusd)
+        cnt = soracle.checkpoint_cnt()
+        blocks = []
+        for by_state_root in [False, True, False, True, True, False]:
+            boa.env.time_travel(seconds=12, block_delta=1)
+            block_header, proofs = get_block_and_proofs([(scrvusd, soracle_price_slots)])
+            if by_state_root:
+                boracle._set_state_root(block_header.block_number, block_header.state_root)
+                verifier.verifyScrvusdByStateRoot(
+                    block_header.block_number, serialize_proofs(proofs[0])
+                )
+            else:
+                boracle._set_block_hash(block_header.block_number, block_header.hash)
+                verifier.verifyScrvusdByBlockHash(
+                    rlp.encode(block_header), serialize_proofs(proofs[0])
+                )
+                blocks.append(block_header)
+
+        assert soracle.checkpoint_cnt() == cnt + len(blocks)
+        for block_header in blocks:
+            checkpoint = soracle.find_checkpoint(block_header.timestamp)
+            assert checkpoint[:2] == (block_header.block_number, block_header.timestamp)
@@ -0,0 +1,57 @@
+import functools
+
+import pytest
+from hypothesis import settings
+from hypothesis.stateful import run_state_machine_as_test
+
+from tests.scrvusd.oracle.stateful.crvusd_state_machine import VerifiedSoracleStateMachine
+
+
+def test_verified_simple(crvusd, scrvusd, admin, soracle, soracle_price_slots, verifier, boracle):
+    machine = VerifiedSoracleStateMachine(
+        # ScrvusdStateMachine
+        crvusd=crvusd,
+        scrvusd=scrvusd,
+        admin=admin,
+        # SoracleStateMachine
+        soracle=soracle,
+        verifier=verifier,
+        soracle_slots=soracle_price_slots,
+        # VerifiedSoracleStateMachine
+        boracle=boracle,
+    )
+    machine.update_price()
+    machine.wait(3600)
+    machine.user_changes(4444 * 10**18)
+    machine.update_price(by_state_root=True)
+    machine.set_profit_max_unlock_time(8 * 86400)
+    machine.add_rewards(22 * 10**18)
+    machine.update_price(with_period=True)
+    machine.wait(86400)
+    machine.update_price(by_state_root=True, with_period=True)
+
+
+@pytest.mark.slow
+def test_verified(
+    crvusd, scrvusd, admin, soracle, soracle_price_slots, verifier, boracle, shard_examples
+):
+    run_state_machine_as_test(
+        functools.partial(
+            VerifiedSoracleStateMachine,
+            # ScrvusdStateMachine
+            crvusd=crvusd,
+            scrvusd=scrvusd,
+            admin=admin,
+            # SoracleStateMachine
+            soracle=soracle,
+            verifier=verifier,
+            soracle_slots=soracle_price_slots,
+            # VerifiedSoracleStateMachine
+            boracle=boracle,
+        ),
+        settings=settings(
+            max_examples=shard_examples(100),
+            stateful_step_count=30,
+            deadline=None,
+        ),
+    )
@@ -1,7 +1,20 @@
+import copy
+
 import boa
+import rlp
 from hypothesis import strategies as st, settings
 from hypothesis.stateful import RuleBasedStateMachine, rule
 
+from scripts.scrvusd.proof import PERIOD_SLOT, serialize_proofs
+from scripts.scrvusd.scrvusd_oracle import (
+    CHECKPOINT_CNT,
+    PriceParams,
+    ScrvusdOracleV2,
+    price_per_share,
+    unpack_checkpoint,
+)
+from tests.shared.verifier import get_block_and_proofs
+
 
 DUST_AMOUNT = 10**10
 
@@ -41,6 +54,16 @@ class ScrvusdStateMachine(RuleBasedStateMachine):
         """
         return self.scrvusd.pricePerShare()
 
+    def now(self):
+        return boa.env.evm.patch.timestamp
+
+    def travel_to(self, ts):
+        """
+        Move time forward to `ts`, does nothing if it has already come.
+        """
+        if ts > self.now():
+            boa.env.time_travel(seconds=ts - self.now())
+
     @rule(supply=st.integers(min_value=DUST_AMOUNT, max_value=10**36))
     def user_changes(self, supply):
         """
@@ -87,10 +110,75 @@ class SoracleStateMachine(ScrvusdStateMachine):
         self.verifier = verifier
         self.soracle_slots = soracle_slots
 
-    @rule()
-    def update_price(self):
+        self.model = self.load_model()
+
+    def price_params(self) -> PriceParams:
         """
-        Simulate price update in oracle.
+        :return: Current scrvUSD parameters as read by the oracle.
+        """
+        return PriceParams(
+            *[boa.env.evm.get_storage(self.scrvusd.address, slot) for slot in self.soracle_slots]
+        )
+
+    def future_price(self, ts, params=None):
+        """
+        scrvUSD price at `ts` if nobody interacts with it, computed without moving time.
+        :param params: Price parameters to use instead of reading current ones
+        """
+        return price_per_share(params or self.price_params(), ts)
+
+    def load_model(self) -> ScrvusdOracleV2:
+        """
+        Read oracle storage into a pure-Python model, so prices at any timestamp are
+        computed without EVM calls and snapshots.
+        """
+        storage = self.soracle._storage
+        model = ScrvusdOracleV2(0, 0)
+        model.last_block_number = self.soracle.last_block_number()
+        model.last_prices = list(storage.last_prices.get())
+        model.last_update = storage.last_update.get()
+        model.profit_max_unlock_time = self.soracle.profit_max_unlock_time()
+        model.price_params = PriceParams(**storage.price_params.get())
+        model.price_params_ts = storage.price_params_ts.get()
+        model.max_price_increment = self.soracle.max_price_increment()
+        model.max_v2_duration = self.soracle.max_v2_duration()
+        cnt = self.soracle.checkpoint_cnt()
+        packed = storage.checkpoints.get()
+        model.checkpoints = [
+            unpack_checkpoint(packed[i % CHECKPOINT_CNT])
+            for i in range(max(cnt - CHECKPOINT_CNT, 0), cnt)
+        ]
+        return model
+
+    def updated_model(self) -> ScrvusdOracleV2:
+        """
+        Model of the oracle as if `update_price()` was called now, the oracle is not touched.
+        """
+        model = copy.deepcopy(self.model)
+        model.update_price(
+            self.price_params(), self.now(), boa.env.evm.patch.block_number, self.now()
+        )
+        return model
+
+    def check_oracle(self, model, timestamps, version):
+        """
+        Check `price_v{version}` of the oracle against `model` at the first, middle and last
+        of `timestamps`, moving time in a snapshot. The oracle must be in the state of `model`,
+        e.g. updated with `update_oracle()` for `updated_model()`.
+        """
+        if not timestamps:
+            return
+        sample = sorted({timestamps[0], timestamps[len(timestamps) // 2], timestamps[-1]})
+        with boa.env.anchor():
+            for ts in sample:
+                self.travel_to(ts)
+                assert getattr(self.soracle, f"price_v{version}")() == getattr(
+                    model, f"price_v{version}"
+                )(ts)
+
+    def update_oracle(self):
+        """
+        Update the oracle with current scrvUSD parameters, the model is not reloaded.
         """
         with boa.env.prank(self.verifier):
             self.soracle.update_price(
@@ -101,3 +189,75 @@ class SoracleStateMachine(ScrvusdStateMachine):
                 boa.env.evm.patch.timestamp,
                 boa.env.evm.patch.block_number,
             )
+
+    @rule()
+    def update_price(self):
+        """
+        Simulate price update in oracle.
+        """
+        self.update_oracle()
+        self.model = self.load_model()
+
+
+class VerifiedSoracleStateMachine(SoracleStateMachine):
+    """
+    State Machine updating the oracle through the verifier with block header and state proofs,
+    so RLP and trie decoding are checked at every step against the model of the oracle.
+    Proofs are built incrementally and reused while the state does not change.
+    """
+
+    def __init__(self, crvusd, scrvusd, admin, soracle, verifier, soracle_slots, boracle):
+        super().__init__(crvusd, scrvusd, admin, soracle, verifier, soracle_slots)
+        self.boracle = boracle
+
+    @rule(period=st.integers(min_value=1, max_value=4 * 7 * 86400))
+    def set_profit_max_unlock_time(self, period):
+        """
+        Change reward distribution period, reaching the oracle only with `with_period` updates.
+        """
+        with boa.env.prank(self.admin):
+            self.scrvusd.setProfitMaxUnlockTime(period)
+
+    @rule(by_state_root=st.booleans(), with_period=st.booleans())
+    def update_price(self, by_state_root=False, with_period=False):
+        """
+        Prove current scrvUSD parameters to the oracle.
+        :param by_state_root: Use state root instead of block header, parameters are true
+            at `last_profit_update` then
+        :param with_period: Prove `profit_max_unlock_time` in the same call
+        """
+        slots = self.soracle_slots + ([PERIOD_SLOT] if with_period else [])
+        block_header, proofs = get_block_and_proofs([(self.scrvusd, slots)])
+        proof_rlp = serialize_proofs(proofs[0])
+        params = self.price_params()
+
+        expected = copy.deepcopy(self.model)
+        ts = params.last_profit_update if by_state_root else block_header.timestamp
+        price_change = expected.update_price(params, ts, block_header.block_number, self.now())
+        result = price_change
+        if with_period:
+            period = boa.env.evm.get_storage(self.scrvusd.address, PERIOD_SLOT)
+            period_changed = expected.update_profit_max_unlock_time(
+                period, block_header.block_number
+            )
+            result = (price_change, period_changed)
+
+        if by_state_root:
+            self.boracle._set_state_root(block_header.block_number, block_header.state_root)
+            verify = (
+                self.verifier.verifyScrvusdAndPeriodByStateRoot
+                if with_period
+                else self.verifier.verifyScrvusdByStateRoot
+            )
+            assert verify(block_header.block_number, proof_rlp) == result
+        else:
+            self.boracle._set_block_hash(block_header.block_number, block_header.hash)
+            verify = (
+                self.verifier.verifyScrvusdAndPeriodByBlockHash
+                if with_period
+                else self.verifier.verifyScrvusdByBlockHash
+            )
+            assert verify(rlp.encode(block_header), proof_rlp) == result
+
+        self.model = self.load_model()
+        assert vars(self.model) == vars(expected)
@@ -0,0 +1,125 @@
+import functools
+from decimal import MAX_EMAX, Decimal, localcontext
+
+import boa
+import pytest
+from hypothesis import settings
+from hypothesis import strategies as st
+from hypothesis.stateful import RuleBasedStateMachine, invariant, rule, run_state_machine_as_test
+
+from scripts.scrvusd.scrvusd_oracle import (
+    MAX_PRICE_FACTOR,
+    PRICE_POWER_CNT,
+    max_price_factor,
+    smoothed_price,
+)
+
+
+def exact_factor(max_price_increment, dt):
+    """
+    High-precision reference of (1 + max_price_increment / 10**18) ** dt with 10**18 precision.
+    """
+    with localcontext() as ctx:
+        ctx.prec = 100
+        ctx.Emax = MAX_EMAX
+        return (1 + Decimal(max_price_increment) / 10**18) ** dt * 10**18
+
+
+def max_error(dt):
+    """
+    Relative error of the factor: each squaring doubles the error of the previous power
+    and adds a rounding, each multiplication by a power adds a rounding.
+    """
+    return Decimal(2 * dt + 2 * PRICE_POWER_CNT) / 10**18
+
+
+class MaxPriceFactorStateMachine(RuleBasedStateMachine):
+    """
+    Compare compounded price limit of the oracle against the exact value
+    while `max_price_increment` is changed.
+    """
+
+    st_max_price_increment = st.one_of(
+        st.integers(min_value=10**8, max_value=10**18),
+        st.sampled_from([10**8, 2 * 10**12, 10**18]),
+    )
+    st_dt = st.one_of(
+        st.integers(min_value=0, max_value=2**PRICE_POWER_CNT + 1),
+        st.integers(min_value=0, max_value=86400),
+        st.sampled_from([0, 1, 12, 2**PRICE_POWER_CNT - 1, 2**PRICE_POWER_CNT]),
+    )
+
+    def __init__(self, soracle, admin):
+        super().__init__()
+        self.soracle = soracle
+        self.admin = admin
+
+    @rule(max_price_increment=st_max_price_increment)
+    def set_max_price_increment(self, max_price_increment):
+        with boa.env.prank(self.admin):
+            self.soracle.set_max_price_increment(max_price_increment)
+
+    @rule(dt=st_dt)
+    def max_price_factor(self, dt):
+        max_price_increment = self.soracle.max_price_increment()
+        factor = self.soracle.internal._max_price_factor(dt)
+        assert factor == max_price_factor(max_price_increment, dt)
+
+        if dt >= 2**PRICE_POWER_CNT:
+            assert factor == MAX_PRICE_FACTOR
+            return
+        exact = min(exact_factor(max_price_increment, dt), MAX_PRICE_FACTOR)
+        # Never exceeds the exact value, so the limit is not looser than intended
+        assert factor <= exact
+        assert factor >= exact * (1 - max_error(dt))
+
+    @rule(
+        dt=st_dt,
+        last_price=st.integers(min_value=10**17, max_value=10**19),
+        raw_price=st.integers(min_value=0, max_value=10**20),
+    )
+    def smoothed_price(self, dt, last_price, raw_price):
+        """
+        Price is limited by the linear factor first and by the compounded one outside of it.
+        """
+        max_price_increment = self.soracle.max_price_increment()
+        linear = min(10**18 + max_price_increment * dt, MAX_PRICE_FACTOR)
+        compounded = max_price_factor(max_price_increment, dt)
+        for raw in [raw_price] + [
+            max(bound + delta, 0)
+            for factor in [linear, compounded]
+            for bound in [last_price * factor // 10**18, last_price * 10**18 // factor]
+            for delta in [-1, 0, 1]
+        ]:
+            assert self.soracle.internal._smoothed_price_after(
+                last_price, raw, dt
+            ) == smoothed_price(last_price, raw, max_price_increment, dt)
+
+    @invariant()
+    def one_second(self):
+        # A single second is not rounded
+        max_price_increment = self.soracle.max_price_increment()
+        assert self.soracle.internal._max_price_factor(1) == 10**18 + max_price_increment
+        assert self.soracle.internal._max_price_factor(0) == 10**18
+
+
+def test_max_price_factor_simple(soracle, admin):
+    machine = MaxPriceFactorStateMachine(soracle, admin)
+    for max_price_increment in [10**8, 2 * 10**12, 10**18]:
+        machine.set_max_price_increment(max_price_increment)
+        for dt in [0, 1, 12, 3600, 86400, 365 * 86400, 2**PRICE_POWER_CNT - 1]:
+            machine.max_price_factor(dt)
+            machine.smoothed_price(dt, 10**18, 10**18 + 10**16)
+        machine.one_second()
+
+
+@pytest.mark.slow
+def test_max_price_factor(soracle, admin, shard_examples):
+    run_state_machine_as_test(
+        functools.partial(MaxPriceFactorStateMachine, soracle=soracle, admin=admin),
+        settings=settings(
+            max_examples=shard_examples(100),
+            stateful_step_count=10,
+            deadline=None,
+        ),
+    )
@@ -3,9 +3,10 @@ import functools
 import boa
 from hypothesis import settings
 from hypothesis import strategies as st
-from hypothesis.stateful import invariant, run_state_machine_as_test, given
+from hypothesis.stateful import initialize, invariant, rule, run_state_machine_as_test
 from tests.conftest import WEEK
 
+from scripts.scrvusd.scrvusd_oracle import MAX_PRICE_FACTOR, smoothed_price
 from tests.scrvusd.oracle.stateful.crvusd_state_machine import SoracleStateMachine
 import pytest
 
@@ -13,53 +14,100 @@ import pytest
 class SoracleTestStateMachine(SoracleStateMachine):
     """
     State Machine to test different oracle price versions behaviour.
+    Expected oracle prices come from the model of the oracle (`updated_model()`) and
+    `future_price()` smoothed like the oracle does (`smoothed()`),
+    so timestamps are checked without moving time and taking snapshots.
+    The oracle itself is checked against the model at a sample of them, see `check_oracle()`.
     """
 
-    # Tests become extremely slow (~7 min for test_price_simple)
-    # Tried to use as:
-    # @given(data=st.data())
-    # def ...
-    #       ...data.draw(self.st_time_delay)...
-    #
-    # st_week_timestamps = st.lists(
-    #     st.integers(min_value=0, max_value=7 * 86400 - 1),
-    #     unique=True,
-    #     min_size=5,  # making execution time more determined
-    #     max_size=5,
-    # ).map(sorted)
-    # st_iterate_over_week = st_week_timestamps.map(
-    #     lambda lst: list(map(lambda x: x[1] - x[0], zip([0] + lst, lst + [7 * 86400])))
-    # )  # generates ts_delta
-    #
-    # st_time_delay = st.integers(min_value=1, max_value=30 * 86400)
-    #
-    # st_weeks = st.lists(
-    #     st.integers(min_value=1, max_value=4 * 3),
-    #     unique=True,
-    #     min_size=5,  # making execution time more determined
-    #     max_size=5,
-    # ).map(sorted)
-
-    st_week_timestamps = [1, 60, 3600, 86400, 4 * 86400]
-    st_iterate_over_week = [
-        x[1] - x[0] for x in zip([0] + st_week_timestamps, st_week_timestamps + [7 * 86400])
-    ]
-
-    st_time_delays = [1, 86400, 3600, 30 * 86400, 60]
-    st_weeks = [0, 1, 2, 5, 10, 12]
+    st_week_timestamps = st.lists(
+        st.integers(min_value=1, max_value=WEEK),
+        unique=True,
+        min_size=1,
+        max_size=5,
+    ).map(sorted)
+    st_time_delays = st.lists(st.integers(min_value=1, max_value=30 * 86400), max_size=5)
+    st_weeks = st.lists(
+        st.integers(min_value=0, max_value=4 * 3),
+        unique=True,
+        min_size=1,
+        max_size=5,
+    ).map(sorted)
+    st_rewards = st.integers(min_value=0, max_value=10**9 * 10**18)
 
     def __init__(self, crvusd, scrvusd, admin, soracle, verifier, soracle_slots):
         super().__init__(crvusd, scrvusd, admin, soracle, verifier, soracle_slots)
 
         self.last_oracle_v0 = self.soracle.price_v0()
 
+        # Used when methods are called directly, drawn by `draw_timestamps()` otherwise
+        self.week_timestamps = [1, 60, 3600, 86400, 4 * 86400, WEEK]
+        self.time_delays = [1, 86400, 3600, 30 * 86400, 60]
+        self.weeks = [0, 1, 2, 5, 10, 12]
+        self.rewards = 333 * 10**18
+
+    @initialize(
+        week_timestamps=st_week_timestamps,
+        time_delays=st_time_delays,
+        weeks=st_weeks,
+        rewards=st_rewards,
+    )
+    def initialize_timestamps(self, week_timestamps, time_delays, weeks, rewards):
+        self.draw_timestamps(week_timestamps, time_delays, weeks, rewards)
+
+    @rule(
+        week_timestamps=st_week_timestamps,
+        time_delays=st_time_delays,
+        weeks=st_weeks,
+        rewards=st_rewards,
+    )
+    def draw_timestamps(self, week_timestamps, time_delays, weeks, rewards):
+        """
+        Choose timestamps to check prices at.
+        :param week_timestamps: Offsets within a week
+        :param time_delays: Delays between checks after a week
+        :param weeks: Weeks to check v2 at
+        :param rewards: Amount of rewards (in crvUSD) being distributed every week for v2
+        """
+        self.week_timestamps = week_timestamps
+        self.time_delays = time_delays
+        self.weeks = weeks
+        self.rewards = rewards
+
+    def smoothed(self, model, version, ts, price):
+        """
+        `price` limited like `price_v{version}` of `model` at `ts`.
+        The limit is `MAX_PRICE_FACTOR` here (see `max_price_increment`), so it matters
+        only for jumps over it.
+        """
+        return smoothed_price(
+            model.last_prices[version], price, model.max_price_increment, ts - model.last_update
+        )
+
+    @invariant()
+    def vault_model(self):
+        """
+        Test that scrvUSD price is replicated from its parameters.
+        """
+        assert self.future_price(self.now()) == self.price()
+
+    @invariant()
+    def oracle_model(self):
+        """
+        Test that the model used for expectations matches the oracle.
+        """
+        assert self.soracle.price_v0() == self.model.price_v0(self.now())
+        assert self.soracle.price_v1() == self.model.price_v1(self.now())
+        assert self.soracle.price_v2() == self.model.price_v2(self.now())
+
     @invariant()
     def raw_price(self):
         """
         Test that `update_price(...)` catches up the price.
         """
+        assert self.updated_model().raw_price(self.now(), self.now()) == self.price()
         with boa.env.anchor():
-            self.update_price()
+            self.update_oracle()
             assert self.soracle.raw_price() == self.price()
 
     @invariant()
@@ -76,12 +124,14 @@ class SoracleTestStateMachine(SoracleStateMachine):
         assert self.last_oracle_v0 <= cur_price <= self.price()
         self.last_oracle_v0 = cur_price
 
+        # Update comes only the next second, but the actual price might change the next second
+        model = self.updated_model()
+        assert model.price_v0(self.now() + 1) == self.smoothed(
+            model, 0, self.now() + 1, self.price()
+        )
         with boa.env.anchor():
-            self.update_price()
-            # Update comes only the next second, but the actual price might change the next second
-            price = self.price()
-            boa.env.time_travel(seconds=1)
-            assert self.soracle.price_v0() == price
+            self.update_oracle()
+            self.check_oracle(model, [self.now() + 1], 0)
 
     @invariant()
     def price_v1(self):
@@ -91,22 +141,23 @@ class SoracleTestStateMachine(SoracleStateMachine):
         Properties:
             - True if scrvUSD is not touched at all.
         """
-        with boa.env.anchor():
-            self.update_price()
+        model, params = self.updated_model(), self.price_params()
 
-            # Check following week
-            for ts_delta in self.st_iterate_over_week:
-                boa.env.time_travel(seconds=ts_delta)
-                assert self.soracle.price_v1() == self.price()
-            # Check random 10 timestamps after
-            for delay in self.st_time_delays:
-                boa.env.time_travel(seconds=delay)
-                assert self.soracle.price_v1() == self.price()
+        # Check following week
+        timestamps = [self.now() + ts_delta for ts_delta in self.week_timestamps]
+        # Check random timestamps after
+        for delay in self.time_delays:
+            timestamps.append(timestamps[-1] + delay)
+
+        for ts, price in zip(timestamps, model.prices(timestamps, 1)):
+            assert price == self.smoothed(model, 1, ts, self.future_price(ts, params))
+        with boa.env.anchor():
+            self.update_oracle()
+            self.check_oracle(model, timestamps, 1)
 
     @invariant()
-    @given(amount=st.integers(min_value=0, max_value=10**9 * 10**18))
-    def price_v2(self, amount):
-        self._price_v2(amount)
+    def price_v2(self):
+        self._price_v2(self.rewards)
 
     def _price_v2(self, amount):
         """
@@ -116,60 +167,62 @@ class SoracleTestStateMachine(SoracleStateMachine):
         # Check literally rewarding same amount at the start of every week
         with boa.env.anchor():
             # Forget about previous rewards
-            boa.env.time_travel(seconds=7 * 86400)
+            boa.env.time_travel(seconds=WEEK)
             self.add_rewards(amount)
-            self.update_price()
-
-            for i in range(max(self.st_weeks)):
-                if i in self.st_weeks:
-                    for ts_delta in self.st_iterate_over_week:
-                        boa.env.time_travel(seconds=ts_delta)
-                        assert self.soracle.price_v2() == pytest.approx(
-                            self.price(), rel=1e-8
-                        )  # computation errors
-                else:
-                    boa.env.time_travel(seconds=7 * 86400)
+            model, start = self.updated_model(), self.now()
+            self.update_oracle()
+
+            for i in range(max(self.weeks) + 1):
+                if i in self.weeks:
+                    params = self.price_params()
+                    timestamps = [start + i * WEEK + ts_delta for ts_delta in self.week_timestamps]
+                    for ts, price in zip(timestamps, model.prices(timestamps, 2)):
+                        # computation errors
+                        assert price == pytest.approx(
+                            self.smoothed(model, 2, ts, self.future_price(ts, params)), rel=1e-8
+                        )
+                    self.check_oracle(model, timestamps, 2)
+                self.travel_to(start + (i + 1) * WEEK)
                 self.add_rewards(amount)
 
         # Simulate same total amount, but approximate price value
         with boa.env.anchor():
             amounts = [amount // 2, amount // 3]
             amounts.append(amount - sum(amounts))
-            week_checkpoints = [0, 86400, 4 * 86400, 7 * 86400]
+            week_checkpoints = [0, 86400, 4 * 86400, WEEK]
             # forget about previous rewards, so they don't sum up resulting in huge error
-            boa.env.time_travel(seconds=7 * 86400)
-            sim_start = boa.env.evm.patch.timestamp
+            boa.env.time_travel(seconds=WEEK)
 
             # Last week
             price_change = self._get_final_price()
             self.add_rewards(
                 amount
             )  # Can not simulate consecutive adding because reward periods may differ
-            boa.env.time_travel(seconds=7 * 86400)
+            boa.env.time_travel(seconds=WEEK)
             price_change = self._get_final_price() / price_change
-            self.update_price()
-
-            for i in range(max(self.st_weeks)):
-                j = 0
-                if i in self.st_weeks:
-                    for ts_delta in self.st_iterate_over_week:
-                        boa.env.time_travel(seconds=ts_delta)
-                        while (boa.env.evm.patch.timestamp - sim_start) % WEEK >= week_checkpoints[
-                            j
-                        ]:
-                            self.add_rewards(amounts[j])
-                            j += 1
-                        boa.env.time_travel(seconds=ts_delta)
-                        assert self.soracle.price_v2() == pytest.approx(
-                            self.price(), rel=price_change
+            model, start = self.updated_model(), self.now()
+            self.update_oracle()
+
+            for i in range(max(self.weeks) + 1):
+                for j, reward in enumerate(amounts):
+                    self.travel_to(start + i * WEEK + week_checkpoints[j])
+                    self.add_rewards(reward)
+                    if i not in self.weeks:
+                        continue
+
+                    # Parameters do not change until the next checkpoint
+                    params = self.price_params()
+                    timestamps = [
+                        start + i * WEEK + ts_delta
+                        for ts_delta in self.week_timestamps
+                        if week_checkpoints[j] < ts_delta <= week_checkpoints[j + 1]
+                    ]
+                    for ts, price in zip(timestamps, model.prices(timestamps, 2)):
+                        assert price == pytest.approx(
+                            self.smoothed(model, 2, ts, self.future_price(ts, params)),
+                            rel=price_change,
                         )
-                while j < len(amounts):
-                    self.add_rewards(amounts[j])
-                    j += 1
-                    boa.env.time_travel(
-                        seconds=week_checkpoints[j]
-                        - (boa.env.evm.patch.timestamp - sim_start) % WEEK
-                    )
+                    self.check_oracle(model, timestamps, 2)
 
     def _get_final_price(self):
         total_idle = boa.env.evm.get_storage(self.scrvusd.address, self.soracle_slots[1])
@@ -181,11 +234,11 @@ class SoracleTestStateMachine(SoracleStateMachine):
 @pytest.fixture(scope="module", autouse=True)
 def max_price_increment(soracle, admin):
     """
-    Turning off smoothening.
+    Limit price change only by `MAX_PRICE_FACTOR` from the first second,
+    which scrvUSD price moves do not reach in these tests.
     """
-    # big enough to be omitted in calculation and
-    # small enough not to overflow
-    max_price_increment = 2**128 - 1
+    # Linear factor is saturated at dt = 1, compounding products still fit into uint256
+    max_price_increment = MAX_PRICE_FACTOR
     soracle.eval(f"self.max_price_increment = {max_price_increment}")
     return max_price_increment
 
@@ -251,7 +304,9 @@ def test_example(crvusd, scrvusd, admin, soracle, soracle_price_slots, verifier)
 
 
 @pytest.mark.slow
-def test_scrvusd_oracle(crvusd, scrvusd, admin, soracle, soracle_price_slots, verifier):
+def test_scrvusd_oracle(
+    crvusd, scrvusd, admin, soracle, soracle_price_slots, verifier, shard_examples
+):
     run_state_machine_as_test(
         functools.partial(
             SoracleTestStateMachine,
@@ -265,7 +320,7 @@ def test_scrvusd_oracle(crvusd, scrvusd, admin, soracle, soracle_price_slots, ve
             soracle_slots=soracle_price_slots,
         ),
         settings=settings(
-            max_examples=10,
+            max_examples=shard_examples(20),
             stateful_step_count=10,
             deadline=None,
         ),
@@ -2,7 +2,8 @@ import functools
 
 import boa
 from hypothesis import settings
-from hypothesis.stateful import invariant, run_state_machine_as_test
+from hypothesis import strategies as st
+from hypothesis.stateful import initialize, invariant, rule, run_state_machine_as_test
 
 from tests.scrvusd.oracle.stateful.crvusd_state_machine import SoracleStateMachine
 import pytest
@@ -20,22 +21,13 @@ class SmootheningStateMachine(SoracleStateMachine):
     though the purpose is to test final methods.
     """
 
-    # # Force-including 0 and 1 as basic values to check
-    # st_period_timestamps = st.lists(
-    #     st.integers(min_value=2, max_value=PERIOD_CHECK_DURATION),
-    #     unique=True,
-    #     min_size=5,
-    #     max_size=5,
-    # ).map(sorted)
-    # st_iterate_over_period = st_period_timestamps.map(
-    #     lambda lst: [0, 1] + list(map(lambda x: x[1] - x[0], zip([0] + lst, lst + [PERIOD_CHECK_DURATION])))
-    # )  # generates ts_delta
-
-    st_period_timestamps = [0, 1, 2, 60, 3600, 86400, PERIOD_CHECK_DURATION // 10]
-    st_iterate_over_period = [
-        x[1] - x[0]
-        for x in zip([0] + st_period_timestamps, st_period_timestamps + [PERIOD_CHECK_DURATION])
-    ]
+    # Force-including 1 as basic value to check
+    st_period_timestamps = st.lists(
+        st.integers(min_value=2, max_value=PERIOD_CHECK_DURATION - 1),
+        unique=True,
+        min_size=5,
+        max_size=5,
+    ).map(lambda lst: [1] + sorted(lst) + [PERIOD_CHECK_DURATION])
 
     def __init__(
         self, crvusd, scrvusd, admin, soracle, verifier, soracle_slots, max_price_increment
@@ -43,35 +35,45 @@ class SmootheningStateMachine(SoracleStateMachine):
         super().__init__(crvusd, scrvusd, admin, soracle, verifier, soracle_slots)
 
         self.max_price_increment = max_price_increment
+        # Used when methods are called directly, drawn by `draw_timestamps()` otherwise
+        self.period_timestamps = [1, 2, 60, 3600, 86400, PERIOD_CHECK_DURATION // 10]
+        self.period_timestamps.append(PERIOD_CHECK_DURATION)
+
+    @initialize(period_timestamps=st_period_timestamps)
+    def initialize_timestamps(self, period_timestamps):
+        self.draw_timestamps(period_timestamps)
+
+    @rule(period_timestamps=st_period_timestamps)
+    def draw_timestamps(self, period_timestamps):
+        """
+        :param period_timestamps: Offsets from now to check prices at
+        """
+        self.period_timestamps = period_timestamps
 
     @invariant(check_during_init=True)
     def smoothed_price(self):
         """
         Test that price moves within limits set.
+        Prices are computed by the model of the oracle, which is checked against it at start
+        and at a sample of timestamps.
         """
-        for get_soracle_price in [
-            getattr(self.soracle, price_fn)
-            for price_fn in [
-                "price_v0",
-                "price_v1",
-                "price_v2",
-            ]
-        ]:
-            with boa.env.anchor():
-                prev_price, prev_ts = get_soracle_price(), boa.env.evm.patch.timestamp
-                for ts_delta in self.st_iterate_over_period:
-                    boa.env.time_travel(seconds=ts_delta)
-                    new_price, new_ts = get_soracle_price(), boa.env.evm.patch.timestamp
-
-                    # Upper bound
-                    # In fact, linear approximation is strictly less except new_ts - prev_ts == 1
-                    assert (new_price / prev_price) <= (
-                        1.0 + (self.max_price_increment / 10**18)
-                    ) ** (new_ts - prev_ts)
-
-                    # TODO: Lower bound
-
-                    prev_price, prev_ts = new_price, new_ts
+        timestamps = [self.now() + ts_delta for ts_delta in self.period_timestamps]
+        for version in range(3):
+            prev_price = getattr(self.soracle, f"price_v{version}")()
+            assert prev_price == getattr(self.model, f"price_v{version}")(self.now())
+            self.check_oracle(self.model, timestamps, version)
+
+            prev_ts = self.now()
+            for new_ts, new_price in zip(timestamps, self.model.prices(timestamps, version)):
+                # Upper bound
+                # Compounded limit is rounded down, relative tolerance is for float rounding
+                assert (new_price / prev_price) <= (1.0 + (self.max_price_increment / 10**18)) ** (
+                    new_ts - prev_ts
+                ) * (1 + 1e-12)
+
+                # TODO: Lower bound
+
+                prev_price, prev_ts = new_price, new_ts
 
 
 @pytest.fixture(scope="module", params=[10**11, 10**12, 10**13])
@@ -110,7 +112,14 @@ def test_smoothening_simple(
 
 @pytest.mark.slow
 def test_scrvusd_oracle(
-    crvusd, scrvusd, admin, max_price_increment, soracle, soracle_price_slots, verifier
+    crvusd,
+    scrvusd,
+    admin,
+    max_price_increment,
+    soracle,
+    soracle_price_slots,
+    verifier,
+    shard_examples,
 ):
     run_state_machine_as_test(
         functools.partial(
@@ -127,7 +136,7 @@ def test_scrvusd_oracle(
             max_price_increment=max_price_increment,
         ),
         settings=settings(
-            max_examples=10,
+            max_examples=shard_examples(50),
             stateful_step_count=20,
             deadline=None,
         ),
@@ -0,0 +1,152 @@
+import boa
+import pytest
+
+from scripts.scrvusd.scrvusd_oracle import (
+    CHECKPOINT_CNT,
+    Checkpoint,
+    PriceParams,
+    ScrvusdOracleV2,
+    fits_checkpoint,
+    price_per_share,
+    unpack_checkpoint,
+)
+
+
+def _params(ts, total_idle):
+    return PriceParams(
+        total_debt=0,
+        total_idle=total_idle,
+        total_supply=10**18,
+        full_profit_unlock_date=0,
+        profit_unlocking_rate=0,
+        last_profit_update=ts,
+        balance_of_self=0,
+    )
+
+
+def _update(soracle, verifier, cnt, first_block_number=1):
+    """
+    Update with `cnt` blocks an hour apart, price growing by 1% every block.
+    :return: [(block_number, ts, params)]
+    """
+    updates = []
+    for i in range(cnt):
+        boa.env.time_travel(seconds=3600)
+        ts = boa.env.evm.patch.timestamp
+        params = _params(ts, 10**18 + i * 10**16)
+        with boa.env.prank(verifier):
+            soracle.update_price(list(params), ts, first_block_number + i)
+        updates.append((first_block_number + i, ts, params))
+    return updates
+
+
+def test_no_checkpoint(soracle):
+    with boa.reverts("No checkpoint"):
+        soracle.price_at(boa.env.evm.patch.timestamp)
+
+
+def test_price_at(soracle, verifier):
+    with boa.env.anchor():
+        updates = _update(soracle, verifier, 5)
+        assert soracle.checkpoint_cnt() == 5
+
+        with boa.reverts("No checkpoint"):
+            soracle.price_at(updates[0][1] - 1)
+        for i, (block_number, ts, params) in enumerate(updates):
+            for at in [ts, ts + 1800]:
+                assert soracle.find_checkpoint(at) == (block_number, ts, tuple(params))
+                assert soracle.price_at(at) == price_per_share(params, at)
+                assert soracle.price_at(at, 1) == 10**36 // price_per_share(params, at)
+
+
+def test_resubmit(soracle, verifier):
+    with boa.env.anchor():
+        (block_number, ts, _), *_ = _update(soracle, verifier, 1)
+        params = _params(ts, 2 * 10**18)
+        with boa.env.prank(verifier):
+            soracle.update_price(list(params), ts, block_number)
+
+        assert soracle.checkpoint_cnt() == 1
+        assert soracle.find_checkpoint(ts) == (block_number, ts, tuple(params))
+
+
+@pytest.mark.parametrize("extra", [1, CHECKPOINT_CNT // 2 + 3])
+def test_ring_buffer(soracle, verifier, extra):
+    assert soracle.CHECKPOINT_CNT() == CHECKPOINT_CNT
+    with boa.env.anchor():
+        updates = _update(soracle, verifier, CHECKPOINT_CNT + extra)
+        assert soracle.checkpoint_cnt() == CHECKPOINT_CNT + extra
+
+        # Oldest ones are overwritten
+        with boa.reverts("No checkpoint"):
+            soracle.price_at(updates[extra][1] - 1)
+        for block_number, ts, params in updates[extra:]:
+            assert soracle.find_checkpoint(ts + 1)[0] == block_number
+            assert soracle.price_at(ts) == price_per_share(params, ts)
+
+        # Storage is read by the model of stateful tests
+        packed = soracle._storage.checkpoints.get()
+        assert [
+            unpack_checkpoint(packed[i % CHECKPOINT_CNT])
+            for i in range(extra, CHECKPOINT_CNT + extra)
+        ] == updates[extra:]
+
+
+def test_out_of_order(soracle, verifier):
+    """
+    Block hash and state root verifications mixed: the latter submit parameters true at
+    `last_profit_update`, that can be before the previous checkpoint.
+    """
+    with boa.env.anchor():
+        reference = ScrvusdOracleV2(10**18, boa.env.evm.patch.timestamp)
+        updates = []
+        for i, by_state_root in enumerate([False, True, False, True, True, False, True, False]):
+            boa.env.time_travel(seconds=3600)
+            now = boa.env.evm.patch.timestamp
+            # Rewards were reported two updates ago
+            params = _params(now - 7200, 10**18 + i * 10**16)
+            ts = params.last_profit_update if by_state_root else now
+            with boa.env.prank(verifier):
+                soracle.update_price(list(params), ts, i + 1)
+            reference.update_price(params, ts, i + 1, now)
+            updates.append((i + 1, ts, params))
+
+        kept = [tuple(checkpoint) for checkpoint in reference.checkpoints]
+        assert [checkpoint[1] for checkpoint in kept] == sorted(c[1] for c in kept)
+        assert len(kept) < len(updates)  # state root ones before the previous one are skipped
+        assert soracle.checkpoint_cnt() == len(kept)
+        for block_number, ts, params in updates:
+            if ts < kept[0][1]:
+                with boa.reverts("No checkpoint"):
+                    soracle.find_checkpoint(ts)
+                continue
+            checkpoint = soracle.find_checkpoint(ts)
+            assert checkpoint == reference.find_checkpoint(ts)
+            assert checkpoint[1] <= ts
+            assert soracle.price_at(ts) == reference.price_at(ts)
+
+        # Resubmit of the last block out of order keeps its checkpoint
+        block_number, ts, params = updates[-1]
+        with boa.env.prank(verifier):
+            soracle.update_price(list(params), kept[-2][1] - 1, block_number)
+        assert soracle.checkpoint_cnt() == len(kept)
+        assert soracle.find_checkpoint(ts) == kept[-1]
+
+
+@pytest.mark.parametrize(
+    "field,value", [("total_idle", 2**128), ("total_supply", 2**128), ("last_profit_update", 2**64)]
+)
+def test_oversized_params(soracle, verifier, field, value):
+    with boa.env.anchor():
+        (block_number, ts, params), *_ = _update(soracle, verifier, 1)
+        boa.env.time_travel(seconds=3600)
+        now = boa.env.evm.patch.timestamp
+        oversized = params._replace(**{field: value})
+        assert not fits_checkpoint(Checkpoint(block_number + 1, now, oversized))
+
+        # Price is updated, the checkpoint is not written
+        with boa.env.prank(verifier):
+            soracle.update_price(list(oversized), now, block_number + 1)
+        assert soracle._storage.price_params.get() == oversized._asdict()
+        assert soracle.checkpoint_cnt() == 1
+        assert soracle.find_checkpoint(now) == (block_number, ts, tuple(params))
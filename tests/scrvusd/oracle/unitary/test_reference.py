@@ -0,0 +1,210 @@
+import boa
+import pytest
+from hypothesis import HealthCheck, given, settings
+from hypothesis import strategies as st
+
+from scripts.scrvusd.scrvusd_oracle import (
+    MAX_BPS_EXTENDED,
+    MAX_V2_DURATION,
+    PriceParams,
+    ScrvusdOracleV2,
+    _project_price_params,
+    obtain_price_params,
+    project_periods_iteratively,
+    raw_prices,
+)
+
+
+@pytest.fixture(scope="module")
+def soracle(admin):
+    with boa.env.prank(admin):
+        contract = boa.load("contracts/scrvusd/oracles/ScrvusdOracleV2.vy", 10**18)
+    return contract
+
+
+@st.composite
+def st_price_params(draw):
+    ts = boa.env.evm.patch.timestamp
+    total_supply = draw(st.integers(min_value=10**18, max_value=10**30))
+    balance_of_self = draw(st.integers(min_value=0, max_value=total_supply // 2))
+    last_profit_update = ts - draw(st.integers(min_value=0, max_value=4 * 7 * 86400))
+    unlock_duration = draw(st.integers(min_value=1, max_value=7 * 86400))
+    return PriceParams(
+        total_debt=draw(st.integers(min_value=0, max_value=10**30)),
+        total_idle=draw(st.integers(min_value=10**18, max_value=10**30)),
+        total_supply=total_supply,
+        full_profit_unlock_date=last_profit_update + unlock_duration,
+        profit_unlocking_rate=balance_of_self * MAX_BPS_EXTENDED // unlock_duration,
+        last_profit_update=last_profit_update,
+        balance_of_self=balance_of_self,
+    )
+
+
+st_delays = st.lists(st.integers(min_value=0, max_value=30 * 86400), min_size=1, max_size=5)
+
+
+def _reference(soracle):
+    # Initial raw price equals initial price, so smoothing does not depend on deploy time
+    reference = ScrvusdOracleV2(10**18, boa.env.evm.patch.timestamp)
+    reference.last_block_number = soracle.last_block_number()
+    reference.profit_max_unlock_time = soracle.profit_max_unlock_time()
+    reference.max_price_increment = soracle.max_price_increment()
+    reference.max_v2_duration = soracle.max_v2_duration()
+    return reference
+
+
+@settings(
+    max_examples=50, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture]
+)
+@given(params=st.lists(st_price_params(), min_size=1, max_size=3), delays=st_delays)
+def test_prices(soracle, verifier, params, delays):
+    with boa.env.anchor():
+        reference = _reference(soracle)
+        for i, (p, delay) in enumerate(zip(params, delays * len(params))):
+            boa.env.time_travel(seconds=delay + 1)
+            block_number = reference.last_block_number + i
+            ts = boa.env.evm.patch.timestamp
+            with boa.env.prank(verifier):
+                change = soracle.update_price(list(p), ts, block_number)
+            assert change == reference.update_price(p, ts, block_number, ts)
+
+        for delay in delays:
+            boa.env.evm.patch.timestamp += delay
+            ts = boa.env.evm.patch.timestamp
+            assert soracle.price_v0() == reference.price_v0(ts)
+            assert soracle.price_v1() == reference.price_v1(ts)
+            assert soracle.price_v2() == reference.price_v2(ts)
+
+        for checkpoint in reference.checkpoints:
+            for delay in delays:
+                ts = checkpoint.ts + delay
+                assert soracle.price_at(ts) == reference.price_at(ts)
+
+
+@settings(
+    max_examples=50, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture]
+)
+@given(p=st_price_params(), delays=st_delays)
+def test_raw_prices(soracle, verifier, p, delays):
+    with boa.env.anchor():
+        reference = _reference(soracle)
+        ts = boa.env.evm.patch.timestamp
+        with boa.env.prank(verifier):
+            soracle.update_price(list(p), ts, reference.last_block_number)
+        reference.update_price(p, ts, reference.last_block_number, ts)
+
+        timestamps = []
+        for delay in delays:
+            ts += delay * 7  # cover several periods
+            timestamps.append(ts)
+        parameters_timestamps = [p.last_profit_update + delay for delay in delays]
+
+        assert raw_prices(
+            p,
+            timestamps,
+            parameters_timestamps,
+            reference.profit_max_unlock_time,
+            reference.max_v2_duration,
+        ) == [
+            soracle.raw_price(0, ts, parameters_ts)
+            for ts, parameters_ts in zip(timestamps, parameters_timestamps)
+        ]
+
+        for version in range(3):
+            prices = reference.prices(timestamps, version)
+            for ts, price in zip(timestamps, prices):
+                boa.env.evm.patch.timestamp = ts
+                assert getattr(soracle, f"price_v{version}")() == price
+
+
+@given(
+    total_supply=st.integers(min_value=2, max_value=2**128),
+    locked=st.floats(min_value=0, max_value=1, exclude_max=True),
+    number_of_periods=st.integers(min_value=0, max_value=MAX_V2_DURATION),
+)
+def test_closed_form_projection(total_supply, locked, number_of_periods):
+    balance_of_self = int(total_supply * locked)
+    p = PriceParams(
+        total_debt=0,
+        total_idle=total_supply,
+        total_supply=total_supply,
+        full_profit_unlock_date=0,
+        profit_unlocking_rate=0,
+        last_profit_update=0,
+        balance_of_self=balance_of_self,
+    )
+    projected = _project_price_params(p, number_of_periods, 7 * 86400)
+    expected = project_periods_iteratively(balance_of_self, total_supply, number_of_periods)
+
+    error = number_of_periods * (number_of_periods + 3) // 2
+    assert abs(projected.balance_of_self - expected[0]) <= error
+    assert abs(projected.total_supply - expected[1]) <= error
+
+
+@pytest.mark.parametrize(
+    "total_supply,balance_of_self",
+    [
+        (2, 1),
+        (10**18, 10**18 - 1),
+        # Checkpoints keep amounts in 128 bits
+        (2**128 - 1, 1),
+        (2**128 - 1, 2**127),
+        (2**128 - 1, 2**128 - 2),
+        (10**30, 0),
+        # No unlocked supply
+        (10**18, 10**18),
+    ],
+)
+def test_closed_form_projection_contract(soracle, verifier, admin, total_supply, balance_of_self):
+    with boa.env.anchor():
+        with boa.env.prank(admin):
+            soracle.set_max_v2_duration(MAX_V2_DURATION)
+        period = soracle.profit_max_unlock_time()
+        ts = boa.env.evm.patch.timestamp
+        p = PriceParams(
+            total_debt=0,
+            total_idle=total_supply,
+            total_supply=total_supply,
+            full_profit_unlock_date=ts + period,
+            profit_unlocking_rate=balance_of_self * MAX_BPS_EXTENDED // period,
+            last_profit_update=ts,
+            balance_of_self=balance_of_self,
+        )
+        with boa.env.prank(verifier):
+            soracle.update_price(list(p), ts, soracle.last_block_number() + 1)
+
+        # Projection is capped at `MAX_V2_DURATION` periods
+        for number_of_periods in [MAX_V2_DURATION, MAX_V2_DURATION + 5]:
+            projected = PriceParams(
+                *soracle.internal._obtain_price_params(ts + number_of_periods * period)
+            )
+            expected = project_periods_iteratively(balance_of_self, total_supply, MAX_V2_DURATION)
+
+            error = MAX_V2_DURATION * (MAX_V2_DURATION + 3) // 2
+            assert abs(projected.balance_of_self - expected[0]) <= error
+            assert abs(projected.total_supply - expected[1]) <= error
+            assert projected.last_profit_update == ts + MAX_V2_DURATION * period
+
+
+def test_projection_without_periods(soracle, verifier, admin):
+    # All shares are locked, so the closed form would evaluate 0 // 0
+    with boa.env.anchor():
+        with boa.env.prank(admin):
+            soracle.set_max_v2_duration(0)
+        period = soracle.profit_max_unlock_time()
+        ts = boa.env.evm.patch.timestamp
+        p = PriceParams(
+            total_debt=0,
+            total_idle=10**18,
+            total_supply=10**18,
+            full_profit_unlock_date=ts + period,
+            profit_unlocking_rate=10**18 * MAX_BPS_EXTENDED // period,
+            last_profit_update=ts,
+            balance_of_self=10**18,
+        )
+        with boa.env.prank(verifier):
+            soracle.update_price(list(p), ts, soracle.last_block_number() + 1)
+
+        parameters_ts = ts + 3 * period
+        assert PriceParams(*soracle.internal._obtain_price_params(parameters_ts)) == p
+        assert obtain_price_params(p, parameters_ts, period, 0) == p
@@ -0,0 +1,81 @@
+import pytest
+import rlp
+
+from tests.shared.rpc import RPCStub
+
+
+BLOCK_NUMBER = 21_000_000
+
+
+def _hex(value: bytes) -> str:
+    return "0x" + value.hex()
+
+
+@pytest.fixture(scope="module")
+def eth_block():
+    """
+    Block of `eth_getBlockByNumber` format.
+    """
+    return {
+        "parentHash": _hex(b"\x01" * 32),
+        "sha3Uncles": _hex(b"\x02" * 32),
+        "miner": _hex(b"\x03" * 20),
+        "stateRoot": _hex(b"\x04" * 32),
+        "transactionsRoot": _hex(b"\x05" * 32),
+        "receiptsRoot": _hex(b"\x06" * 32),
+        "logsBloom": _hex(b"\x00" * 256),
+        "difficulty": "0x0",
+        "number": hex(BLOCK_NUMBER),
+        "gasLimit": hex(30_000_000),
+        "gasUsed": hex(12_345_678),
+        "timestamp": hex(1_729_000_000),
+        "extraData": _hex(b"curve"),
+        "mixHash": _hex(b"\x07" * 32),
+        "nonce": "0x0000000000000000",
+        "baseFeePerGas": hex(10**9),
+        "withdrawalsRoot": _hex(b"\x08" * 32),
+        "blobGasUsed": "0x0",
+        "excessBlobGas": hex(131072),
+        "parentBeaconBlockRoot": _hex(b"\x09" * 32),
+        "hash": _hex(b"\x0a" * 32),
+        "size": hex(1000),
+        "totalDifficulty": "0x0",
+        "transactions": [],
+        "uncles": [],
+        "withdrawals": [],
+    }
+
+
+@pytest.fixture(scope="module")
+def eth_proof():
+    """
+    Proof of `eth_getProof` format. Nodes are not connected, only structure matters.
+    """
+    branch = rlp.encode([bytes([i]) * 32 for i in range(16)] + [b""])
+    return {
+        "address": "0x0655977feb2f289a4ab78af67bab0d17aab84367",
+        "balance": "0x0",
+        "codeHash": _hex(b"\x0b" * 32),
+        "nonce": "0x1",
+        "storageHash": _hex(b"\x0c" * 32),
+        "accountProof": [_hex(branch), _hex(rlp.encode([b"\x20" + b"\x0d" * 31, b"\x0e" * 70]))],
+        "storageProof": [
+            {
+                "key": hex(i),
+                "value": hex(i * 10**18),
+                "proof": [_hex(branch), _hex(rlp.encode([bytes([i]) * 32, rlp.encode(i)]))],
+            }
+            for i in range(7)
+        ],
+    }
+
+
+@pytest.fixture()
+def eth_rpc(eth_block, eth_proof):
+    with RPCStub(
+        {
+            "eth_getBlockByNumber": lambda params: eth_block,
+            "eth_getProof": lambda params: eth_proof,
+        }
+    ) as stub:
+        yield stub
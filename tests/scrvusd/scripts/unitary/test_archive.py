@@ -0,0 +1,70 @@
+import csv
+import json
+
+import pytest
+
+from scripts.scrvusd import archive
+from scripts.scrvusd.archive import ARCHIVE_FIELDS, ColumnArchive, Record, read_archive
+from scripts.scrvusd.scrvusd_oracle import PriceParams
+
+
+def _records(cnt, start=0):
+    return [
+        Record(
+            block_number=21_000_000 + i,
+            timestamp=1_729_000_000 + 12 * i,
+            params=PriceParams(*[2**256 - 1 - i * 7 - j for j in range(7)]),
+            profit_max_unlock_time=7 * 86400 + i,
+        )
+        for i in range(start, start + cnt)
+    ]
+
+
+@pytest.mark.parametrize("extension", ["jsonl", "csv"])
+def test_read_rows(tmp_path, extension):
+    records = _records(3)
+    path = str(tmp_path / f"archive.{extension}")
+    with open(path, "w", newline="") as f:
+        if extension == "jsonl":
+            for record in records:
+                f.write(json.dumps(record.to_row()) + "\n")
+        else:
+            writer = csv.DictWriter(f, ARCHIVE_FIELDS)
+            writer.writeheader()
+            writer.writerows(record.to_row() for record in records)
+
+    assert list(read_archive(path)) == records
+
+
+def test_columns(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "CHUNK_SIZE", 4)
+    path = str(tmp_path / "archive")
+    column_archive = ColumnArchive(path)
+    column_archive.create()
+    assert column_archive.size() == 0 and list(read_archive(path)) == []
+
+    column_archive.append(_records(5))
+    column_archive.append(_records(6, start=5))
+    assert column_archive.size() == 11
+    assert list(read_archive(path)) == _records(11)
+    assert list(column_archive.column("block_number")) == [
+        record.block_number for record in _records(11)
+    ]
+    # One file per field of fixed-width values
+    for field, width in archive.COLUMN_WIDTHS.items():
+        assert (tmp_path / "archive" / f"{field}.bin").stat().st_size == 11 * width
+
+
+def test_partial_record(tmp_path):
+    column_archive = ColumnArchive(str(tmp_path / "archive"))
+    column_archive.create()
+    column_archive.append(_records(2))
+    # Interrupted after writing a part of columns
+    with open(column_archive.column_path("block_number"), "ab") as f:
+        f.write((21_000_002).to_bytes(8, "big"))
+
+    assert column_archive.size() == 2
+    assert list(column_archive.read()) == _records(2)
+    column_archive.truncate(2)
+    column_archive.append(_records(1, start=2))
+    assert list(column_archive.read()) == _records(3)
@@ -0,0 +1,130 @@
+import json
+
+import pytest
+
+from scripts.scrvusd.archive import Record
+from scripts.scrvusd.backtest import Backtest, Config, Gas
+from scripts.scrvusd.scrvusd_oracle import MAX_BPS_EXTENDED, PriceParams, unlocked_shares
+
+
+WEEK = 7 * 86400
+TS = 1_729_000_000
+BLOCK_NUMBER = 21_000_000
+GAS = Gas(block_hash=100_000, state_root=60_000, period=20_000, apply=50_000)
+
+
+def _report(params: PriceParams, gain, ts) -> PriceParams:
+    """
+    Simplified `VaultV3.process_report()` of `gain` crvUSD without fees.
+    """
+    unlocked = unlocked_shares(
+        params.full_profit_unlock_date,
+        params.profit_unlocking_rate,
+        params.last_profit_update,
+        params.balance_of_self,
+        ts,
+    )
+    total_supply = params.total_supply - unlocked
+    balance_of_self = params.balance_of_self - unlocked
+    total_assets = params.total_idle + params.total_debt
+
+    shares = gain * total_supply // total_assets
+    balance_of_self += shares
+    return PriceParams(
+        total_debt=params.total_debt,
+        total_idle=params.total_idle + gain,
+        total_supply=total_supply + shares,
+        full_profit_unlock_date=ts + WEEK,
+        profit_unlocking_rate=balance_of_self * MAX_BPS_EXTENDED // WEEK,
+        last_profit_update=ts,
+        balance_of_self=balance_of_self,
+    )
+
+
+def _records(weeks, gain):
+    """
+    Vault with `gain` crvUSD reported at the start of every week.
+    """
+    params = PriceParams(
+        total_debt=0,
+        total_idle=10**24,
+        total_supply=10**24,
+        full_profit_unlock_date=0,
+        profit_unlocking_rate=0,
+        last_profit_update=TS,
+        balance_of_self=0,
+    )
+    for week in range(weeks):
+        ts = TS + week * WEEK
+        params = _report(params, gain, ts)
+        yield Record(BLOCK_NUMBER + ts // 12, ts, params, WEEK)
+
+
+def test_constant_price():
+    report = Backtest(Config(step=3600)).run(_records(1, 0))
+    assert report.samples == 1
+    assert report.max_errors == [0, 0, 0]
+    assert report.updates == 1  # deployment
+
+
+def test_rewards():
+    # Oracle is updated only at deployment
+    config = Config(rel_change_threshold=2, max_update_interval=12 * WEEK)
+    report = Backtest(config).run(_records(12, 10**21))
+    assert report.samples == 11 * WEEK // config.step + 1
+    assert report.updates == 1
+    # v0 is fixed, v1 stops at the end of the week, v2 projects following weeks
+    assert report.mean_errors[0] > report.mean_errors[1] > report.mean_errors[2]
+    assert report.max_errors[2] < 1e-9
+
+
+def test_keeper():
+    config = Config(max_update_interval=12 * WEEK)
+    updates = []
+    for version in range(3):
+        report = Backtest(config._replace(version=version)).run(_records(12, 10**21))
+        assert report.gas is None
+        updates.append(report.updates)
+    # v2 replicates constant rewards, v1 needs an update every week, v0 follows unlocking
+    assert updates[2] == 1
+    assert 11 <= updates[1] <= 12
+    assert updates[0] > 10 * updates[1]
+
+
+def test_period_update():
+    records = list(_records(3, 10**21))
+    records[2] = records[2]._replace(profit_max_unlock_time=2 * WEEK)
+    backtest = Backtest()
+    report = backtest.run(records)
+    assert report.period_updates == 1
+    assert backtest.oracle.profit_max_unlock_time == 2 * WEEK
+
+
+@pytest.mark.parametrize(
+    "by_state_root,apply_share,update_gas",
+    [(False, 1, 150_000), (False, 0.5, 125_000), (False, 0, 100_000), (True, 1, 60_000)],
+)
+def test_gas(by_state_root, apply_share, update_gas):
+    records = list(_records(3, 10**21))
+    records[2] = records[2]._replace(profit_max_unlock_time=2 * WEEK)
+    config = Config(gas=GAS, by_state_root=by_state_root, apply_share=apply_share)
+    report = Backtest(config).run(records)
+    assert report.gas == report.updates * update_gas + GAS.period
+
+
+def test_gas_from_baseline(tmp_path):
+    path = tmp_path / "gas_baseline.json"
+    baseline = {
+        "ScrvusdVerifierV3.verifyScrvusdByBlockHash[16]": 90_000,
+        "ScrvusdVerifierV3.verifyScrvusdByStateRoot[16]": 55_000,
+        "ScrvusdVerifierV3.verifyScrvusdAndPeriodByBlockHash[16]": 105_000,
+    }
+    path.write_text(json.dumps(baseline))
+    assert Gas.from_baseline(str(path), size=16, apply=40_000) == Gas(
+        90_000, 55_000, 15_000, 40_000
+    )
+
+    with pytest.raises(ValueError, match="verifyScrvusdByStateRoot"):
+        Gas.from_baseline(str(path), size=4096, apply=40_000)
+    with pytest.raises(ValueError, match="apply"):
+        Gas.from_baseline(str(path), size=16, apply=None)
@@ -0,0 +1,119 @@
+import pytest
+from web3 import HTTPProvider, Web3
+
+from scripts.scrvusd.blockhash_index import APPLY_BLOCK_HASH, COMMIT_BLOCK_HASH, BlockHashIndex
+from tests.shared.rpc import RPCStub
+
+
+BORACLE = "0x988d1037e9608B21050A8EFba0c6C45e01A3Bce7"
+COMMITTER = "0x" + "00" * 12 + "33" * 20
+
+
+def _block_hash(number):
+    return number.to_bytes(32, "big")
+
+
+def _log(l2_block_number, number, applied):
+    topics = [APPLY_BLOCK_HASH if applied else COMMIT_BLOCK_HASH]
+    if not applied:
+        topics.append(bytes.fromhex(COMMITTER[2:]))
+    topics.append(number.to_bytes(32, "big"))
+    return {
+        "address": BORACLE.lower(),
+        "blockHash": "0x" + "11" * 32,
+        "blockNumber": hex(l2_block_number),
+        "data": "0x" + _block_hash(number).hex(),
+        "logIndex": "0x0",
+        "removed": False,
+        "topics": ["0x" + topic.hex() for topic in topics],
+        "transactionHash": "0x" + "22" * 32,
+        "transactionIndex": "0x0",
+    }
+
+
+class L2:
+    """
+    L2 network with blockhash oracle emitting `events`: [(L2 block number, number, applied)].
+    """
+
+    def __init__(self, head, events):
+        self.head = head
+        self.events = events
+        self.stub = RPCStub(
+            {
+                "eth_blockNumber": lambda params: hex(self.head),
+                "eth_getLogs": self.get_logs,
+            }
+        )
+
+    def get_logs(self, params):
+        from_block, to_block = int(params[0]["fromBlock"], 16), int(params[0]["toBlock"], 16)
+        addresses = params[0]["address"]
+        addresses = addresses if isinstance(addresses, list) else [addresses]
+        assert [address.lower() for address in addresses] == [BORACLE.lower()]
+        return [_log(*event) for event in self.events if from_block <= event[0] <= to_block]
+
+
+@pytest.fixture()
+def l2():
+    l2 = L2(1999, [(1001, 100, False), (1002, 100, True), (1500, 110, True), (1999, 120, False)])
+    with l2.stub:
+        yield l2
+
+
+def test_sync(l2):
+    index = BlockHashIndex(Web3(HTTPProvider(l2.stub.url)), BORACLE, page_size=300, from_block=1000)
+    assert index.sync() == 4
+    # Paged up to the head
+    assert [
+        (call["params"][0]["fromBlock"], call["params"][0]["toBlock"])
+        for call in l2.stub.calls("eth_getLogs")
+    ] == [(hex(start), hex(min(start + 299, 1999))) for start in range(1000, 2000, 300)]
+    assert index.scanned == 1999
+    assert index.blocks[100] == (_block_hash(100), True)
+    assert index.candidates() == [(120, False), (110, True), (100, True)]
+    assert index.candidates(min_block_number=110) == [(120, False), (110, True)]
+
+    # Incremental
+    l2.events.append((2005, 130, True))
+    l2.head = 2010
+    assert index.sync() == 1
+    assert index.is_applied(130)
+    assert l2.stub.calls("eth_getLogs")[-1]["params"][0]["fromBlock"] == hex(2000)
+
+
+def test_commit_after_apply(l2):
+    l2.events.append((1999, 110, False))  # committed again by someone else
+    index = BlockHashIndex(Web3(HTTPProvider(l2.stub.url)), BORACLE, from_block=1000)
+    index.sync()
+    assert index.is_applied(110)
+    assert not index.is_applied(120)
+
+    index.mark_applied(120, _block_hash(120))
+    assert index.is_applied(120)
+
+
+def test_persistence(l2, tmp_path):
+    path = str(tmp_path / "blockhashes.sqlite")
+    web3 = Web3(HTTPProvider(l2.stub.url))
+    index = BlockHashIndex(web3, BORACLE, path=path, from_block=1000)
+    index.sync()
+    index.mark_applied(120, _block_hash(120))
+
+    l2.head = 2010
+    restarted = BlockHashIndex(web3, BORACLE, path=path, from_block=1000)
+    assert restarted.scanned == 1999
+    assert restarted.candidates() == [(120, True), (110, True), (100, True)]
+    restarted.sync()
+    assert l2.stub.calls("eth_getLogs")[-1]["params"][0]["fromBlock"] == hex(2000)
+
+    # Oracles of other chains are kept apart
+    other = BlockHashIndex(web3, "0x" + "44" * 20, path=path)
+    assert other.scanned is None and other.candidates() == []
+
+
+def test_initial_scan(l2):
+    index = BlockHashIndex(Web3(HTTPProvider(l2.stub.url)), BORACLE)
+    index.sync()
+    assert l2.stub.calls("eth_getLogs")[0]["params"][0]["fromBlock"] == hex(0)
+    assert len(index.candidates()) == 3
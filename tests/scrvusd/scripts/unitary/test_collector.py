@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from web3 import AsyncHTTPProvider, AsyncWeb3
+
+from scripts.scrvusd.archive import ColumnArchive, read_archive
+from scripts.scrvusd.collector import SLOTS, Collector
+from scripts.scrvusd.provider import close_sessions
+from tests.shared.rpc import RPCStub
+
+
+FROM_BLOCK = 1000
+LATEST = 1999
+CHANGE_BLOCKS = [1005, 1005, 1200, 1201, 1499, 1500, 1777]
+
+
+def _value(block_number, slot):
+    return block_number * 1000 + SLOTS.index(slot)
+
+
+@pytest.fixture()
+def archive_rpc(eth_block):
+    def get_block(params):
+        return eth_block | {"number": params[0], "timestamp": hex(int(params[0], 16) * 12)}
+
+    def get_storage_at(params):
+        return "0x" + _value(int(params[2], 16), int(params[1], 16)).to_bytes(32, "big").hex()
+
+    def get_logs(params):
+        from_block, to_block = int(params[0]["fromBlock"], 16), int(params[0]["toBlock"], 16)
+        return [
+            {
+                "address": "0x0655977feb2f289a4ab78af67bab0d17aab84367",
+                "blockHash": "0x" + "11" * 32,
+                "blockNumber": hex(block_number),
+                "data": "0x",
+                "logIndex": "0x0",
+                "removed": False,
+                "topics": [],
+                "transactionHash": "0x" + "22" * 32,
+                "transactionIndex": "0x0",
+            }
+            for block_number in CHANGE_BLOCKS
+            if from_block <= block_number <= to_block
+        ]
+
+    with RPCStub(
+        {
+            "eth_blockNumber": lambda params: hex(LATEST),
+            "eth_getBlockByNumber": get_block,
+            "eth_getStorageAt": get_storage_at,
+            "eth_getLogs": get_logs,
+        }
+    ) as stub:
+        yield stub
+
+
+def _collect(url, path, **kwargs):
+    async def run():
+        w3 = AsyncWeb3(AsyncHTTPProvider(url))
+        try:
+            return await Collector(w3, path, page_size=200, batch_size=2).collect(
+                FROM_BLOCK, **kwargs
+            )
+        finally:
+            await close_sessions(w3.provider)
+
+    return asyncio.run(run())
+
+
+def test_collect(archive_rpc, tmp_path):
+    path = str(tmp_path / "archive")
+    assert _collect(archive_rpc.url, path) == 6
+
+    assert len(archive_rpc.calls("eth_getLogs")) == 5  # paged
+    # 2 blocks per batch, one HTTP request per batch
+    assert len([payload for payload in archive_rpc.requests if isinstance(payload, list)]) == 4
+    assert len(archive_rpc.calls("eth_getStorageAt")) == 6 * len(SLOTS)
+
+    records = list(read_archive(path))
+    assert [record.block_number for record in records] == sorted(set(CHANGE_BLOCKS))
+    for record in records:
+        assert record.timestamp == record.block_number * 12
+        assert list(record.params) == [_value(record.block_number, slot) for slot in SLOTS[:7]]
+        assert record.profit_max_unlock_time == _value(record.block_number, SLOTS[7])
+
+
+def test_resume(archive_rpc, tmp_path):
+    path = str(tmp_path / "archive")
+    assert _collect(archive_rpc.url, path, to_block=1399) == 3
+    collector = Collector(None, path)
+    assert collector.checkpoint()["block_number"] == 1399
+
+    # Interrupted after writing records, but before the checkpoint
+    with open(ColumnArchive(path).column_path("block_number"), "ab") as f:
+        f.write((1500).to_bytes(8, "big"))
+
+    archive_rpc.requests.clear()
+    assert _collect(archive_rpc.url, path) == 3
+    assert int(archive_rpc.calls("eth_getLogs")[0]["params"][0]["fromBlock"], 16) == 1400
+    assert [record.block_number for record in read_archive(path)] == sorted(set(CHANGE_BLOCKS))
+    assert collector.checkpoint()["block_number"] == LATEST
@@ -0,0 +1,96 @@
+import json
+import urllib.request
+
+import pytest
+from web3 import Web3
+
+from scripts.scrvusd import provider
+from tests.shared.rpc import RPCStub
+
+# Scripts import `metrics` as a top-level module, the same one is used here
+metrics = provider.metrics
+Counter, Gauge, Histogram = metrics.Counter, metrics.Gauge, metrics.Histogram
+
+
+@pytest.fixture()
+def enabled():
+    metrics.enable(metrics=True, logs=True)
+    yield
+    metrics.disable()
+
+
+def test_disabled():
+    counter = Counter("requests_total", "Requests", ["method"])
+    counter.inc(method="eth_call")
+    with metrics.timed("prove", "optimism"):
+        pass
+    assert counter.samples() == []
+    assert metrics.STAGE_SECONDS.samples() == []
+
+
+def test_render(enabled):
+    counter = Counter("requests_total", "Requests", ["method"])
+    counter.inc(method="eth_call")
+    counter.inc(2, method="eth_call")
+    gauge = Gauge("since_update", "Since update")
+    gauge.set(lambda: 1.5)
+    histogram = Histogram("size_bytes", "Size", buckets=(10, 100))
+    for value in [5, 50, 500]:
+        histogram.observe(value)
+
+    assert metrics.render([counter, gauge, histogram]) == "\n".join(
+        [
+            "# HELP requests_total Requests",
+            "# TYPE requests_total counter",
+            'requests_total{method="eth_call"} 3',
+            "# HELP since_update Since update",
+            "# TYPE since_update gauge",
+            "since_update 1.5",
+            "# HELP size_bytes Size",
+            "# TYPE size_bytes histogram",
+            'size_bytes_bucket{le="10"} 1',
+            'size_bytes_bucket{le="100"} 2',
+            'size_bytes_bucket{le="+Inf"} 3',
+            "size_bytes_sum 555",
+            "size_bytes_count 3",
+            "",
+        ]
+    )
+
+
+def test_timed(enabled, capsys):
+    with pytest.raises(ValueError):
+        with metrics.timed("prove", "optimism"):
+            raise ValueError()
+    samples = dict(metrics.STAGE_SECONDS.samples())
+    assert samples['keeper_stage_seconds_count{stage="prove",chain="optimism"}'] == 1
+
+    log = json.loads(capsys.readouterr().out)
+    assert log["event"] == "stage"
+    assert log["stage"] == "prove" and log["chain"] == "optimism"
+    assert log["seconds"] >= 0
+
+
+def test_rpc_requests(enabled):
+    with RPCStub({"eth_blockNumber": lambda params: "0x1"}) as stub:
+        web3 = Web3(provider.FailoverProvider([stub.url]))
+        web3.eth.block_number
+        with web3.batch_requests() as batch:
+            batch.add(web3.eth.get_block_number())
+            batch.add(web3.eth.get_block_number())
+            batch.execute()
+    samples = dict(metrics.RPC_REQUESTS.samples())
+    assert samples['keeper_rpc_requests_total{method="eth_blockNumber"}'] == 3
+
+
+def test_serve(enabled):
+    metrics.GAS_USED.inc(21_000, chain="optimism")
+    server = metrics.serve(0, host="127.0.0.1")
+    try:
+        host, port = server.server_address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            body = response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'keeper_gas_used_total{chain="optimism"} 21000' in body.splitlines()
@@ -0,0 +1,134 @@
+import asyncio
+
+import rlp
+from hexbytes import HexBytes
+from web3 import AsyncHTTPProvider, AsyncWeb3, HTTPProvider, Web3
+
+from scripts.scrvusd.proof import (
+    PERIOD_SLOT,
+    ProofCache,
+    compact_proof,
+    generate_proof,
+    generate_proof_async,
+    serialize_block,
+    serialize_multiproof,
+    serialize_proofs,
+)
+from scripts.scrvusd.provider import close_sessions
+from tests.scrvusd.scripts.conftest import BLOCK_NUMBER
+
+
+def _generate_proof_async(url, **kwargs):
+    async def run():
+        w3 = AsyncWeb3(AsyncHTTPProvider(url))
+        try:
+            return await generate_proof_async(w3, BLOCK_NUMBER, **kwargs)
+        finally:
+            await close_sessions(w3.provider)
+
+    return asyncio.run(run())
+
+
+def test_generate_proof_async(eth_rpc):
+    expected = generate_proof(Web3(HTTPProvider(eth_rpc.url)), BLOCK_NUMBER)
+    assert len(eth_rpc.requests) == 2
+
+    eth_rpc.requests.clear()
+    assert _generate_proof_async(eth_rpc.url) == expected
+    assert len(eth_rpc.requests) == 2
+    assert len(eth_rpc.calls("eth_getBlockByNumber")) == len(eth_rpc.calls("eth_getProof")) == 1
+
+
+def test_generate_proof_async_batch(eth_rpc):
+    expected = generate_proof(Web3(HTTPProvider(eth_rpc.url)), BLOCK_NUMBER)
+
+    eth_rpc.requests.clear()
+    assert _generate_proof_async(eth_rpc.url, batch=True) == expected
+    # Single HTTP request for both calls
+    assert len(eth_rpc.requests) == 1
+    assert [call["method"] for call in eth_rpc.calls()] == ["eth_getBlockByNumber", "eth_getProof"]
+
+
+def test_generate_proof_with_period(eth_rpc):
+    w3 = Web3(HTTPProvider(eth_rpc.url))
+    generate_proof(w3, BLOCK_NUMBER)
+    generate_proof(w3, BLOCK_NUMBER, with_period=True)
+    _generate_proof_async(eth_rpc.url, with_period=True)
+
+    prices, *combined = [call["params"][1] for call in eth_rpc.calls("eth_getProof")]
+    assert len(prices) == 7
+    for slots in combined:
+        assert slots[:7] == prices
+        assert int(slots[7], 16) == PERIOD_SLOT
+
+
+def test_generate_proof_without_header(eth_rpc):
+    w3 = Web3(HTTPProvider(eth_rpc.url))
+    cache = ProofCache()
+    header, proof = generate_proof(w3, BLOCK_NUMBER, cache=cache, with_header=False)
+    assert header == b""
+    assert eth_rpc.calls("eth_getBlockByNumber") == []
+    assert _generate_proof_async(eth_rpc.url, batch=True, with_header=False) == (b"", proof)
+    assert eth_rpc.calls("eth_getBlockByNumber") == []
+
+    # Cached proof without header is not used when header is needed
+    expected = generate_proof(w3, BLOCK_NUMBER, cache=cache)
+    assert expected[0] and expected[1] == proof
+    assert len(eth_rpc.calls("eth_getBlockByNumber")) == 1
+    # Proof with header is used for any
+    eth_rpc.requests.clear()
+    assert generate_proof(w3, BLOCK_NUMBER, cache=cache, with_header=False) == expected
+    assert eth_rpc.requests == []
+
+
+def test_serialize_multiproof(eth_proof):
+    proof_rlp = serialize_proofs(eth_proof)
+    multiproof = serialize_multiproof(eth_proof)
+    # Branch node shared by all storage proofs is encoded once
+    assert len(multiproof) < len(proof_rlp) // 2
+    assert compact_proof(proof_rlp) == multiproof
+
+    nodes, paths = rlp.decode(multiproof)
+    assert len(nodes) == len(set(map(rlp.encode, nodes)))
+    assert [[nodes[i] for i in path] for path in paths] == rlp.decode(proof_rlp)
+
+
+def test_serialize_proofs(eth_proof):
+    expected = rlp.encode(
+        [
+            [rlp.decode(HexBytes(node)) for node in proof]
+            for proof in [
+                eth_proof["accountProof"],
+                *(p["proof"] for p in eth_proof["storageProof"]),
+            ]
+        ]
+    )
+    assert serialize_proofs(eth_proof) == expected
+    # Nodes as bytes, e.g. formatted by web3
+    formatted = {
+        "accountProof": list(map(HexBytes, eth_proof["accountProof"])),
+        "storageProof": [
+            {"proof": list(map(HexBytes, proof["proof"]))} for proof in eth_proof["storageProof"]
+        ],
+    }
+    assert serialize_proofs(formatted) == expected
+
+    # Short lists
+    proofs = {"accountProof": [rlp.encode([b"\x01", b"\x02"])], "storageProof": [{"proof": []}]}
+    assert serialize_proofs(proofs) == rlp.encode([[[b"\x01", b"\x02"]], []])
+
+
+def test_serialize_block(eth_rpc, eth_block):
+    block = Web3(HTTPProvider(eth_rpc.url)).eth.get_block(BLOCK_NUMBER)
+    fields = rlp.decode(serialize_block(block))
+    assert len(fields) == 20
+    assert fields[3] == bytes.fromhex(eth_block["stateRoot"][2:])
+    assert fields[7] == b""  # difficulty
+    assert int.from_bytes(fields[8], "big") == BLOCK_NUMBER
+    assert fields[14] == bytes(8)  # nonce
+    assert fields[18] == (131072).to_bytes(3, "big")  # excessBlobGas
+    # Same from raw JSON-RPC result
+    assert serialize_block(eth_block) == serialize_block(block)
+
+    # Single bytes below 0x80 have no prefix
+    assert rlp.decode(serialize_block(eth_block | {"gasUsed": "0x7f"}))[10] == b"\x7f"
@@ -0,0 +1,74 @@
+import pytest
+from web3 import HTTPProvider, Web3
+
+from scripts.scrvusd.proof import ProofCache, generate_proof, submit_proof
+from tests.scrvusd.scripts.conftest import BLOCK_NUMBER
+
+
+PROOFS = (b"\xaa" * 600, b"\xbb" * 5000)
+
+
+def test_lru():
+    cache = ProofCache(size=2)
+    for block_number in range(3):
+        cache.put(block_number, PROOFS)
+    assert cache.get(0) is None  # evicted
+    assert cache.get(1) == cache.get(2) == PROOFS
+
+    cache.get(1)  # refresh
+    cache.put(3, PROOFS)
+    assert cache.get(1) == PROOFS
+    assert cache.get(2) is None
+
+
+def test_key():
+    cache = ProofCache()
+    cache.put(1, PROOFS)
+    assert cache.get(1, address=ProofCache.key(1)[1]) == PROOFS  # case insensitive
+    assert cache.get(1, slots=[21, 22]) is None
+    assert cache.get(1, address="0x" + "00" * 20) is None
+
+
+def test_persistence(tmp_path):
+    path = str(tmp_path / "proofs.sqlite")
+    cache = ProofCache(size=1, path=path)
+    cache.put(1, PROOFS)
+    cache.put(2, PROOFS[::-1])
+    assert cache.get(1) == PROOFS  # from disk
+
+    restarted = ProofCache(path=path)
+    assert restarted.get(1) == PROOFS
+    assert restarted.get(2) == PROOFS[::-1]
+    assert restarted.latest() == PROOFS[::-1]
+
+
+@pytest.mark.parametrize("persistent", [False, True])
+def test_latest_with_header(tmp_path, persistent):
+    cache = ProofCache(size=1, path=str(tmp_path / "proofs.sqlite") if persistent else None)
+    assert cache.latest(with_header=True) is None
+    cache.put(1, PROOFS)
+    cache.put(2, (b"", PROOFS[1]))  # for verification by state root
+    assert cache.latest() == (b"", PROOFS[1])
+    # Evicted from memory, header is found on disk only
+    assert cache.latest(with_header=True) == (PROOFS if persistent else None)
+
+
+def test_submit_without_proofs():
+    with pytest.raises(ValueError, match="No proofs to submit"):
+        submit_proof(None)
+
+    cache = ProofCache()
+    cache.put(1, (b"", PROOFS[1]))
+    with pytest.raises(ValueError, match="No proofs with block header"):
+        submit_proof(None, cache=cache)
+
+
+def test_generate_proof(eth_rpc, tmp_path):
+    path = str(tmp_path / "proofs.sqlite")
+    w3 = Web3(HTTPProvider(eth_rpc.url))
+
+    proofs = generate_proof(w3, BLOCK_NUMBER, cache=ProofCache(path=path))
+    assert len(eth_rpc.requests) == 2
+
+    assert generate_proof(w3, BLOCK_NUMBER, cache=ProofCache(path=path)) == proofs
+    assert len(eth_rpc.requests) == 2  # no new requests after restart
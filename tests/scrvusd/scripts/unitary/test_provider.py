@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+from web3 import Web3
+
+from scripts.scrvusd.provider import AsyncFailoverProvider, FailoverProvider
+from tests.shared.rpc import RPCStub
+
+
+def _endpoint(name, delay=0):
+    """
+    Endpoint answering every request with its `name` after `delay` seconds.
+    """
+
+    def handler(result):
+        def handle(params):
+            time.sleep(delay)
+            return result
+
+        return handle
+
+    return RPCStub({"eth_getProof": handler(name), "eth_blockNumber": handler(hex(len(name)))})
+
+
+@pytest.fixture()
+def dead_url():
+    with RPCStub() as stub:
+        url = stub.url
+    return url  # nothing listens anymore
+
+
+def test_failover(dead_url):
+    with _endpoint("live") as live:
+        provider = FailoverProvider([dead_url, live.url], max_failures=1, cooldown=60)
+        web3 = Web3(provider)
+        for _ in range(3):
+            assert web3.eth.block_number == len("live")
+        dead = provider.pool.endpoints[0]
+        # Dead endpoint is skipped after `max_failures`
+        assert dead.open_until > time.monotonic()
+        assert provider.best_url() == live.url
+        assert len(live.calls("eth_blockNumber")) == 3
+
+
+def test_all_dead(dead_url):
+    provider = FailoverProvider([dead_url, dead_url + "/"])
+    with pytest.raises(OSError):
+        provider.make_request("eth_blockNumber", [])
+
+
+def test_slow_endpoint():
+    with _endpoint("slow", delay=0.2) as slow, _endpoint("fast") as fast:
+        provider = FailoverProvider(
+            [slow.url, fast.url], timeout=1, slow_latency=0.1, max_failures=2, hedge_delay=10
+        )
+        # Preferred by rank until its circuit opens
+        for _ in range(2):
+            assert provider.make_request("eth_getProof", [])["result"] == "slow"
+        assert provider.make_request("eth_getProof", [])["result"] == "fast"
+        # Latency-aware afterwards: fast fallback is ranked first
+        assert provider.pool.endpoints[1].score() < provider.pool.endpoints[0].score()
+
+
+def test_timeout():
+    with _endpoint("stuck", delay=1) as stuck, _endpoint("live") as live:
+        provider = FailoverProvider([stuck.url, live.url], timeout=0.1)
+        start = time.monotonic()
+        assert Web3(provider).eth.block_number == len("live")
+        assert time.monotonic() - start < 0.5
+
+
+def test_hedge():
+    with _endpoint("slow", delay=0.5) as slow, _endpoint("fast") as fast:
+        provider = FailoverProvider([slow.url, fast.url], hedge_delay=0.05)
+        start = time.monotonic()
+        assert provider.make_request("eth_getProof", [])["result"] == "fast"
+        assert time.monotonic() - start < 0.4
+        assert len(slow.calls("eth_getProof")) == len(fast.calls("eth_getProof")) == 1
+
+        # Other methods are not hedged
+        provider.make_request("eth_blockNumber", [])
+        assert len(slow.calls("eth_blockNumber")) + len(fast.calls("eth_blockNumber")) == 1
+
+
+def test_async_hedge(dead_url):
+    async def run(urls):
+        provider = AsyncFailoverProvider(urls, hedge_delay=0.05)
+        try:
+            start = time.monotonic()
+            responses = await provider.make_batch_request(
+                [("eth_blockNumber", []), ("eth_getProof", [])]
+            )
+            return [response["result"] for response in responses], time.monotonic() - start
+        finally:
+            await provider.disconnect()
+
+    with _endpoint("slow", delay=0.5) as slow, _endpoint("fast") as fast:
+        results, elapsed = asyncio.run(run([dead_url, slow.url, fast.url]))
+    assert results == [hex(len("fast")), "fast"]
+    assert elapsed < 0.4
@@ -0,0 +1,105 @@
+import math
+
+import boa
+import pytest
+from eth_abi import encode
+from web3 import Web3
+
+from scripts.scrvusd.simulation import (
+    ERROR_SELECTOR,
+    GAS_MARGIN,
+    MIN_PRICE_CHANGE,
+    Simulation,
+    Simulator,
+    intrinsic_gas,
+    simulate_call,
+)
+from tests.shared.rpc import RPCError, RPCStub
+
+
+@pytest.fixture(scope="module")
+def soracle(admin, verifier):
+    with boa.env.prank(admin):
+        contract = boa.load("contracts/scrvusd/oracles/ScrvusdOracleV2.vy", 10**18)
+        contract.grantRole(contract.PRICE_PARAMETERS_VERIFIER(), verifier)
+    return contract
+
+
+def _params(price_numerator, price_denominator):
+    ts = boa.env.evm.patch.timestamp
+    return [price_numerator, 0, price_denominator, ts + 7 * 86400, 0, 0, 0]
+
+
+def _tx(soracle, verifier, params, block_number):
+    ts = boa.env.evm.patch.timestamp
+    return {
+        "from": verifier,
+        "to": soracle.address,
+        "data": soracle.update_price.prepare_calldata(params, ts, block_number),
+    }
+
+
+def test_simulate(soracle, verifier):
+    tx = _tx(soracle, verifier, _params(3, 2), 10)
+    simulation = Simulator().simulate([tx])
+    assert simulation.price_change == 5 * 10**17 and simulation.error is None
+    assert simulation.worth_submitting()
+
+    # Same gas as the transaction itself
+    with boa.env.anchor():
+        with boa.env.prank(verifier):
+            soracle.update_price(_params(3, 2), boa.env.evm.patch.timestamp, 10)
+        gas_used = soracle._computation.get_gas_used()
+    assert simulation.gas_used == gas_used + intrinsic_gas(tx["data"])
+    assert simulation.gas_limit() == math.ceil(simulation.gas_used * GAS_MARGIN)
+
+    # Rolled back
+    assert soracle.last_block_number() == 0
+    assert soracle.price_v0() == 10**18
+
+
+def test_sequence(soracle, verifier):
+    simulation = Simulator().simulate(
+        [
+            _tx(soracle, verifier, _params(3, 2), 10),
+            _tx(soracle, verifier, _params(3, 2), 11),
+        ]
+    )
+    # Second update changes nothing
+    assert simulation.price_change == 0
+    assert not simulation.worth_submitting()
+    assert soracle.last_block_number() == 0
+
+
+def test_threshold(soracle, verifier):
+    tx = _tx(soracle, verifier, _params(10**18 + 10**6, 10**18), 10)
+    simulation = Simulator().simulate([tx])
+    assert 0 < simulation.price_change < MIN_PRICE_CHANGE
+    assert not simulation.worth_submitting()
+    assert simulation.worth_submitting(min_price_change=0)
+
+
+def test_revert(soracle, verifier):
+    with boa.env.anchor():
+        with boa.env.prank(verifier):
+            soracle.update_price(_params(3, 2), boa.env.evm.patch.timestamp, 10)
+        simulation = Simulator().simulate([_tx(soracle, verifier, _params(2, 1), 9)])
+    assert simulation == Simulation(None, "Outdated")
+    assert not simulation.worth_submitting()
+
+
+def test_simulate_call():
+    def call(params):
+        if params[0]["data"] == "0x01":
+            revert_data = ERROR_SELECTOR + encode(["string"], ["Outdated"])
+            raise RPCError("execution reverted: Outdated", "0x" + revert_data.hex())
+        return "0x" + encode(["uint256"], [5 * 10**17]).hex()
+
+    tx = {"from": "0x" + "11" * 20, "to": "0x" + "22" * 20, "gas": 10**6}
+    with RPCStub({"eth_call": call, "eth_chainId": lambda params: "0x1"}) as stub:
+        web3 = Web3(Web3.HTTPProvider(stub.url))
+        simulation = simulate_call(web3, tx | {"data": "0x00"})
+        assert simulation == Simulation(5 * 10**17)
+        assert simulation.gas_limit() is None
+        simulation = simulate_call(web3, tx | {"data": "0x01"})
+    assert simulation == Simulation(None, "Outdated")
@@ -0,0 +1,134 @@
+import pytest
+from eth_account import Account
+from eth_account.typed_transactions import TypedTransaction
+from hexbytes import HexBytes
+from web3 import Web3
+
+from scripts.scrvusd.submitter import GAS_BUMP, Submitter
+from tests.shared.rpc import RPCStub
+
+
+NONCE = 7
+FEE = 10**9
+
+
+class Mempool:
+    """
+    Received transactions, mined on demand.
+    """
+
+    def __init__(self):
+        self.txs = {}  # hash: tx
+        self.mined = set()
+        self.mined_after_check = set()  # hashes mined right after their receipt is requested
+
+    def send(self, params):
+        raw_tx = bytes.fromhex(params[0][2:])
+        tx_hash = Web3.keccak(raw_tx).to_0x_hex()
+        nonce = TypedTransaction.from_bytes(HexBytes(raw_tx)).as_dict()["nonce"]
+        if any(self.txs[mined]["nonce"] == nonce for mined in self.mined):
+            raise ValueError("nonce too low")
+        self.txs[tx_hash] = TypedTransaction.from_bytes(HexBytes(raw_tx)).as_dict()
+        return tx_hash
+
+    def receipt(self, params):
+        if params[0] not in self.mined:
+            if params[0] in self.mined_after_check:
+                self.mined.add(params[0])
+            return None
+        return {
+            "transactionHash": params[0],
+            "transactionIndex": "0x0",
+            "blockHash": "0x" + "11" * 32,
+            "blockNumber": "0x1",
+            "from": "0x" + "00" * 20,
+            "to": "0x" + "00" * 20,
+            "cumulativeGasUsed": "0x5208",
+            "gasUsed": "0x5208",
+            "effectiveGasPrice": hex(FEE),
+            "contractAddress": None,
+            "logs": [],
+            "logsBloom": "0x" + "00" * 256,
+            "status": "0x1",
+            "type": "0x2",
+        }
+
+
+@pytest.fixture()
+def mempool():
+    return Mempool()
+
+
+@pytest.fixture()
+def l2_rpc(mempool):
+    with RPCStub(
+        {
+            "eth_getTransactionCount": lambda params: hex(NONCE),
+            "eth_sendRawTransaction": mempool.send,
+            "eth_getTransactionReceipt": mempool.receipt,
+        }
+    ) as stub:
+        yield stub
+
+
+def _tx(data=b""):
+    return {
+        "chainId": 1,
+        "to": "0x" + "22" * 20,
+        "data": data,
+        "gas": 100_000,
+        "maxFeePerGas": 2 * FEE,
+        "maxPriorityFeePerGas": FEE,
+    }
+
+
+def test_nonces(l2_rpc, mempool):
+    submitter = Submitter(Web3(Web3.HTTPProvider(l2_rpc.url)), Account.create())
+    pendings = [submitter.send(_tx(bytes([i]))) for i in range(3)]
+
+    assert len(l2_rpc.calls("eth_getTransactionCount")) == 1
+    assert [pending.nonce for pending in pendings] == [NONCE, NONCE + 1, NONCE + 2]
+    assert sorted(tx["nonce"] for tx in mempool.txs.values()) == [NONCE, NONCE + 1, NONCE + 2]
+
+    # Mined last transaction implies mined previous ones
+    mempool.mined.add(pendings[2].hashes[0].to_0x_hex())
+    assert submitter.wait(pendings[2])["status"] == 1
+    assert submitter.pending == {}
+
+
+def test_bump(l2_rpc, mempool):
+    submitter = Submitter(
+        Web3(Web3.HTTPProvider(l2_rpc.url)), Account.create(), timeout=0.05, poll_latency=0.01
+    )
+    first, second = submitter.send(_tx(b"\x01")), submitter.send(_tx(b"\x02"))
+    with pytest.raises(TimeoutError):
+        submitter.wait(second)
+
+    # Both stuck transactions are replaced on every bump
+    assert len(first.hashes) == len(second.hashes) == submitter.max_bumps + 2
+    for pending in [first, second]:
+        txs = [mempool.txs[tx_hash.to_0x_hex()] for tx_hash in pending.hashes]
+        assert {tx["nonce"] for tx in txs} == {pending.nonce}
+        for prev, tx in zip(txs, txs[1:]):
+            assert tx["maxPriorityFeePerGas"] >= prev["maxPriorityFeePerGas"] * GAS_BUMP
+            assert tx["maxFeePerGas"] >= prev["maxFeePerGas"] * GAS_BUMP
+
+    # Any replacement might be mined
+    mempool.mined.add(second.hashes[1].to_0x_hex())
+    assert submitter.wait(second)["transactionHash"] == second.hashes[1]
+    assert submitter.pending == {}
+
+
+def test_mined_while_bumping(l2_rpc, mempool):
+    submitter = Submitter(
+        Web3(Web3.HTTPProvider(l2_rpc.url)), Account.create(), timeout=0.05, poll_latency=0.01
+    )
+    first, second = submitter.send(_tx(b"\x01")), submitter.send(_tx(b"\x02"))
+
+    # Second is mined after its receipt was checked, so its replacement is rejected
+    mempool.mined_after_check.add(second.hashes[0].to_0x_hex())
+    submitter.bump(second.nonce)
+    assert len(l2_rpc.calls("eth_sendRawTransaction")) == 4
+    assert len(first.hashes) == 2 and len(second.hashes) == 1
+    assert submitter.pending == {}
+    assert submitter.wait(second)["transactionHash"] == second.hashes[0]
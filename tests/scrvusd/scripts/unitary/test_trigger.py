@@ -0,0 +1,113 @@
+import pytest
+from web3 import HTTPProvider, Web3
+
+from scripts.scrvusd.scrvusd_oracle import PriceParams, ScrvusdOracleV2, price_per_share
+from scripts.scrvusd.trigger import DEPOSIT, VaultWatcher, oracle_price, submitted_params
+from tests.shared.rpc import RPCStub
+
+
+WEEK = 7 * 86400
+TS = 1_729_000_000
+PARAMS = PriceParams(
+    total_debt=0,
+    total_idle=11 * 10**17,
+    total_supply=11 * 10**17,
+    full_profit_unlock_date=TS + WEEK,
+    profit_unlocking_rate=10**17 * 10**12 // WEEK,
+    last_profit_update=TS,
+    balance_of_self=10**17,
+)
+SLOTS = {hex(slot): value for slot, value in zip([21, 22, 20, 38, 39, 40], PARAMS)}
+
+
+@pytest.fixture()
+def vault_rpc(eth_block):
+    state = {"block_number": 100, "logs": []}
+
+    def get_storage_at(params):
+        value = SLOTS.get(params[1], PARAMS.balance_of_self)
+        return "0x" + value.to_bytes(32, "big").hex()
+
+    def get_logs(params):
+        from_block, to_block = int(params[0]["fromBlock"], 16), int(params[0]["toBlock"], 16)
+        return [
+            log for log in state["logs"] if from_block <= int(log["blockNumber"], 16) <= to_block
+        ]
+
+    with RPCStub(
+        {
+            "eth_blockNumber": lambda params: hex(state["block_number"]),
+            "eth_getBlockByNumber": lambda params: eth_block,
+            "eth_getStorageAt": get_storage_at,
+            "eth_getLogs": get_logs,
+        }
+    ) as stub:
+        stub.state = state
+        yield stub
+
+
+def _log(block_number):
+    return {
+        "address": "0x0655977feb2f289a4ab78af67bab0d17aab84367",
+        "blockHash": "0x" + "11" * 32,
+        "blockNumber": hex(block_number),
+        "data": "0x" + "00" * 64,
+        "logIndex": "0x0",
+        "removed": False,
+        "topics": [DEPOSIT, "0x" + "00" * 32, "0x" + "00" * 32],
+        "transactionHash": "0x" + "22" * 32,
+        "transactionIndex": "0x0",
+    }
+
+
+def test_vault_watcher(vault_rpc):
+    watcher = VaultWatcher(Web3(HTTPProvider(vault_rpc.url)), page_size=30)
+    assert watcher.poll()
+    assert watcher.params == PARAMS
+    assert watcher.price(TS + WEEK) == price_per_share(PARAMS, TS + WEEK)
+
+    # No events, no parameters requested
+    vault_rpc.requests.clear()
+    vault_rpc.state["block_number"] = 200
+    assert not watcher.poll()
+    assert len(vault_rpc.calls("eth_getLogs")) == 4  # paged
+    assert not vault_rpc.calls("eth_getStorageAt")
+
+    vault_rpc.requests.clear()
+    vault_rpc.state["block_number"] = 210
+    vault_rpc.state["logs"] = [_log(205), _log(207)]
+    assert watcher.poll()
+    assert len(vault_rpc.calls("eth_getStorageAt")) == len(PARAMS)
+    assert watcher.block_number == 210
+
+
+def test_oracle_price():
+    # Replicates unlocking
+    assert oracle_price("ScrvusdOracleV1", PARAMS, TS, TS + WEEK // 2) == price_per_share(
+        PARAMS, TS + WEEK // 2
+    )
+    # Fixed at update
+    assert oracle_price("ScrvusdOracle", PARAMS, TS, TS + WEEK // 2) == price_per_share(PARAMS, TS)
+    assert price_per_share(PARAMS, TS) == 10**18
+    assert price_per_share(PARAMS, TS + WEEK) == 11 * 10**17 * 10**18 // 10**18
+
+
+@pytest.mark.parametrize("by_state_root", [False, True])
+def test_submitted_params(by_state_root):
+    # Proven a week after the last report, when profits are fully unlocked
+    block_ts = TS + WEEK + 3600
+    params, params_ts = submitted_params(PARAMS, block_ts, by_state_root)
+    assert params_ts == (TS if by_state_root else block_ts)
+
+    # Verifier updates the oracle with the same timestamp
+    oracle = ScrvusdOracleV2(price_per_share(PARAMS, TS), TS)
+    oracle.update_price(PARAMS, params_ts, 100, block_ts)
+    for ts in [block_ts, block_ts + WEEK, block_ts + 3 * WEEK]:
+        assert oracle_price("ScrvusdOracleV1", params, params_ts, ts) == oracle.raw_price(
+            ts, oracle.price_params_ts
+        )
+    # Following the state root update with the block timestamp would be off
+    if by_state_root:
+        assert oracle_price("ScrvusdOracleV1", PARAMS, block_ts, block_ts + WEEK) != (
+            oracle.raw_price(block_ts + WEEK, oracle.price_params_ts)
+        )
@@ -1,20 +1,27 @@
 import pytest
 import boa
-import boa_solidity
+
+from tests.shared.compile_cache import load_partial_solc
 
 
 MAX_BPS_EXTENDED = 1_000_000_000_000
 
 
+@pytest.fixture(scope="session")
+def verifier_deployer(request):
+    # Compiled once per version of the sources, artifacts are shared by xdist workers
+    return load_partial_solc(
+        "contracts/scrvusd/verifiers/ScrvusdVerifierV3.sol",
+        request.config.cache.mkdir("solc"),
+        compiler_args={
+            "optimize": True,
+            "optimize_runs": 200,
+            "import_remappings": "hamdiallam/Solidity-RLP@2.0.7=./node_modules/solidity-rlp",
+        },
+    )
+
+
 @pytest.fixture(scope="module")
-def verifier(admin, boracle, soracle):
+def verifier(admin, boracle, soracle, verifier_deployer):
     with boa.env.prank(admin):
-        deployer = boa_solidity.load_partial_solc(
-            "contracts/scrvusd/verifiers/ScrvusdVerifierV2.sol",
-            compiler_args={
-                "optimize": True,
-                "optimize_runs": 200,
-                "import_remappings": "hamdiallam/Solidity-RLP@2.0.7=./node_modules/solidity-rlp",
-            },
-        )
-        return deployer.deploy(boracle.address, soracle.address)
+        return verifier_deployer.deploy(boracle.address, soracle.address)
@@ -0,0 +1,2 @@
+from tests.scrvusd.verifier.unitary.test_price import scrvusd_slot_values  # noqa: F401  # reusing fixture
+from tests.scrvusd.verifier.unitary.test_profit_max_unlock_time import scrvusd_period  # noqa: F401  # reusing fixture
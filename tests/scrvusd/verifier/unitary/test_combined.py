@@ -0,0 +1,56 @@
+import rlp
+
+from scripts.scrvusd.proof import serialize_proofs
+from tests.shared.verifier import get_block_and_proofs
+
+
+def test_by_blockhash(
+    verifier,
+    soracle_price_slots,
+    soracle_period_slots,
+    soracle,
+    boracle,
+    scrvusd,
+    scrvusd_slot_values,
+    scrvusd_period,
+):
+    block_header, proofs = get_block_and_proofs(
+        [(scrvusd, soracle_price_slots + soracle_period_slots)]
+    )
+    boracle._set_block_hash(block_header.block_number, block_header.hash)
+
+    verifier.verifyScrvusdAndPeriodByBlockHash(
+        rlp.encode(block_header),
+        serialize_proofs(proofs[0]),
+    )
+
+    assert soracle._storage.price_params.get() == scrvusd_slot_values
+    assert soracle._storage.price_params_ts.get() == block_header.timestamp
+    assert soracle.profit_max_unlock_time() == scrvusd_period
+    assert soracle.last_block_number() == block_header.block_number
+
+
+def test_by_stateroot(
+    verifier,
+    soracle_price_slots,
+    soracle_period_slots,
+    soracle,
+    boracle,
+    scrvusd,
+    scrvusd_slot_values,
+    scrvusd_period,
+):
+    block_header, proofs = get_block_and_proofs(
+        [(scrvusd, soracle_price_slots + soracle_period_slots)]
+    )
+    boracle._set_state_root(block_header.block_number, block_header.state_root)
+
+    verifier.verifyScrvusdAndPeriodByStateRoot(
+        block_header.block_number,
+        serialize_proofs(proofs[0]),
+    )
+
+    assert soracle._storage.price_params.get() == scrvusd_slot_values
+    assert soracle._storage.price_params_ts.get() == scrvusd_slot_values["last_profit_update"]
+    assert soracle.profit_max_unlock_time() == scrvusd_period
+    assert soracle.last_block_number() == block_header.block_number
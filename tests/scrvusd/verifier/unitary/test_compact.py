@@ -0,0 +1,64 @@
+import boa
+import pytest
+import rlp
+
+from scripts.scrvusd.proof import serialize_multiproof
+from tests.shared.verifier import get_block_and_proofs
+
+
+def test_by_blockhash(
+    verifier, soracle_price_slots, soracle, boracle, scrvusd, scrvusd_slot_values
+):
+    block_header, proofs = get_block_and_proofs([(scrvusd, soracle_price_slots)])
+    boracle._set_block_hash(block_header.block_number, block_header.hash)
+
+    verifier.verifyScrvusdByBlockHashCompact(
+        rlp.encode(block_header),
+        serialize_multiproof(proofs[0]),
+    )
+
+    assert soracle._storage.price_params.get() == scrvusd_slot_values
+    assert soracle._storage.price_params_ts.get() == block_header.timestamp
+    assert soracle.last_block_number() == block_header.block_number
+
+
+@pytest.mark.parametrize("with_period", [False, True])
+def test_by_stateroot(
+    verifier,
+    soracle_price_slots,
+    soracle_period_slots,
+    soracle,
+    boracle,
+    scrvusd,
+    scrvusd_slot_values,
+    scrvusd_period,
+    with_period,
+):
+    slots = soracle_price_slots + (soracle_period_slots if with_period else [])
+    block_header, proofs = get_block_and_proofs([(scrvusd, slots)])
+    boracle._set_state_root(block_header.block_number, block_header.state_root)
+
+    verifier.verifyScrvusdByStateRootCompact(
+        block_header.block_number,
+        serialize_multiproof(proofs[0]),
+    )
+
+    assert soracle._storage.price_params.get() == scrvusd_slot_values
+    assert soracle._storage.price_params_ts.get() == scrvusd_slot_values["last_profit_update"]
+    assert (soracle.profit_max_unlock_time() == scrvusd_period) == with_period
+    assert soracle.last_block_number() == block_header.block_number
+
+
+def test_invalid_node(verifier, soracle_price_slots, boracle, scrvusd, scrvusd_slot_values):
+    block_header, proofs = get_block_and_proofs([(scrvusd, soracle_price_slots)])
+    boracle._set_state_root(block_header.block_number, block_header.state_root)
+
+    nodes, paths = rlp.decode(serialize_multiproof(proofs[0]))
+    # Tamper with the leaf of total_supply
+    leaf = nodes[paths[3][-1]]
+    leaf[1] = rlp.encode(rlp.decode(leaf[1]) + b"\x01")
+
+    with boa.reverts("Invalid node hash"):
+        verifier.verifyScrvusdByStateRootCompact(
+            block_header.block_number, rlp.encode([nodes, paths])
+        )
@@ -0,0 +1,50 @@
+import boa
+import rlp
+
+from scripts.scrvusd.proof import serialize_multiproof
+from tests.shared.verifier import get_block_and_proofs
+
+
+def prove_blocks(scrvusd, crvusd, admin, boracle, slots, cnt):
+    """
+    Apply blockhashes of `cnt` blocks with rewards reported in between.
+    :return: [(block_header, multiproof)]
+    """
+    blocks = []
+    for i in range(cnt):
+        if i > 0:
+            with boa.env.prank(admin):
+                crvusd._mint_for_testing(scrvusd, 10**16)
+                scrvusd.process_report(scrvusd)
+            boa.env.time_travel(seconds=12, block_delta=1)
+        block_header, proofs = get_block_and_proofs([(scrvusd, slots)])
+        boracle._set_block_hash(block_header.block_number, block_header.hash)
+        blocks.append((block_header, serialize_multiproof(proofs[0])))
+    return blocks
+
+
+def test_by_blockhashes(
+    verifier, soracle_price_slots, soracle, boracle, scrvusd, crvusd, admin, scrvusd_slot_values
+):
+    with boa.env.anchor():
+        blocks = prove_blocks(scrvusd, crvusd, admin, boracle, soracle_price_slots, 3)
+        verifier.verifyScrvusdByBlockHashes(
+            [rlp.encode(block_header) for block_header, _ in blocks],
+            [multiproof for _, multiproof in blocks],
+        )
+
+        # Last block wins
+        block_header = blocks[-1][0]
+        assert soracle._storage.price_params_ts.get() == block_header.timestamp
+        assert soracle.last_block_number() == block_header.block_number
+
+
+def test_invalid_input(verifier, soracle_price_slots, boracle, scrvusd, crvusd, admin):
+    with boa.env.anchor():
+        ((block_header, multiproof),) = prove_blocks(
+            scrvusd, crvusd, admin, boracle, soracle_price_slots, 1
+        )
+        with boa.reverts("No blocks"):
+            verifier.verifyScrvusdByBlockHashes([], [])
+        with boa.reverts("Length mismatch"):
+            verifier.verifyScrvusdByBlockHashes([rlp.encode(block_header)], [])
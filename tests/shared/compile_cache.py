@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+
+import boa_solidity
+import solcx
+from boa_solidity.soldeployer import SolDeployer
+
+_IMPORT = re.compile(r'^\s*import\s+(?:[^"\']*\s+from\s+)?["\']([^"\']+)["\']', re.MULTILINE)
+
+
+def _remappings(compiler_args):
+    remappings = compiler_args.get("import_remappings") or []
+    if isinstance(remappings, str):
+        remappings = remappings.split()
+    return [remapping.split("=", 1) for remapping in remappings]
+
+
+def _sources(filename, remappings):
+    """
+    `filename` and every source it imports, recursively.
+    """
+    sources, stack = set(), [Path(filename)]
+    while stack:
+        path = stack.pop()
+        if path in sources:
+            continue
+        sources.add(path)
+        if not path.exists():
+            continue
+        for name in _IMPORT.findall(path.read_text()):
+            for prefix, target in remappings:
+                if name.startswith(prefix):
+                    stack.append(Path(target + name[len(prefix) :]))
+                    break
+            else:
+                stack.append(
+                    Path(os.path.normpath(path.parent / name))
+                    if name.startswith(".")
+                    else Path(name)
+                )
+    return sorted(sources)
+
+
+def _key(filename, compiler_args):
+    """
+    Hash of the sources, solc version and compiler arguments.
+    """
+    h = hashlib.sha256(str(solcx.get_solc_version()).encode())
+    h.update(json.dumps([filename, compiler_args], sort_keys=True).encode())
+    for path in _sources(filename, _remappings(compiler_args)):
+        h.update(str(path).encode())
+        h.update(path.read_bytes() if path.exists() else b"")
+    return h.hexdigest()
+
+
+def load_partial_solc(filename, cache_dir, compiler_args=None) -> SolDeployer:
+    """
+    `boa_solidity.load_partial_solc` with artifacts cached in `cache_dir`,
+    so xdist workers and later runs compile each version of the sources once.
+    :param cache_dir: Directory shared by workers, e.g. `config.cache.mkdir("solc")`
+    """
+    compiler_args = compiler_args or {}
+    path = Path(cache_dir) / f"{_key(filename, compiler_args)}.json"
+    if path.exists():
+        artifact = json.loads(path.read_text())
+        return SolDeployer(artifact["abi"], bytes.fromhex(artifact["bin"]), filename=filename)
+
+    deployer = boa_solidity.load_partial_solc(filename, compiler_args=compiler_args)
+    # Write to a temporary file and rename, so concurrent workers never read a partial artifact
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump({"abi": deployer.abi, "bin": deployer.bytecode.hex()}, f)
+    os.replace(tmp, path)
+    return deployer
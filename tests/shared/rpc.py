@@ -0,0 +1,95 @@
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class RPCError(Exception):
+    """
+    Raised by handlers to respond with an error carrying `data`, e.g. revert data of `eth_call`.
+    """
+
+    def __init__(self, message, data=None):
+        super().__init__(message)
+        self.data = data
+
+
+class _Server(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients giving up on slow responses (timeouts, hedged requests) close the connection
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class RPCStub:
+    """
+    Local JSON-RPC server to run scripts without network.
+    Methods are served by `handlers`: {method: callable(params) -> result}.
+    Supports batches, every received HTTP request is recorded in `requests`.
+    """
+
+    def __init__(self, handlers=None):
+        self.handlers = dict(handlers or {})
+        self.requests = []  # list of received payloads (dict or list for batches)
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.requests.append(payload)
+                if isinstance(payload, list):
+                    response = [stub._respond(request) for request in payload]
+                else:
+                    response = stub._respond(payload)
+                body = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _Server(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def calls(self, method=None):
+        """
+        :return: List of single requests received (batches are unfolded)
+        """
+        result = []
+        for payload in self.requests:
+            for request in payload if isinstance(payload, list) else [payload]:
+                if method is None or request["method"] == method:
+                    result.append(request)
+        return result
+
+    def _respond(self, request):
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        handler = self.handlers.get(request["method"])
+        if handler is None:
+            response["error"] = {"code": -32601, "message": f"{request['method']} not found"}
+            return response
+        try:
+            response["result"] = handler(request.get("params", []))
+        except RPCError as e:
+            response["error"] = {"code": 3, "message": str(e), "data": e.data}
+        except Exception as e:
+            response["error"] = {"code": -32000, "message": str(e)}
+        return response
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,72 @@
+import boa
+import eth_utils
+import pytest
+import rlp
+from trie import HexaryTrie
+
+from tests.shared.verifier import StateProofs, get_block_and_proofs
+
+SLOTS = [0, 1, 2]
+
+
+@pytest.fixture(scope="module")
+def storage():
+    return boa.loads(
+        """
+a: public(uint256)
+b: public(uint256)
+c: public(uint256)
+
+@external
+def set(_a: uint256, _b: uint256, _c: uint256):
+    self.a = _a
+    self.b = _b
+    self.c = _c
+"""
+    )
+
+
+def _values(block_header, proofs):
+    """
+    Verify proofs against the state root, returning proven slot values.
+    """
+    address_hash = eth_utils.keccak(bytes.fromhex(proofs["address"][2:]))
+    account_proof = [rlp.decode(node) for node in proofs["accountProof"]]
+    HexaryTrie.get_from_proof(block_header.state_root, address_hash, account_proof)
+    values = []
+    for proof in proofs["storageProof"]:
+        slot_hash = eth_utils.keccak(proof["key"].to_bytes(32, "big"))
+        value = HexaryTrie.get_from_proof(
+            proofs["storageHash"], slot_hash, [rlp.decode(node) for node in proof["proof"]]
+        )
+        values.append(rlp.decode(value) if value else b"")
+    return [int.from_bytes(value, "big") for value in values]
+
+
+def test_incremental(storage):
+    storage.set(1, 2, 3)
+    block_header, proofs = get_block_and_proofs([(storage, SLOTS)])
+    assert _values(block_header, proofs[0]) == [1, 2, 3]
+
+    storage.set(4, 0, 3)
+    block_header, proofs = get_block_and_proofs([(storage, SLOTS)])
+    assert _values(block_header, proofs[0]) == [4, 0, 3]
+
+    # Same as built from scratch
+    account_db = boa.env.evm.vm.state._account_db
+    assert StateProofs(account_db).update(account_db) == block_header.state_root
+
+
+def test_anchor(storage):
+    storage.set(1, 2, 3)
+    block_header, proofs = get_block_and_proofs([(storage, SLOTS)])
+
+    with boa.env.anchor():
+        storage.set(5, 6, 0)
+        anchored_header, anchored_proofs = get_block_and_proofs([(storage, SLOTS)])
+        assert _values(anchored_header, anchored_proofs[0]) == [5, 6, 0]
+        assert anchored_header.state_root != block_header.state_root
+
+    reverted_header, reverted_proofs = get_block_and_proofs([(storage, SLOTS)])
+    assert reverted_header.state_root == block_header.state_root
+    assert _values(reverted_header, reverted_proofs[0]) == [1, 2, 3]
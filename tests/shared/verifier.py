@@ -1,8 +1,9 @@
+import weakref
+
 import boa
 
 from trie import HexaryTrie
 from eth.db.hash_trie import HashTrie
-from eth.db.storage import StorageLookup
 import eth_utils
 import eth_abi
 import rlp
@@ -13,59 +14,95 @@ from typing import cast
 from trie.utils.db import ScratchDB
 
 
-def _update_without_persist(account_db, query):
-    # Currently boa never flushes caches(`.persist()`) to have all snapshots available,
-    # so db and _trie are actually empty.
-    # Though, saving reference in case of future changes.
-    write_batch = ScratchDB(account_db._raw_store_db.wrapped_db)
-    memory_trie = HashTrie(HexaryTrie(write_batch, account_db._trie.root_hash, prune=True))
-
-    # Skipping existing account_db._journaltrie.diff() because currently empty.
+class StateProofs:
+    """
+    Overlay tries of boa state kept alive between `get_block_and_proofs` calls.
+    Currently boa never flushes caches(`.persist()`) to have all snapshots available,
+    so changes live only in journals. Each update applies storage values changed since
+    the previous one, values reverted by `boa.env.anchor()` are restored from the base state.
+    Nodes are never pruned, so tries of previous states stay readable.
+    """
 
-    for _address, store in account_db._dirty_account_stores():
-        storage_lookup = StorageLookup(
-            write_batch, store._storage_lookup._starting_root_hash, _address
+    def __init__(self, account_db):
+        self.base_root = account_db._trie.root_hash
+        self.db = ScratchDB(account_db._raw_store_db.wrapped_db)
+        self.account_trie = HashTrie(HexaryTrie(self.db, self.base_root))
+        # address: [base storage root, storage trie, {slot: applied journal value}, account rlp]
+        self._storages = {}
+        # Proofs of the current state root: {(address, slots): proof}
+        self._proofs_root = None
+        self._proofs = {}
+
+    def update(self, account_db):
+        """
+        :return: State root of current boa state
+        """
+        stores = dict(account_db._dirty_account_stores())
+        for address in stores.keys() | self._storages.keys():
+            self._update_account(account_db, address, stores.get(address))
+        return self.account_trie.root_hash
+
+    def _update_account(self, account_db, address, store):
+        base_root = (
+            store._storage_lookup._starting_root_hash
+            if store is not None
+            else self._storages[address][0]
         )
-        journal_data = store._journal_storage._journal._current_values
-
-        for key, value in journal_data.items():
-            if value is DELETE_WRAPPED:
-                del storage_lookup[key]
-            elif value is REVERT_TO_WRAPPED:
-                pass
+        if address not in self._storages or self._storages[address][0] != base_root:
+            self._storages[address] = [base_root, HexaryTrie(self.db, base_root), {}, None]
+        _, storage_trie, applied, account_rlp = self._storages[address]
+
+        journal_data = store._journal_storage._journal._current_values if store is not None else {}
+        for key in journal_data.keys() | applied.keys():
+            # Missing from journal means reverted to base value
+            value = journal_data.get(key, REVERT_TO_WRAPPED)
+            if value == applied.get(key, REVERT_TO_WRAPPED):
+                continue
+
+            slot_hash = eth_utils.keccak(key.rjust(32, b"\x00"))
+            if value is REVERT_TO_WRAPPED:
+                storage_trie[slot_hash] = HexaryTrie(self.db, base_root).get(slot_hash)
+                del applied[key]
             else:
-                storage_lookup[key] = cast(bytes, value)
-
-        if storage_lookup.has_changed_root:
-            # Update account
-            account = account_db._get_account(_address)
-            rlp_account = rlp.encode(
-                account.copy(storage_root=storage_lookup.get_changed_root()), sedes=Account
-            )
-            memory_trie[_address] = rlp_account
-
-            # Update storage slots
-            diff = storage_lookup._trie_nodes_batch.diff()
-            diff.apply_to(write_batch, True)
-
-    new_state_root = memory_trie.root_hash
-
-    result = []
-    for addr, slots in query:
-        if hasattr(addr, "address"):  # is of type VyperContract
-            addr = addr.address
+                storage_trie[slot_hash] = b"" if value is DELETE_WRAPPED else cast(bytes, value)
+                applied[key] = value
 
+        account = account_db._get_account(address)
+        new_account_rlp = rlp.encode(
+            account.copy(storage_root=storage_trie.root_hash), sedes=Account
+        )
+        if new_account_rlp != account_rlp:
+            self.account_trie[address] = new_account_rlp
+            self._storages[address][3] = new_account_rlp
+
+    def get_proofs(self, query):
+        """
+        :param query: [(address, slots)]
+        :return: Proofs compatible with `eth_getProof`, reused while state root does not change
+        """
+        if self._proofs_root != self.account_trie.root_hash:
+            self._proofs_root = self.account_trie.root_hash
+            self._proofs = {}
+
+        result = []
+        for addr, slots in query:
+            if hasattr(addr, "address"):  # is of type VyperContract
+                addr = addr.address
+            key = (addr.lower(), tuple(slots))
+            if key not in self._proofs:
+                self._proofs[key] = self._get_proof(addr, slots)
+            result.append(self._proofs[key])
+        return result
+
+    def _get_proof(self, addr, slots):
         # Get account proof
         address_bytes = bytes.fromhex(addr[2:])  # remove "0x"
         address_hash = eth_utils.keccak(address_bytes)
-        account_proof = [rlp.encode(node) for node in memory_trie.get_proof(address_hash)]
+        account_proof = [rlp.encode(node) for node in self.account_trie.get_proof(address_hash)]
 
         # Get storage proofs
-        account = rlp.decode(memory_trie[address_bytes], sedes=Account)
-        storage_trie = HexaryTrie(
-            write_batch,
-            account.storage_root,
-        )
+        account = rlp.decode(self.account_trie[address_bytes], sedes=Account)
+        storage_trie = HexaryTrie(self.db, account.storage_root)
 
         storage_proof = []
         for slot in slots:
@@ -78,34 +115,45 @@ def _update_without_persist(account_db, query):
                     "proof": [rlp.encode(node) for node in slot_proof_nodes],
                 }
             )
-        result.append(
-            {
-                "address": addr,
-                "accountProof": account_proof,
-                "balance": account.balance,
-                "codeHash": account.code_hash,
-                "nonce": account.nonce,
-                "storageHash": account.storage_root,
-                "storageProof": storage_proof,
-            }
-        )
-    return new_state_root, result
+        return {
+            "address": addr,
+            "accountProof": account_proof,
+            "balance": account.balance,
+            "codeHash": account.code_hash,
+            "nonce": account.nonce,
+            "storageHash": account.storage_root,
+            "storageProof": storage_proof,
+        }
+
+
+_state_proofs = weakref.WeakKeyDictionary()
+
+
+def get_state_proofs(account_db) -> StateProofs:
+    """
+    Incremental proof builder of `account_db`, created anew if its base state changed.
+    """
+    state_proofs = _state_proofs.get(account_db)
+    if state_proofs is None or state_proofs.base_root != account_db._trie.root_hash:
+        state_proofs = _state_proofs[account_db] = StateProofs(account_db)
+    return state_proofs
 
 
 def get_block_and_proofs(query: list) -> (BlockHeaderAPI, list):
     """
     Simulate constructing a trie of accounts and storage slots, building block header and storage proofs.
     Result is compatible with `eth_getProof`.
-    Implementation is not safe and might have effects on further executions.
+    Tries are updated incrementally, see `StateProofs`.
     :param query: [(address, slots)]
     :return: block_header, proofs
     """
     evm = boa.env.evm
     parent_header = evm.chain.get_canonical_head()
 
-    state = evm.vm.state
-    account_db = state._account_db
-    state_root, proofs = _update_without_persist(account_db, query)
+    account_db = evm.vm.state._account_db
+    state_proofs = get_state_proofs(account_db)
+    state_root = state_proofs.update(account_db)
+    proofs = state_proofs.get_proofs(query)
 
     block_header = CancunBlockHeader(
         difficulty=0,